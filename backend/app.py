@@ -3,18 +3,28 @@
 # Flask Main Application - Using PyMySQL
 # =====================================================
 
-from flask import Flask, jsonify, send_from_directory, send_file
+from flask import Flask, jsonify, request, send_from_directory, send_file
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import sys
 
 # Get the absolute path to the project root directory
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# Build output of build_assets.py (content-hashed, precompressed assets)
+DIST_DIR = os.path.join(PROJECT_ROOT, 'dist')
+
 # Add project root to path for imports
 sys.path.insert(0, PROJECT_ROOT)
 
 from backend.config import config
+from backend.compression import compress_response, send_asset
+from backend import metrics, query_capture, risk
+from backend.models import Session
+from backend.sweeper import start_session_sweeper
+from backend.ratelimit import init_rate_limiting
+from backend.db import open_connections
 from backend.routes.auth_routes import auth_bp
 from backend.routes.worker_routes import worker_bp
 from backend.routes.complaint_routes import complaint_bp
@@ -22,6 +32,9 @@ from backend.routes.employer_routes import employer_bp
 from backend.routes.dashboard_routes import dashboard_bp
 from backend.routes.job_routes import job_bp
 from backend.routes.admin_routes import admin_bp
+from backend.routes.bootstrap_routes import bootstrap_bp
+from backend.routes.region_routes import region_bp
+from backend.routes.event_routes import event_bp
 
 
 def create_app(config_name='default'):
@@ -32,13 +45,22 @@ def create_app(config_name='default'):
     
     # Load configuration
     app.config.from_object(config[config_name])
+    query_capture.configure(app.config)
+    risk.validate_config(app.config)
+    
+    # Behind reverse proxies, take the client address (rate limits, login
+    # limits) from X-Forwarded-For instead of the proxy's own address
+    trusted_proxies = app.config.get('TRUSTED_PROXIES', 0)
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies)
     
     # Enable CORS for all routes
     CORS(app, resources={
         r"/api/*": {
             "origins": "*",
             "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization", "If-None-Match", "Idempotency-Key", "X-Admin-ID"],
+            "expose_headers": ["ETag", "Idempotent-Replayed"]
         }
     })
     
@@ -50,26 +72,48 @@ def create_app(config_name='default'):
     app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
     app.register_blueprint(job_bp, url_prefix='/api/jobs')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(bootstrap_bp, url_prefix='/api/bootstrap')
+    app.register_blueprint(region_bp, url_prefix='/api/regions')
+    app.register_blueprint(event_bp, url_prefix='/api/events')
+    
+    # Shed load and apply per-client quotas before any view runs
+    init_rate_limiting(app)
+    
+    # Compress large JSON responses
+    app.after_request(compress_response)
+    
+    # Delete expired sessions in the background
+    metrics.register_gauge('sessions_live', Session.count_live)
+    metrics.register_gauge('db_connections_open', open_connections)
+    start_session_sweeper(app)
+    
+    def serve_static(subdir, filename):
+        """Serve built (hashed, precompressed) assets when present, else the source file"""
+        if os.path.isfile(os.path.join(DIST_DIR, subdir, filename)):
+            return send_asset(os.path.join(DIST_DIR, subdir), filename, immutable=True)
+        return send_from_directory(os.path.join(PROJECT_ROOT, subdir), filename)
     
     # Serve index.html for root
     @app.route('/')
     def index():
+        if os.path.isfile(os.path.join(DIST_DIR, 'index.html')):
+            return send_asset(DIST_DIR, 'index.html')
         return send_file(os.path.join(PROJECT_ROOT, 'index.html'))
     
     # Serve pages directory
     @app.route('/pages/<path:filename>')
     def serve_pages(filename):
-        return send_from_directory(os.path.join(PROJECT_ROOT, 'pages'), filename)
+        return serve_static('pages', filename)
     
     # Serve css directory
     @app.route('/css/<path:filename>')
     def serve_css(filename):
-        return send_from_directory(os.path.join(PROJECT_ROOT, 'css'), filename)
+        return serve_static('css', filename)
     
     # Serve js directory
     @app.route('/js/<path:filename>')
     def serve_js(filename):
-        return send_from_directory(os.path.join(PROJECT_ROOT, 'js'), filename)
+        return serve_static('js', filename)
     
     # Health check endpoint
     @app.route('/api/health')
@@ -80,6 +124,17 @@ def create_app(config_name='default'):
             'version': '1.0.0'
         }), 200
     
+    # Process metrics (?format=prometheus for the text exposition format)
+    @app.route('/api/metrics')
+    def get_metrics():
+        values = metrics.snapshot()
+        if request.args.get('format') == 'prometheus':
+            return app.response_class(metrics.render_prometheus(values), mimetype='text/plain')
+        return jsonify({
+            'success': True,
+            'metrics': values
+        }), 200
+    
     # Handle favicon.ico
     @app.route('/favicon.ico')
     def favicon():
@@ -0,0 +1,131 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Archive Tier - Moves Finished Rows Out of the Hot Tables
+# =====================================================
+#
+# Resolved/rejected complaints and closed/filled jobs (with their
+# applications) older than ARCHIVE_AFTER_DAYS are moved to *_archive
+# tables. Each chunk is copied and deleted in one transaction, so a run
+# can be stopped at any point and simply started again.
+
+import time
+from backend.db import get_connection, get_settings
+from backend.versions import JOBS, bump_version
+
+
+def _shared_columns(cursor, table, archive_table):
+    """Columns present in both a hot table and its archive, in table order"""
+    cursor.execute("""
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+    """, (table,))
+    columns = [row['COLUMN_NAME'] for row in cursor.fetchall()]
+    cursor.execute("""
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (archive_table,))
+    archived = {row['COLUMN_NAME'] for row in cursor.fetchall()}
+    return [column for column in columns if column in archived]
+
+
+def _move_rows(cursor, table, key_column, ids):
+    """Copy rows (selected by key_column IN ids) to the archive, then delete them"""
+    archive_table = f"{table}_archive"
+    columns = ', '.join(f"`{column}`" for column in _shared_columns(cursor, table, archive_table))
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f"""
+        INSERT INTO {archive_table} ({columns}, archived_at)
+        SELECT {columns}, NOW() FROM {table}
+        WHERE {key_column} IN ({placeholders})
+    """, ids)
+    cursor.execute(f"DELETE FROM {table} WHERE {key_column} IN ({placeholders})", ids)
+    return cursor.rowcount
+
+
+# Which rows may be archived, per table (%s is the minimum age in days)
+ARCHIVE_RULES = {
+    'complaints': """
+        status IN ('resolved', 'rejected')
+        AND COALESCE(resolved_at, updated_at) < NOW() - INTERVAL %s DAY
+    """,
+    'jobs': """
+        status IN ('closed', 'filled')
+        AND updated_at < NOW() - INTERVAL %s DAY
+    """
+}
+
+
+def count_eligible(table, age_days):
+    """Count rows that the next run would archive"""
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) as count FROM {table} WHERE {ARCHIVE_RULES[table]}", (age_days,))
+        return cursor.fetchone()['count']
+    finally:
+        conn.close()
+
+
+def archive_chunk(table, age_days, chunk_size):
+    """Archive one chunk of eligible rows from a table; returns rows archived"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+
+        # The newest row always stays hot: MySQL 5.7 and older MariaDB reset
+        # AUTO_INCREMENT to MAX(id) + 1 on restart, which would reuse its id
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) as max_id FROM {table}")
+        max_id = cursor.fetchone()['max_id']
+
+        cursor.execute(f"""
+            SELECT id FROM {table}
+            WHERE {ARCHIVE_RULES[table]} AND id < %s
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE
+        """, (age_days, max_id, chunk_size))
+        ids = [row['id'] for row in cursor.fetchall()]
+        if not ids:
+            conn.commit()
+            return 0
+
+        if table == 'jobs':
+            # Applications would be cascade-deleted with their job, so they move first
+            _move_rows(cursor, 'job_applications', 'job_id', ids)
+
+        moved = _move_rows(cursor, table, 'id', ids)
+        if table == 'jobs':
+            bump_version(cursor, JOBS)
+        conn.commit()
+        return moved
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def archive_table(table, age_days=None, chunk_size=None, progress=None, pause=0):
+    """Archive all eligible rows of a table chunk by chunk
+
+    progress(table, done, total) is called after every chunk. Returns the
+    number of rows archived.
+    """
+    settings = get_settings()
+    if age_days is None:
+        age_days = settings.get('ARCHIVE_AFTER_DAYS', 180)
+    if chunk_size is None:
+        chunk_size = settings.get('ARCHIVE_CHUNK_SIZE', 500)
+
+    total = count_eligible(table, age_days)
+    done = 0
+    while True:
+        moved = archive_chunk(table, age_days, chunk_size)
+        if not moved:
+            break
+        done += moved
+        if progress:
+            progress(table, done, total)
+        time.sleep(pause)
+    return done
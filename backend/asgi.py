@@ -0,0 +1,200 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# ASGI Entry Point - Thread-Offloaded Serving
+# =====================================================
+#
+# Runs the unchanged Flask app under an asyncio server. The event loop
+# only handles sockets; every request runs its (blocking, PyMySQL) Flask
+# handler on a bounded thread pool. Read-heavy public routes get their
+# own pool, so slow admin or write requests cannot starve job-list and
+# dashboard reads, and long-lived event streams get a third, so open
+# streams cannot starve either. A streaming handler stops at its next
+# chunk once the client disconnects.
+#
+# Usage: uvicorn backend.asgi:app --host 0.0.0.0 --port 5000
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from backend.app import create_app
+
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope and request body into a WSGI environ"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body))
+    }
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = 'HTTP_' + name
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+
+class ThreadPoolASGI:
+    """ASGI adapter that runs a WSGI app on separate read, stream and default thread pools"""
+
+    def __init__(self, wsgi_app, read_pool_size, default_pool_size, read_prefixes,
+                 stream_pool_size=64, stream_prefixes=()):
+        self.wsgi_app = wsgi_app
+        self.read_prefixes = tuple(read_prefixes)
+        self.stream_prefixes = tuple(stream_prefixes)
+        self.read_pool = ThreadPoolExecutor(max_workers=read_pool_size, thread_name_prefix='asgi-read')
+        self.stream_pool = ThreadPoolExecutor(max_workers=stream_pool_size, thread_name_prefix='asgi-stream')
+        self.default_pool = ThreadPoolExecutor(max_workers=default_pool_size, thread_name_prefix='asgi-default')
+
+    def _pool_for(self, scope):
+        """GET/HEAD requests under a stream or read prefix use that pool"""
+        if scope['method'] in ('GET', 'HEAD'):
+            if self.stream_prefixes and scope['path'].startswith(self.stream_prefixes):
+                return self.stream_pool
+            if scope['path'].startswith(self.read_prefixes):
+                return self.read_pool
+        return self.default_pool
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        disconnected = threading.Event()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        def emit(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        def run():
+            """Run the WSGI app, streaming ('start' | 'body' | 'end' | 'error') events back"""
+            state = {}
+
+            def start_response(status, headers, exc_info=None):
+                if exc_info and state.get('started'):
+                    raise exc_info[1].with_traceback(exc_info[2])
+                state['response'] = (int(status.split(' ', 1)[0]), headers)
+                return lambda data: emit(('body', data))
+
+            def start_once():
+                if not state.get('started'):
+                    state['started'] = True
+                    emit(('start',) + state['response'])
+
+            try:
+                result = self.wsgi_app(build_environ(scope, body), start_response)
+                try:
+                    for chunk in result:
+                        start_once()
+                        if chunk:
+                            emit(('body', chunk))
+                        if disconnected.is_set():
+                            break
+                finally:
+                    if hasattr(result, 'close'):
+                        result.close()
+                start_once()
+                emit(('end',))
+            except Exception as e:
+                emit(('error', e))
+
+        self._pool_for(scope).submit(run)
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await self._send_events(events, send)
+        finally:
+            watcher.cancel()
+
+    @staticmethod
+    async def _send_events(events, send):
+        while True:
+            event = await events.get()
+            if event[0] == 'start':
+                _, status, headers = event
+                await send({
+                    'type': 'http.response.start',
+                    'status': status,
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                for name, value in headers]
+                })
+            elif event[0] == 'body':
+                await send({'type': 'http.response.body', 'body': event[1], 'more_body': True})
+            elif event[0] == 'end':
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+                return
+            else:
+                raise event[1]
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.read_pool.shutdown(wait=False)
+                self.stream_pool.shutdown(wait=False)
+                self.default_pool.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_name='default'):
+    """Create the Flask app wrapped for an ASGI server"""
+    flask_app = create_app(config_name)
+    return ThreadPoolASGI(
+        flask_app,
+        read_pool_size=flask_app.config.get('ASYNC_READ_POOL_SIZE', 32),
+        default_pool_size=flask_app.config.get('ASYNC_DEFAULT_POOL_SIZE', 8),
+        read_prefixes=flask_app.config.get('ASYNC_READ_PREFIXES', ()),
+        stream_pool_size=flask_app.config.get('ASYNC_STREAM_POOL_SIZE', 64),
+        stream_prefixes=flask_app.config.get('ASYNC_STREAM_PREFIXES', ())
+    )
+
+
+# Application instance for ASGI servers
+app = create_asgi_app(os.environ.get('FLASK_ENV', 'default'))
@@ -0,0 +1,292 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Versioned Result Cache for Hot Public Queries
+# =====================================================
+#
+# Query results are cached under keys that include the current version
+# of every resource they read (see backend/versions.py). A write bumps
+# the version, so old entries are never served again and simply age out
+# of the backend.
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from flask import has_request_context
+from backend.db import get_settings
+from backend.versions import get_versions
+
+try:
+    import fcntl
+except ImportError:  # Windows - file locks fall back to per-process locking
+    fcntl = None
+
+
+class MemoryBackend:
+    """In-process LRU store bounded by total value size in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, blob = entry
+            if expires_at < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return blob
+
+    def set(self, key, blob, ttl):
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, blob)
+            self.size += len(blob)
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def _remove(self, key):
+        _, blob = self._entries.pop(key)
+        self.size -= len(blob)
+
+    @contextmanager
+    def lock(self, key):
+        # Single-flight within the process is handled by ResultCache
+        yield
+
+
+class FileBackend:
+    """Directory-backed store shared by all worker processes on one host
+
+    Entries are written atomically (temp file + rename). Recency is
+    tracked with file mtimes, and the directory is trimmed back under
+    max_bytes oldest-first. Keys carry resource versions, so locks use a
+    fixed set of LOCK_STRIPES files instead of one file per key.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, suffix='.cache'):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + suffix)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, blob = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires_at < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return blob
+
+    def set(self, key, blob, ttl):
+        if len(blob) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((time.time() + ttl, blob), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._writes += 1
+        if self._writes % 20 == 0:
+            self._trim()
+
+    def _trim(self):
+        """Evict least recently used files until the directory fits"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            # Per-key .lock files from older versions, and temp files a
+            # crashed writer left behind, are removed as they are found
+            if name.endswith('.lock') or name.endswith('.tmp'):
+                path = os.path.join(self.directory, name)
+                try:
+                    if name.endswith('.lock') or os.stat(path).st_mtime < time.time() - 3600:
+                        os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith('.cache'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
+
+    @contextmanager
+    def lock(self, key):
+        """Cross-process single-flight lock on the key's stripe"""
+        if fcntl is None:
+            yield
+            return
+        stripe = int(hashlib.sha1(key.encode('utf-8')).hexdigest(), 16) % self.LOCK_STRIPES
+        with open(os.path.join(self.directory, f"stripe-{stripe:02d}.flock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class RedisBackend:
+    """Redis store (size bound comes from the server's maxmemory-policy allkeys-lru)"""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESULT_CACHE_BACKEND = 'redis' requires the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, blob, ttl):
+        self.client.set(key, blob, ex=int(ttl))
+
+    @contextmanager
+    def lock(self, key):
+        with self.client.lock('lock:' + key, timeout=30, blocking_timeout=30):
+            yield
+
+
+class ResultCache:
+    """Version-keyed query cache with single-flight recomputation"""
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    @contextmanager
+    def _single_flight(self, key):
+        """Let one thread per key recompute while the others wait for it"""
+        with self._inflight_lock:
+            lock, waiters = self._inflight.get(key, (threading.Lock(), 0))
+            self._inflight[key] = (lock, waiters + 1)
+        try:
+            with lock:
+                with self.backend.lock(key):
+                    yield
+        finally:
+            with self._inflight_lock:
+                lock, waiters = self._inflight[key]
+                if waiters == 1:
+                    del self._inflight[key]
+                else:
+                    self._inflight[key] = (lock, waiters - 1)
+
+    def get_or_load(self, resources, name, params, loader):
+        """Return the cached result of loader(), keyed by resource versions and params
+
+        The versions are read before loader() runs, on the replica the rest
+        of the request reads from (see db._replica_connection), so a stored
+        result is never older than the versions in its key.
+        """
+        if get_settings().get('MYSQL_REPLICAS') and not has_request_context():
+            # Outside a request the version and data reads may hit different
+            # replicas, and an old result could be stored under a new key
+            return loader()
+        try:
+            versions = get_versions(*resources)
+        except Exception:
+            # Without a version there is no safe key - go straight to the database
+            return loader()
+
+        version_part = ','.join(f"{resource}.{version}" for resource, version in sorted(versions.items()))
+        key = f"mlgms:{name}:{version_part}:{params!r}"
+
+        blob = self.backend.get(key)
+        if blob is None:
+            with self._single_flight(key):
+                # Another thread or process may have filled it while we waited
+                blob = self.backend.get(key)
+                if blob is None:
+                    self.misses += 1
+                    result = loader()
+                    self.backend.set(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), self.ttl)
+                    return result
+
+        self.hits += 1
+        return pickle.loads(blob)
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Get the process-wide result cache, creating it from config on first use"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                settings = get_settings()
+                backend_name = settings.get('RESULT_CACHE_BACKEND', 'memory')
+                max_bytes = settings.get('RESULT_CACHE_MAX_BYTES', 16 * 1024 * 1024)
+
+                if backend_name == 'file':
+                    backend = FileBackend(settings.get('RESULT_CACHE_DIR'), max_bytes)
+                elif backend_name == 'redis':
+                    backend = RedisBackend(settings.get('RESULT_CACHE_REDIS_URL'))
+                else:
+                    backend = MemoryBackend(max_bytes)
+
+                _result_cache = ResultCache(backend, settings.get('RESULT_CACHE_TTL', 300))
+    return _result_cache
+
+
+def cached_query(resources, name, params, loader):
+    """Shortcut for get_result_cache().get_or_load(...)"""
+    return get_result_cache().get_or_load(resources, name, params, loader)
@@ -0,0 +1,84 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Response Compression and Precompressed Static Assets
+# =====================================================
+
+import gzip
+import mimetypes
+import os
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip is used when brotli is not installed
+    brotli = None
+
+# One year - safe because built asset names change with their content
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def _preferred_encoding():
+    """Pick the best encoding the client accepts ('br', 'gzip' or None)"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """Compress JSON responses above COMPRESS_MIN_SIZE (registered as after_request)"""
+    if (response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype != 'application/json'):
+        return response
+
+    data = response.get_data()
+    if len(data) < current_app.config.get('COMPRESS_MIN_SIZE', 1024):
+        return response
+
+    encoding = _preferred_encoding()
+    if encoding is None:
+        return response
+
+    level = current_app.config.get('COMPRESS_LEVEL', 6)
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=min(level, 11))
+    else:
+        compressed = gzip.compress(data, compresslevel=level)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def send_asset(directory, filename, immutable=False):
+    """Serve a static file, preferring a precompressed .br/.gz sibling
+
+    Content-hashed build output is marked immutable. Everything else
+    (index.html, unbuilt source files) must be revalidated.
+    """
+    accepted = request.accept_encodings
+    mimetype = mimetypes.guess_type(filename)[0]
+    max_age = IMMUTABLE_MAX_AGE if immutable else None
+    response = None
+
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if accepted[encoding] and os.path.isfile(os.path.join(directory, filename + suffix)):
+            response = send_from_directory(directory, filename + suffix, mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+            break
+
+    if response is None:
+        response = send_from_directory(directory, filename, max_age=max_age)
+
+    response.vary.add('Accept-Encoding')
+    if immutable:
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
@@ -5,6 +5,19 @@
 
 import os
 
+
+def parse_replicas(value):
+    """Parse a 'host:port,host:port' string into replica settings"""
+    replicas = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(':')
+        replicas.append({'host': host, 'port': int(port) if port else 3306})
+    return replicas
+
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'mlgms-secret-key-2026-government-portal'
@@ -14,14 +27,160 @@ class Config:
     MYSQL_USER = 'root'
     MYSQL_PASSWORD = ''  # Default XAMPP has no password
     MYSQL_DB = 'mlgms_db'
+    MYSQL_PORT = 3306
     MYSQL_CURSORCLASS = 'DictCursor'
     
+    # Read Replicas - list of dicts with host/port (and optionally user/password/database)
+    # e.g. [{'host': 'localhost', 'port': 3307}]
+    MYSQL_REPLICAS = []
+    REPLICA_MAX_LAG_SECONDS = 5   # Skip replicas lagging more than this
+    REPLICA_HEALTH_TTL = 10       # Seconds between replica lag checks
+    READ_YOUR_WRITES_WINDOW = 5   # Seconds a client's reads stay on the primary after a write
+    
     # Session Configuration
     SESSION_TYPE = 'filesystem'
     SESSION_PERMANENT = False
     SESSION_USE_SIGNER = True
     PERMANENT_SESSION_LIFETIME = 3600  # 1 hour
     
+    # HTTP Caching for public read endpoints (ETag + Cache-Control)
+    PUBLIC_CACHE_MAX_AGE = 30     # Browser cache lifetime in seconds
+    PUBLIC_CACHE_S_MAXAGE = 60    # CDN / reverse proxy cache lifetime in seconds
+    
+    # Result cache for hot public queries (Job.get_all, Employer.get_all)
+    RESULT_CACHE_BACKEND = os.environ.get('RESULT_CACHE_BACKEND', 'memory')  # memory | file | redis
+    RESULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    RESULT_CACHE_TTL = 300
+    RESULT_CACHE_DIR = os.environ.get('RESULT_CACHE_DIR', '/tmp/mlgms_result_cache')
+    RESULT_CACHE_REDIS_URL = os.environ.get('RESULT_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Response compression (gzip, or brotli when installed)
+    COMPRESS_MIN_SIZE = 1024      # Bytes - smaller JSON responses are sent as-is
+    COMPRESS_LEVEL = 6
+    
+    # Page bootstrap endpoints
+    BOOTSTRAP_MAX_WORKERS = 8     # Threads shared by all requests to run page parts concurrently
+    
+    # Radius job search (/api/jobs/nearby)
+    NEARBY_DEFAULT_RADIUS_KM = 25
+    NEARBY_MAX_RADIUS_KM = 200
+    NEARBY_MAX_RESULTS = 50
+    
+    # Complaint analytics rollup (backend/rollup.py, refreshed by task_worker.py)
+    ROLLUP_INTERVAL = 300         # Seconds between incremental refreshes
+    ROLLUP_LAG_SECONDS = 120      # Watermark trails NOW() by this much for in-flight transactions
+    
+    # Complaint resolution SLA (backend/sla.py) - run maintenance.py rebuild-sla after changing
+    SLA_TARGET_HOURS = 168        # Default target: 7 days
+    SLA_TARGET_HOURS_BY_CATEGORY = {
+        'Safety Issues': 48,
+        'Workplace Harassment': 72,
+        'Non-Payment of Wages': 120
+    }
+    
+    # Complaint triage queue (backend/triage.py) - run maintenance.py rescore-complaints after changing
+    TRIAGE_CATEGORY_WEIGHTS = {
+        'Safety Issues': 50,
+        'Workplace Harassment': 40,
+        'Non-Payment of Wages': 30,
+        'Excessive Working Hours': 20,
+        'Accommodation Problems': 15,
+        'Contract Violation': 15
+    }
+    TRIAGE_DEFAULT_WEIGHT = 10    # Categories not listed above
+    TRIAGE_POINTS_PER_DAY = 5     # Added for every day a complaint waits
+    TRIAGE_REPEAT_WEIGHT = 5      # Per other recent complaint against the same employer
+    TRIAGE_REPEAT_CAP = 6         # Repeat complaints counted at most
+    TRIAGE_REPEAT_WINDOW_DAYS = 90
+    TRIAGE_MINOR_WEIGHT = 20      # Workers under 18
+    TRIAGE_SENIOR_WEIGHT = 10     # Workers 60 and over
+    
+    # Duplicate complaint detection (backend/dedup.py, runs in task_worker.py)
+    DEDUP_THRESHOLD = 0.5         # Estimated shingle overlap to count as a duplicate
+    DEDUP_WINDOW_DAYS = 30        # Only compare with complaints filed this recently
+    DEDUP_MAX_EMPLOYERS = 500     # Employer indexes kept in memory per worker process
+    
+    # Employer risk scores (backend/risk.py) - run maintenance.py rescore-employers after changing
+    RISK_CATEGORY_WEIGHTS = {
+        'Safety Issues': 3,
+        'Workplace Harassment': 3,
+        'Non-Payment of Wages': 2,
+        'Contract Violation': 2
+    }
+    RISK_DEFAULT_WEIGHT = 1       # Categories not listed above
+    RISK_HALF_LIFE_DAYS = 180     # A complaint counts half as much after this many days (at least 30)
+    RISK_LEVEL_THRESHOLDS = (3, 8)  # Scores from which an employer is medium / high risk
+    RISK_SNAPSHOT_SECONDS = 60    # Public employer reads show counts and scores up to this old
+    
+    # ASGI serving mode (backend/asgi.py) - bounded handler thread pools
+    ASYNC_READ_POOL_SIZE = 32     # GET/HEAD requests under ASYNC_READ_PREFIXES
+    ASYNC_DEFAULT_POOL_SIZE = 8   # Everything else (writes, admin, auth)
+    ASYNC_READ_PREFIXES = ('/api/jobs', '/api/employers', '/api/dashboard', '/api/bootstrap')
+    ASYNC_STREAM_POOL_SIZE = 64   # Long-lived event streams under ASYNC_STREAM_PREFIXES
+    ASYNC_STREAM_PREFIXES = ('/api/events/',)
+    
+    # Live status events (backend/events.py, GET /api/events/stream)
+    EVENTS_ENABLED = True
+    EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'memory')  # memory (one process) | redis
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL', 'redis://localhost:6379/2')
+    EVENTS_MAX_SUBSCRIBERS = 64       # Open streams per process; more get 503 (keep <= ASYNC_STREAM_POOL_SIZE)
+    EVENTS_QUEUE_SIZE = 100           # Undelivered events per stream before it is told to resync
+    EVENTS_REPLAY_SIZE = 100          # Recent events kept per channel for Last-Event-ID reconnects
+    EVENTS_HEARTBEAT_SECONDS = 15     # Keep-alive comment on idle streams
+    EVENTS_MAX_STREAM_SECONDS = 300   # Streams end after this; the browser reconnects
+    EVENTS_RETRY_MS = 3000            # Browser reconnect delay
+    
+    # Background task queue (backend/tasks.py, run with task_worker.py)
+    TASK_MAX_ATTEMPTS = 5
+    TASK_RETRY_BASE_SECONDS = 10      # Retry delay doubles after each failed attempt
+    TASK_RETRY_MAX_SECONDS = 3600     # Upper bound on the retry delay
+    TASK_LOCK_TIMEOUT = 600           # Running tasks older than this are assumed orphaned
+    TASK_CLAIM_SKIP_LOCKED = None     # None: use it if the server has it (MySQL 8.0+ / MariaDB 10.6+)
+    
+    # Expired session cleanup (backend/sweeper.py)
+    SESSION_SWEEP_INTERVAL = 300      # Seconds between sweeps; 0 disables the sweeper thread
+    SESSION_SWEEP_BATCH_SIZE = 500    # Rows deleted per transaction
+    SESSION_SWEEP_MAX_BATCHES = 100   # Per sweep, so one run cannot monopolise the table
+    SESSION_RETENTION_SECONDS = 0     # Keep expired sessions this long for audit
+    
+    # Archive tier (backend/archive.py, run with maintenance.py archive)
+    ARCHIVE_AFTER_DAYS = 180          # Finished complaints/jobs older than this leave the hot tables
+    ARCHIVE_CHUNK_SIZE = 500          # Rows moved per transaction
+    
+    # Monthly partitions (backend/partitioning.py, run with maintenance.py partition)
+    PARTITION_MONTHS_AHEAD = 3        # Empty monthly partitions kept ready beyond the current month
+    
+    # Rate limiting and admission control (backend/ratelimit.py)
+    RATE_LIMIT_ENABLED = True
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))  # Reverse proxies in front of the app; 0 uses the socket address
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory | redis
+    RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/1')
+    # (requests, per seconds) per client IP and per session, by endpoint or blueprint name
+    RATE_LIMITS = {
+        'auth.register': (60, 60),      # pbkdf2 on every call, but a whole camp may register from one NAT address
+        'auth.login': None,             # Only failures are limited (LOGIN_* below)
+        'employer.register': (20, 60),
+        'employer.login': None,
+        'admin.admin_login': (10, 60),
+        'job': (120, 60),
+        'employer': (120, 60),
+        'bootstrap': (120, 60)
+    }
+    RATE_LIMIT_DEFAULT = (300, 60)      # Other /api endpoints; None for no limit
+    ADMISSION_MAX_DB_CONNECTIONS = 64   # Per process; shed requests beyond this (0 disables)
+    
+    # Idempotency-Key replay for POST submissions (backend/idempotency.py, RESULT_CACHE_BACKEND store)
+    IDEMPOTENCY_TTL = 24 * 3600         # Seconds a response is replayed for its key
+    IDEMPOTENCY_MAX_BYTES = 4 * 1024 * 1024  # Memory backend size
+    
+    # Login attempt limiter (worker and employer logins)
+    LOGIN_FAILURE_WINDOW = 300        # Seconds failed logins are remembered
+    LOGIN_MAX_FAILURES_PER_IP = 30    # High enough for many workers behind one NAT address
+    LOGIN_MAX_FAILURES_PER_ID = 5     # Per migrant ID or employer ID
+    
+    # Query capture for index_advisor.py (JSON lines file; None disables)
+    QUERY_CAPTURE_FILE = os.environ.get('QUERY_CAPTURE_FILE')
+    
     # CORS Configuration
     CORS_ORIGINS = '*'
     
@@ -46,6 +205,8 @@ class ProductionConfig(Config):
     MYSQL_USER = os.environ.get('MYSQL_USER', 'root')
     MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD', '')
     MYSQL_DB = os.environ.get('MYSQL_DB', 'mlgms_db')
+    MYSQL_PORT = int(os.environ.get('MYSQL_PORT', 3306))
+    MYSQL_REPLICAS = parse_replicas(os.environ.get('MYSQL_REPLICAS', ''))
     SECRET_KEY = os.environ.get('SECRET_KEY', 'change-this-in-production')
 
 
@@ -54,6 +215,8 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     MYSQL_DB = 'mlgms_db_test'
+    SESSION_SWEEP_INTERVAL = 0
+    RATE_LIMIT_ENABLED = False
 
 
 # Configuration dictionary
@@ -0,0 +1,294 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Database Connection Routing - Primary and Read Replicas
+# =====================================================
+
+import random
+import re
+import threading
+import time
+import pymysql
+from flask import current_app, g, has_app_context, has_request_context, session
+from backend import query_capture
+from backend.config import Config
+
+# Replica health cache: {replica_index: (healthy, checked_at)}
+_replica_health = {}
+_health_lock = threading.Lock()
+
+# Connections currently open in this process (for admission control)
+_open_connections = 0
+_open_lock = threading.Lock()
+
+# Statements that change data; reads on the primary (logins, uniqueness
+# checks) do not start the read-your-writes window
+_WRITE_STATEMENT = re.compile(rb'^\s*(INSERT|UPDATE|DELETE|REPLACE|CALL)\b', re.IGNORECASE)
+
+
+def _count_connection(delta):
+    global _open_connections
+    with _open_lock:
+        _open_connections += delta
+
+
+def open_connections():
+    """Number of database connections this process holds right now"""
+    return _open_connections
+
+
+class TrackedConnection(pymysql.connections.Connection):
+    """Connection that keeps the open connection count up to date
+
+    It also remembers whether the open transaction wrote anything, so a
+    commit can start the client's read-your-writes window.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._wrote = False
+        super().__init__(*args, **kwargs)
+        self._tracked = True
+        _count_connection(1)
+
+    def query(self, sql, unbuffered=False):
+        statement = sql.encode(self.encoding) if isinstance(sql, str) else sql
+        if _WRITE_STATEMENT.match(statement):
+            self._wrote = True
+        return super().query(sql, unbuffered)
+
+    def commit(self):
+        super().commit()
+        if self._wrote:
+            self._wrote = False
+            _start_write_window(get_settings())
+
+    def rollback(self):
+        self._wrote = False
+        super().rollback()
+
+    def _untrack(self):
+        if getattr(self, '_tracked', False):
+            self._tracked = False
+            _count_connection(-1)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._untrack()
+
+    def __del__(self):
+        # Connections dropped without close() (error paths) still count down
+        self._untrack()
+
+
+def get_settings():
+    """Get configuration from the running app, or the base Config outside of it"""
+    if has_app_context():
+        return current_app.config
+    return {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+
+
+def _primary_params(settings):
+    """Connection parameters for the primary server"""
+    return {
+        'host': settings.get('MYSQL_HOST', 'localhost'),
+        'port': int(settings.get('MYSQL_PORT', 3306)),
+        'user': settings.get('MYSQL_USER', 'root'),
+        'password': settings.get('MYSQL_PASSWORD', ''),
+        'database': settings.get('MYSQL_DB', 'mlgms_db')
+    }
+
+
+def _replica_params(settings, replica):
+    """Connection parameters for a replica (missing keys inherit from the primary)"""
+    params = _primary_params(settings)
+    for key in ('host', 'port', 'user', 'password', 'database'):
+        if replica.get(key) is not None:
+            params[key] = replica[key]
+    params['port'] = int(params['port'])
+    return params
+
+
+def _connect(params):
+    """Open a new connection with the standard options"""
+    cursorclass = query_capture.CapturingCursor if query_capture.enabled() else pymysql.cursors.DictCursor
+    return TrackedConnection(
+        cursorclass=cursorclass,
+        autocommit=False,
+        **params
+    )
+
+
+def _pin_to_primary():
+    """Send the rest of this request to the primary"""
+    if has_request_context():
+        g.db_pinned_to_primary = True
+
+
+def _start_write_window(settings):
+    """Keep this client's reads on the primary for a short window after a committed write"""
+    if not has_request_context():
+        return
+    window = settings.get('READ_YOUR_WRITES_WINDOW', 0)
+    if window:
+        session['db_last_write'] = time.time()
+
+
+def _pinned_to_primary(settings):
+    """Check whether reads for the current request must see the primary"""
+    if not has_request_context():
+        return False
+    if g.get('db_pinned_to_primary'):
+        return True
+    last_write = session.get('db_last_write')
+    window = settings.get('READ_YOUR_WRITES_WINDOW', 0)
+    return bool(last_write and time.time() - last_write < window)
+
+
+def _replica_lag(conn):
+    """Return replication lag in seconds, or None if replication is broken"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SHOW REPLICA STATUS")
+    except pymysql.MySQLError:
+        # MySQL < 8.0.22 and MariaDB
+        cursor.execute("SHOW SLAVE STATUS")
+    status = cursor.fetchone()
+    cursor.close()
+
+    if not status:
+        # Not configured as a replica (e.g. a standalone local test instance)
+        return 0
+    if 'Seconds_Behind_Source' in status:
+        return status['Seconds_Behind_Source']
+    return status.get('Seconds_Behind_Master')
+
+
+def _mark_replica(index, healthy):
+    """Record the health of a replica"""
+    with _health_lock:
+        _replica_health[index] = (healthy, time.time())
+
+
+def _replica_connection(settings):
+    """Get a connection to a healthy replica, or None if none is usable
+
+    A request keeps reading the replica it first used. Replicas only move
+    forward, so rows read after the resource versions (ETags, result cache
+    keys) are at least as new as those versions; another replica could be
+    further behind. If that replica fails, the primary is used instead.
+    """
+    replicas = settings.get('MYSQL_REPLICAS') or []
+    if not replicas:
+        return None
+
+    max_lag = settings.get('REPLICA_MAX_LAG_SECONDS', 5)
+    health_ttl = settings.get('REPLICA_HEALTH_TTL', 10)
+    now = time.time()
+
+    sticky = has_request_context() and g.get('db_replica') is not None
+    if sticky:
+        candidates = [g.db_replica] if g.db_replica < len(replicas) else []
+    else:
+        candidates = list(range(len(replicas)))
+        random.shuffle(candidates)
+
+    for index in candidates:
+        with _health_lock:
+            healthy, checked_at = _replica_health.get(index, (True, 0))
+        fresh = now - checked_at < health_ttl
+
+        if fresh and not healthy:
+            continue
+
+        try:
+            conn = _connect(_replica_params(settings, replicas[index]))
+        except pymysql.MySQLError:
+            _mark_replica(index, False)
+            continue
+
+        if fresh:
+            return _stick_to_replica(index, conn)
+
+        # Health check is stale - re-measure lag on this connection
+        try:
+            lag = _replica_lag(conn)
+        except pymysql.MySQLError:
+            lag = None
+
+        if lag is None or lag > max_lag:
+            _mark_replica(index, False)
+            conn.close()
+            continue
+
+        _mark_replica(index, True)
+        return _stick_to_replica(index, conn)
+
+    if sticky:
+        # The replica this request read from is gone; only the primary is
+        # guaranteed to be at least as new
+        g.db_pinned_to_primary = True
+    return None
+
+
+def _stick_to_replica(index, conn):
+    if has_request_context():
+        g.db_replica = index
+    return conn
+
+
+def get_connection(readonly=False):
+    """Get database connection
+
+    Read-only callers are routed to a read replica when one is configured,
+    healthy and within the allowed lag. Everything else goes to the primary,
+    and once a request has used the primary its later reads stay there.
+    """
+    settings = get_settings()
+
+    if readonly:
+        if not _pinned_to_primary(settings):
+            conn = _replica_connection(settings)
+            if conn is not None:
+                return conn
+    else:
+        _pin_to_primary()
+
+    return _connect(_primary_params(settings))
+
+
+_skip_locked = None
+
+
+def supports_skip_locked(conn):
+    """Whether the server behind conn accepts FOR UPDATE SKIP LOCKED (MySQL 8.0+, MariaDB 10.6+)
+
+    Checked once per process from the server version in the handshake.
+    """
+    global _skip_locked
+    if _skip_locked is None:
+        version = conn.get_server_info()
+        if version.startswith('5.5.5-'):
+            # MariaDB before 11 prefixes its version for old clients
+            version = version[len('5.5.5-'):]
+        numbers = tuple(int(part) for part in re.findall(r'\d+', version)[:2])
+        minimum = (10, 6) if 'mariadb' in version.lower() else (8, 0)
+        _skip_locked = numbers >= minimum
+    return _skip_locked
+
+
+def replica_status():
+    """Get the cached health of each configured replica"""
+    settings = get_settings()
+    replicas = settings.get('MYSQL_REPLICAS') or []
+    status = []
+    with _health_lock:
+        for index, replica in enumerate(replicas):
+            healthy, checked_at = _replica_health.get(index, (None, None))
+            status.append({
+                'host': replica.get('host'),
+                'port': replica.get('port'),
+                'healthy': healthy,
+                'checked_at': checked_at
+            })
+    return status
@@ -0,0 +1,315 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Duplicate Complaint Detection - MinHash Fingerprints and LSH
+# =====================================================
+#
+# Workers from one site often file near-identical complaints against the
+# same employer. Each complaint's description is reduced to a MinHash
+# signature (NUM_PERM minimums over its character shingles); two
+# signatures agree in about the same fraction of positions as the texts'
+# shingle sets overlap (Jaccard similarity).
+#
+# Complaint.create only queues a 'fingerprint_complaint' task, so the
+# hashing runs in task_worker.py, never on the request thread. The worker
+# keeps an LSH index per employer in memory: the signature is cut into
+# BANDS bands, and complaints sharing any band are candidates, checked
+# against DEDUP_THRESHOLD. Matches are linked into one cluster (the lowest
+# complaint id in it), stored in complaint_fingerprints, which admins can
+# resolve in one go.
+#
+# Several worker processes each have their own index; before a lookup the
+# index loads the employer's fingerprints other processes stored since
+# (by complaint_fingerprints.seq), drops the ones now older than
+# DEDUP_WINDOW_DAYS, and the employer row is locked so two duplicates
+# cannot miss each other.
+#
+# A complaint an admin unlinks is marked (complaint_fingerprints.unlinked)
+# and never merged into a cluster again, by new complaints or backfills.
+
+import hashlib
+import heapq
+import random
+import re
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from backend.db import get_connection, get_settings
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+# Fixed seed: stored signatures must stay comparable across processes and restarts
+_random = random.Random(20240101)
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_SIGNATURE_FORMAT = f'<{NUM_PERM}I'
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def shingles(text):
+    """Character shingles of the text with case, punctuation and spacing ignored"""
+    text = re.sub(r'[\W_]+', ' ', (text or '').lower()).strip()
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM ints) of a description"""
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+              for shingle in shingles(text)]
+    if not hashes:
+        return [_MASK] * NUM_PERM
+    return [min((a * value + b) % _PRIME for value in hashes) & _MASK for a, b in _PERMUTATIONS]
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+
+def pack(sig):
+    return struct.pack(_SIGNATURE_FORMAT, *sig)
+
+
+def unpack(blob):
+    return list(struct.unpack(_SIGNATURE_FORMAT, blob))
+
+
+def _bands(sig):
+    return [(band, tuple(sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])) for band in range(BANDS)]
+
+
+class EmployerIndex:
+    """LSH buckets over one employer's recent complaint signatures"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.signatures = {}
+        self.last_seq = 0
+        # (created_at, complaint_id), oldest first, for evict()
+        self._ages = []
+
+    def add(self, complaint_id, sig, seq, created_at):
+        self.last_seq = max(self.last_seq, seq)
+        if complaint_id in self.signatures:
+            return
+        self.signatures[complaint_id] = sig
+        for key in _bands(sig):
+            self.buckets.setdefault(key, set()).add(complaint_id)
+        heapq.heappush(self._ages, (created_at, complaint_id))
+
+    def evict(self, cutoff):
+        """Drop the complaints filed before cutoff"""
+        while self._ages and self._ages[0][0] < cutoff:
+            _, complaint_id = heapq.heappop(self._ages)
+            for key in _bands(self.signatures.pop(complaint_id)):
+                bucket = self.buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(complaint_id)
+                    if not bucket:
+                        del self.buckets[key]
+
+    def load(self, cursor, employer_id, window_days):
+        """Add the fingerprints stored since the last load (by any process) and drop expired ones"""
+        cutoff = datetime.now() - timedelta(days=window_days)
+        self.evict(cutoff)
+        cursor.execute("""
+            SELECT seq, complaint_id, signature, created_at FROM complaint_fingerprints
+            WHERE employer_id = %s AND seq > %s AND created_at >= %s AND NOT unlinked
+            ORDER BY seq
+        """, (employer_id, self.last_seq, cutoff))
+        for row in cursor.fetchall():
+            self.add(row['complaint_id'], unpack(row['signature']), row['seq'], row['created_at'])
+
+    def matches(self, sig, threshold):
+        """Complaint ids whose signatures are at least threshold similar"""
+        candidates = set()
+        for key in _bands(sig):
+            candidates |= self.buckets.get(key, set())
+        return [complaint_id for complaint_id in candidates
+                if similarity(sig, self.signatures[complaint_id]) >= threshold]
+
+
+def _get_index(employer_id):
+    """This process's index for an employer (least recently used ones are dropped)"""
+    with _indexes_lock:
+        index = _indexes.pop(employer_id, None) or EmployerIndex()
+        _indexes[employer_id] = index
+        while len(_indexes) > get_settings().get('DEDUP_MAX_EMPLOYERS', 500):
+            _indexes.popitem(last=False)
+    return index
+
+
+def fingerprint(complaint_id):
+    """Fingerprint one complaint and link it to its duplicates; returns its cluster id or None"""
+    settings = get_settings()
+    threshold = settings.get('DEDUP_THRESHOLD', 0.5)
+    window_days = settings.get('DEDUP_WINDOW_DAYS', 30)
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, employer_id, description, created_at FROM complaints WHERE id = %s
+        """, (complaint_id,))
+        complaint = cursor.fetchone()
+        if not complaint or not complaint['employer_id']:
+            conn.commit()
+            return None
+        employer_id = complaint['employer_id']
+        sig = signature(complaint['description'])
+
+        # One fingerprint at a time per employer, across worker processes
+        cursor.execute("SELECT id FROM employers WHERE id = %s FOR UPDATE", (employer_id,))
+        index = _get_index(employer_id)
+        index.load(cursor, employer_id, window_days)
+
+        cursor.execute("SELECT unlinked FROM complaint_fingerprints WHERE complaint_id = %s",
+                       (complaint['id'],))
+        existing = cursor.fetchone()
+        unlinked = bool(existing and existing['unlinked'])
+
+        # An admin split this complaint off; it stays on its own
+        matches = [] if unlinked else [match for match in index.matches(sig, threshold)
+                                       if match != complaint['id']]
+        cluster_id = complaint['id']
+        clusters = []
+        if matches:
+            placeholders = ', '.join(['%s'] * len(matches))
+            # Complaints unlinked since this index loaded them are not merged either
+            cursor.execute(f"""
+                SELECT DISTINCT cluster_id FROM complaint_fingerprints
+                WHERE complaint_id IN ({placeholders}) AND NOT unlinked
+            """, matches)
+            clusters = [row['cluster_id'] for row in cursor.fetchall()]
+        if clusters:
+            cluster_id = min(clusters + [complaint['id']])
+            # Merge every cluster the complaint matched into one
+            cursor.execute(f"""
+                UPDATE complaint_fingerprints SET cluster_id = %s
+                WHERE employer_id = %s AND cluster_id IN ({', '.join(['%s'] * len(clusters))}) AND NOT unlinked
+            """, [cluster_id, employer_id] + clusters)
+
+        cursor.execute("""
+            INSERT INTO complaint_fingerprints (complaint_id, employer_id, cluster_id, signature, created_at)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE cluster_id = VALUES(cluster_id), signature = VALUES(signature)
+        """, (complaint['id'], employer_id, cluster_id, pack(sig), complaint['created_at']))
+        seq = cursor.lastrowid
+        conn.commit()
+        if not unlinked:
+            index.add(complaint['id'], sig, seq or 0, complaint['created_at'])
+        return cluster_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def unfingerprinted(after_id=0, limit=200):
+    """(last id, ids) of complaints with an employer and no fingerprint yet, for backfills"""
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.id FROM complaints c
+            LEFT JOIN complaint_fingerprints f ON f.complaint_id = c.id
+            WHERE c.id > %s AND c.employer_id IS NOT NULL AND f.complaint_id IS NULL
+            ORDER BY c.id
+            LIMIT %s
+        """, (after_id, limit))
+        ids = [row['id'] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+    return (ids[-1] if ids else None), ids
+
+
+def clusters(employer_id=None, limit=100):
+    """Clusters with at least two open complaints, largest first, with their members"""
+    query = """
+        SELECT f.cluster_id, f.employer_id, e.company_name as employer_name, COUNT(*) as open_count
+        FROM complaint_fingerprints f
+        JOIN complaints c ON c.id = f.complaint_id
+        LEFT JOIN employers e ON f.employer_id = e.id
+        WHERE c.status IN ('pending', 'in_progress')
+    """
+    params = []
+    if employer_id:
+        query += " AND f.employer_id = %s"
+        params.append(employer_id)
+    query += """
+        GROUP BY f.cluster_id, f.employer_id, e.company_name
+        HAVING COUNT(*) > 1
+        ORDER BY open_count DESC, f.cluster_id
+        LIMIT %s
+    """
+    params.append(int(limit))
+
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        if results:
+            ids = [row['cluster_id'] for row in results]
+            cursor.execute(f"""
+                SELECT f.cluster_id, c.id, c.complaint_id, c.category, c.description, c.status,
+                       c.created_at, w.name as worker_name, w.migrant_id
+                FROM complaint_fingerprints f
+                JOIN complaints c ON c.id = f.complaint_id
+                JOIN workers w ON c.worker_id = w.id
+                WHERE f.cluster_id IN ({', '.join(['%s'] * len(ids))})
+                ORDER BY c.id
+            """, ids)
+            members = {}
+            for row in cursor.fetchall():
+                members.setdefault(row.pop('cluster_id'), []).append(row)
+            for cluster in results:
+                cluster['complaints'] = members.get(cluster['cluster_id'], [])
+    finally:
+        conn.close()
+    return results
+
+
+def cluster_members(cursor, cluster_id):
+    """Ids of the open complaints in a cluster, locked for update"""
+    cursor.execute("""
+        SELECT c.id FROM complaint_fingerprints f
+        JOIN complaints c ON c.id = f.complaint_id
+        WHERE f.cluster_id = %s AND c.status IN ('pending', 'in_progress')
+        ORDER BY c.id
+        FOR UPDATE
+    """, (cluster_id,))
+    return [row['id'] for row in cursor.fetchall()]
+
+
+def unlink(cursor, complaint_id):
+    """Take a complaint out of its cluster for good (not a duplicate after all); returns True if it had a fingerprint"""
+    cursor.execute("SELECT cluster_id FROM complaint_fingerprints WHERE complaint_id = %s FOR UPDATE",
+                   (complaint_id,))
+    row = cursor.fetchone()
+    if not row:
+        return False
+    if row['cluster_id'] == complaint_id:
+        # The cluster is named after this complaint; hand the name to the next member
+        cursor.execute("""
+            SELECT MIN(complaint_id) as next_id FROM complaint_fingerprints
+            WHERE cluster_id = %s AND complaint_id != %s
+        """, (complaint_id, complaint_id))
+        next_id = cursor.fetchone()['next_id']
+        if next_id:
+            cursor.execute("""
+                UPDATE complaint_fingerprints SET cluster_id = %s
+                WHERE cluster_id = %s AND complaint_id != %s
+            """, (next_id, complaint_id, complaint_id))
+    cursor.execute("UPDATE complaint_fingerprints SET cluster_id = %s, unlinked = 1 WHERE complaint_id = %s",
+                   (complaint_id, complaint_id))
+    return True
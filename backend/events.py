@@ -0,0 +1,241 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Status Events - Pub/Sub Fan-out for the Server-Sent Events Stream
+# =====================================================
+#
+# Complaint and application status changes are published, after their
+# transaction commits, to channels:
+#   - worker:<id>    the worker who filed the complaint / applied
+#   - employer:<id>  the employer whose job was applied to (applications
+#                    only; employers never see complaints against them)
+#   - admin          every admin
+# GET /api/events/stream (routes/event_routes.py) subscribes a browser to
+# its channels, and the pages apply each event to the row already on
+# screen instead of reloading their lists.
+#
+# The memory broker fans out to subscribers in this process only. With
+# EVENTS_BACKEND = 'redis' events are published through Redis pub/sub, and
+# one listener thread per process hands them to its local subscribers, so
+# a change made on any worker process reaches every stream.
+#
+# Each channel keeps its last EVENTS_REPLAY_SIZE events, so a reconnecting
+# EventSource (Last-Event-ID) gets what it missed. When that is no longer
+# possible (the events were evicted, or a slow subscriber's queue filled
+# up) the stream sends 'resync' and the page reloads its list instead.
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from backend.db import get_settings
+
+ADMIN = 'admin'
+
+REDIS_PREFIX = 'mlgms:events:'
+
+
+def worker_channel(worker_id):
+    return f"worker:{worker_id}"
+
+
+def employer_channel(employer_id):
+    return f"employer:{employer_id}"
+
+
+class Subscription:
+    """One stream's bounded queue of (event_id, event_type, data)"""
+
+    def __init__(self, broker, channels, max_queue):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.resync = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Dropping silently would leave the page wrong; make it reload instead
+            self.resync = True
+
+    def get(self, timeout):
+        """Next event, or None after timeout seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class MemoryBroker:
+    """In-process fan-out with a per-channel replay buffer"""
+
+    def __init__(self, replay_size, max_queue):
+        self.replay_size = replay_size
+        self.max_queue = max_queue
+        self._subscribers = {}
+        self._replay = {}
+        # Events at or before a channel's floor may have been evicted from its buffer
+        self._floors = {}
+        self._started = time.time_ns()
+        self._lock = threading.Lock()
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({id(sub) for subs in self._subscribers.values() for sub in subs})
+
+    def subscribe(self, channels, last_event_id=None):
+        """Subscribe to channels, first queueing the events after last_event_id"""
+        sub = Subscription(self, channels, self.max_queue)
+        with self._lock:
+            for channel in sub.channels:
+                self._subscribers.setdefault(channel, set()).add(sub)
+            if last_event_id is not None:
+                # An event sent to several of the channels is replayed once
+                missed = {}
+                for channel in sub.channels:
+                    if last_event_id < self._floors.get(channel, self._started):
+                        sub.resync = True
+                    missed.update((event[0], event) for event in self._replay.get(channel, ()) if event[0] > last_event_id)
+                for event_id in sorted(missed):
+                    sub.deliver(missed[event_id])
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for channel in sub.channels:
+                subs = self._subscribers.get(channel)
+                if subs:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subscribers[channel]
+
+    def publish(self, channels, event):
+        self.deliver(channels, event)
+
+    def deliver(self, channels, event):
+        """Hand an event to this process's subscribers of any of the channels"""
+        targets = set()
+        with self._lock:
+            for channel in channels:
+                buffer = self._replay.setdefault(channel, deque())
+                buffer.append(event)
+                if len(buffer) > self.replay_size:
+                    self._floors[channel] = buffer.popleft()[0]
+                targets |= self._subscribers.get(channel, set())
+        for sub in targets:
+            sub.deliver(event)
+
+
+class RedisBroker(MemoryBroker):
+    """Publishes through Redis; a listener thread fans events out to local subscribers"""
+
+    def __init__(self, url, replay_size, max_queue):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("EVENTS_BACKEND = 'redis' requires the redis package (pip install redis)")
+        super().__init__(replay_size, max_queue)
+        self.client = redis.Redis.from_url(url)
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(REDIS_PREFIX + '*')
+        threading.Thread(target=self._listen, name='events-listener', daemon=True).start()
+
+    def publish(self, channels, event):
+        self.client.publish(REDIS_PREFIX + 'fanout', json.dumps([list(channels), list(event)]))
+
+    def _listen(self):
+        while True:
+            try:
+                for message in self._pubsub.listen():
+                    channels, event = json.loads(message['data'])
+                    self.deliver(channels, tuple(event))
+            except Exception:
+                # Connection lost: events published meanwhile are gone, so
+                # make every current stream resync, then reconnect
+                with self._lock:
+                    subs = {sub for subs in self._subscribers.values() for sub in subs}
+                    self._started = time.time_ns()
+                for sub in subs:
+                    sub.resync = True
+                time.sleep(1)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Process-wide broker chosen by EVENTS_BACKEND"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                settings = get_settings()
+                replay_size = settings.get('EVENTS_REPLAY_SIZE', 100)
+                max_queue = settings.get('EVENTS_QUEUE_SIZE', 100)
+                if settings.get('EVENTS_BACKEND', 'memory') == 'redis':
+                    _broker = RedisBroker(settings.get('EVENTS_REDIS_URL'), replay_size, max_queue)
+                else:
+                    _broker = MemoryBroker(replay_size, max_queue)
+    return _broker
+
+
+def publish(channels, event_type, data):
+    """Send an event to the channels' subscribers; never raises (the change is already committed)"""
+    if not get_settings().get('EVENTS_ENABLED', True):
+        return
+    try:
+        get_broker().publish(channels, (time.time_ns(), event_type, data))
+    except Exception:
+        pass
+
+
+def format_event(event):
+    """An event in text/event-stream framing"""
+    event_id, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def complaint_changed(complaint, status, **fields):
+    """Push a complaint's new status to its worker and the admins (complaint: the row before the change)"""
+    data = {
+        'id': complaint['id'],
+        'complaint_id': complaint['complaint_id'],
+        'status': status,
+        'previous_status': complaint.get('status'),
+        **fields
+    }
+    publish([worker_channel(complaint['worker_id']), ADMIN], 'complaint', data)
+
+
+def lock_application(cursor, application_id):
+    """Fetch an application (by id or application_id) and its job's employer with FOR UPDATE"""
+    cursor.execute("""
+        SELECT a.id, a.application_id, a.job_id, a.worker_id, a.status, j.employer_id
+        FROM job_applications a
+        JOIN jobs j ON a.job_id = j.id
+        WHERE a.id = %s OR a.application_id = %s
+        FOR UPDATE
+    """, (application_id, application_id))
+    return cursor.fetchone()
+
+
+def application_changed(application, status):
+    """Push an application's new status to its worker, the job's employer and the admins
+
+    application is the row before the change (see lock_application), or
+    the new row with status None for a new application.
+    """
+    data = {
+        'id': application['id'],
+        'application_id': application['application_id'],
+        'job_id': application['job_id'],
+        'status': status,
+        'previous_status': application.get('status')
+    }
+    publish([worker_channel(application['worker_id']), employer_channel(application['employer_id']), ADMIN],
+            'application', data)
@@ -0,0 +1,157 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Geo Lookup - Gazetteer, Geohash Cells and Distances
+# =====================================================
+#
+# Locations are free text ("Mumbai, Maharashtra", "Delhi NCR"). geocode()
+# matches them against the bundled gazetteer of Indian cities
+# (database/data/gazetteer_in.csv: name, state, latitude, longitude and
+# |-separated aliases) and returns city-level coordinates, or None.
+#
+# Jobs store a geohash of their coordinates (GEOHASH_PRECISION characters,
+# about 1.2 x 0.6 km). A radius search turns its bounding box into a few
+# geohash prefixes (covering_prefixes) that the (status, geohash) index
+# answers as range scans, then filters by exact distance.
+
+import csv
+import math
+import os
+import re
+import threading
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'database', 'data', 'gazetteer_in.csv')
+
+GEOHASH_PRECISION = 6
+MAX_COVERING_CELLS = 16
+EARTH_RADIUS_KM = 6371.0
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+_places = None
+_states = None
+_lock = threading.Lock()
+
+
+def normalize(text):
+    """Lowercase text with punctuation collapsed to single spaces"""
+    return re.sub(r'[^a-z0-9]+', ' ', (text or '').lower()).strip()
+
+
+def load_gazetteer(path=GAZETTEER_FILE):
+    """Get {normalized name or alias: [place]} for the gazetteer file"""
+    places = {}
+    with open(path, encoding='utf-8', newline='') as gazetteer:
+        for row in csv.DictReader(gazetteer):
+            place = {
+                'name': row['name'],
+                'state': row['state'],
+                'latitude': float(row['latitude']),
+                'longitude': float(row['longitude'])
+            }
+            names = [row['name']] + [alias for alias in (row.get('aliases') or '').split('|') if alias]
+            for name in names:
+                places.setdefault(normalize(name), []).append(place)
+    return places
+
+
+def get_gazetteer():
+    """Get the gazetteer, loaded on first use"""
+    global _places, _states
+    if _places is None:
+        with _lock:
+            if _places is None:
+                places = load_gazetteer()
+                _states = {normalize(place['state']) for matches in places.values() for place in matches}
+                _places = places
+    return _places
+
+
+def geocode(location):
+    """Get the gazetteer place for a free-text location, or None
+
+    Every comma-separated part is tried as a city name, first to last.
+    A part naming a state is used to pick between cities with the same
+    name (Aurangabad, Bilaspur).
+    """
+    places = get_gazetteer()
+    parts = [normalize(part) for part in re.split(r'[,/;]', location or '')]
+    parts = [part for part in parts if part]
+    given_states = {part for part in parts if part in _states}
+
+    for part in parts:
+        matches = places.get(part)
+        if not matches:
+            continue
+        for place in matches:
+            if normalize(place['state']) in given_states:
+                return place
+        return matches[0]
+    return None
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode coordinates as a geohash string"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if target >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def _cell_size(precision):
+    """(degrees of latitude, degrees of longitude) of one geohash cell"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, min_lon, max_lat, max_lon) around a point"""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lon_delta = lat_delta / max(math.cos(math.radians(latitude)), 0.01)
+    return (max(latitude - lat_delta, -90.0), max(longitude - lon_delta, -180.0),
+            min(latitude + lat_delta, 90.0), min(longitude + lon_delta, 180.0))
+
+
+def covering_prefixes(latitude, longitude, radius_km, max_cells=MAX_COVERING_CELLS):
+    """Geohash prefixes whose cells together cover the circle's bounding box
+
+    Uses the longest prefix (smallest cells) that needs at most max_cells.
+    """
+    min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lon = _cell_size(precision)
+        rows = math.floor(max_lat / cell_lat) - math.floor(min_lat / cell_lat) + 1
+        cols = math.floor(max_lon / cell_lon) - math.floor(min_lon / cell_lon) + 1
+        if rows * cols <= max_cells or precision == 1:
+            break
+
+    prefixes = set()
+    for row in range(rows):
+        for col in range(cols):
+            # Centre of each grid cell overlapping the box
+            lat = (math.floor(min_lat / cell_lat) + row + 0.5) * cell_lat
+            lon = (math.floor(min_lon / cell_lon) + col + 0.5) * cell_lon
+            prefixes.add(geohash(max(min(lat, 89.999), -89.999), max(min(lon, 179.999), -179.999), precision))
+    return sorted(prefixes)
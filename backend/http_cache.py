@@ -0,0 +1,52 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# HTTP Caching - ETags and Cache-Control for Public Reads
+# =====================================================
+
+from functools import wraps
+from flask import current_app, make_response, request
+from backend.versions import get_versions
+
+
+def build_etag(versions):
+    """Build an ETag value from resource versions, e.g. 'employers.4-jobs.12'"""
+    return '-'.join(f"{resource}.{version}" for resource, version in sorted(versions.items()))
+
+
+def conditional_get(*resources, extra=None):
+    """Decorator adding ETag / If-None-Match support to a public GET endpoint
+
+    The ETag is derived from the version counters of the resources the
+    endpoint reads, so a matching request is answered with 304 before the
+    view (and its queries) run at all. The versions are read first, and the
+    view's reads stay on the same replica (see db._replica_connection), so
+    the body is never older than its ETag. extra() may add parts for data
+    that is not versioned, e.g. risk.etag_part.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                versions = get_versions(*resources)
+                if extra:
+                    versions.update(extra())
+                etag = build_etag(versions)
+            except Exception:
+                # Version table unavailable - serve uncached rather than fail
+                return f(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            # Weak, so compressed and uncompressed bodies share the tag
+            response.set_etag(etag, weak=True)
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config.get('PUBLIC_CACHE_MAX_AGE', 60)
+            response.cache_control.s_maxage = current_app.config.get('PUBLIC_CACHE_S_MAXAGE', 300)
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,122 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Idempotency-Key Support for POST Endpoints
+# =====================================================
+#
+# A client sends the same Idempotency-Key header on every retry of one
+# submission. The first response is stored for IDEMPOTENCY_TTL seconds
+# under (principal, key), and retries get that stored response back with
+# Idempotent-Replayed: true instead of running the view again. Requests
+# without the header behave as before.
+#
+# Responses are kept in the result cache's backend type (memory, file or
+# redis - see backend/cache.py). 5xx responses are not stored, so the
+# client can retry them.
+
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from backend.cache import FileBackend, MemoryBackend, RedisBackend
+from backend.db import get_settings
+from backend.ratelimit import principal
+
+MAX_KEY_LENGTH = 128
+
+_store = None
+_store_lock = threading.Lock()
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+
+def get_store():
+    """Get the process-wide response store, created from config on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                backend_name = settings.get('RESULT_CACHE_BACKEND', 'memory')
+                max_bytes = settings.get('IDEMPOTENCY_MAX_BYTES', 4 * 1024 * 1024)
+                if backend_name == 'file':
+                    _store = FileBackend(settings.get('RESULT_CACHE_DIR') + '_idempotency', max_bytes)
+                elif backend_name == 'redis':
+                    _store = RedisBackend(settings.get('RESULT_CACHE_REDIS_URL'))
+                else:
+                    _store = MemoryBackend(max_bytes)
+    return _store
+
+
+@contextmanager
+def _key_lock(store, key):
+    """Serialise requests with the same key (double taps arrive together)"""
+    with _key_locks_lock:
+        lock, users = _key_locks.get(key, (threading.Lock(), 0))
+        _key_locks[key] = (lock, users + 1)
+    try:
+        with lock:
+            with store.lock(key):
+                yield
+    finally:
+        with _key_locks_lock:
+            lock, users = _key_locks[key]
+            if users == 1:
+                del _key_locks[key]
+            else:
+                _key_locks[key] = (lock, users - 1)
+
+
+def _request_fingerprint():
+    return hashlib.sha256(request.get_data() or b'').hexdigest()
+
+
+def _replay(entry):
+    response = current_app.response_class(entry['body'], status=entry['status'],
+                                          mimetype=entry['mimetype'])
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Decorator: replay the stored response for a repeated Idempotency-Key"""
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if not idempotency_key:
+            return view(*args, **kwargs)
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            return jsonify({
+                'success': False,
+                'message': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'
+            }), 400
+
+        caller = principal() or f"ip:{request.remote_addr}"
+        key = f"mlgms:idem:{request.endpoint}:{caller}:{idempotency_key}"
+        fingerprint = _request_fingerprint()
+        store = get_store()
+
+        with _key_lock(store, key):
+            blob = store.get(key)
+            if blob is not None:
+                entry = json.loads(blob)
+                if entry['fingerprint'] != fingerprint:
+                    return jsonify({
+                        'success': False,
+                        'message': 'Idempotency-Key was already used for a different request'
+                    }), 422
+                return _replay(entry)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code < 500 and not response.direct_passthrough:
+                entry = {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'mimetype': response.mimetype,
+                    'body': response.get_data(as_text=True)
+                }
+                store.set(key, json.dumps(entry).encode('utf-8'),
+                          current_app.config.get('IDEMPOTENCY_TTL', 24 * 3600))
+            return response
+    return decorated_function
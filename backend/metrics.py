@@ -0,0 +1,49 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Process Metrics - Counters and Gauges
+# =====================================================
+#
+# Counters are kept per process (as Prometheus expects; sum across
+# workers when graphing). Gauges are callbacks evaluated at scrape time,
+# so values read from the database are always current.
+
+import threading
+
+_counters = {}
+_gauges = {}
+_lock = threading.Lock()
+
+
+def increment(name, value=1):
+    """Add to a counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def register_gauge(name, func):
+    """Register a callback that returns the current value of a gauge"""
+    _gauges[name] = func
+
+
+def snapshot():
+    """Get {name: value} for every counter and gauge (failing gauges are None)"""
+    with _lock:
+        values = dict(_counters)
+    for name, func in _gauges.items():
+        try:
+            values[name] = func()
+        except Exception:
+            values[name] = None
+    return values
+
+
+def render_prometheus(values):
+    """Format a snapshot in the Prometheus text exposition format"""
+    lines = []
+    for name in sorted(values):
+        if values[name] is None:
+            continue
+        kind = 'counter' if name.endswith('_total') else 'gauge'
+        lines.append(f"# TYPE mlgms_{name} {kind}")
+        lines.append(f"mlgms_{name} {values[name]}")
+    return '\n'.join(lines) + '\n'
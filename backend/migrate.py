@@ -0,0 +1,320 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Versioned Schema Migrations
+# =====================================================
+#
+# Migrations live in database/migrations as NNNN_description.py files,
+# each with an up(m) function. Applied versions are recorded in the
+# schema_migrations table, so every step runs once per database, in
+# order. The helpers on Migrator check information_schema first, which
+# keeps steps safe on databases already changed by the old scripts.
+#
+# Big tables can be changed online with m.online_alter(): the new layout
+# is built in a shadow table, filled in chunks while triggers mirror live
+# writes, then swapped in with one atomic RENAME.
+
+import glob
+import importlib.util
+import os
+import time
+from backend.db import get_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'database', 'migrations')
+
+
+class Migration:
+    """One migration file"""
+
+    def __init__(self, path):
+        filename = os.path.basename(path)
+        self.path = path
+        self.version, _, rest = filename[:-3].partition('_')
+        self.name = rest.replace('_', ' ')
+
+    def load(self):
+        spec = importlib.util.spec_from_file_location(f"migration_{self.version}", self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+
+def discover():
+    """All migrations on disk, ordered by version"""
+    paths = glob.glob(os.path.join(MIGRATIONS_DIR, '[0-9]*_*.py'))
+    return sorted((Migration(path) for path in paths), key=lambda m: m.version)
+
+
+def ensure_table(cursor):
+    """Create the schema_migrations table"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INT NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row['version'] for row in cursor.fetchall()}
+
+
+class Migrator:
+    """Runs the statements of one migration (or only prints them on a dry run)"""
+
+    def __init__(self, cursor, dry_run=False, log=print, allow_deletes=False):
+        self.cursor = cursor
+        self.dry_run = dry_run
+        self.log = log
+        # Migrations that would have to delete existing rows stop unless this is set
+        self.allow_deletes = allow_deletes
+
+    # ---- introspection ----
+
+    def table_exists(self, table):
+        self.cursor.execute("""
+            SELECT COUNT(*) as count FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        return self.cursor.fetchone()['count'] > 0
+
+    def column_exists(self, table, column):
+        self.cursor.execute("""
+            SELECT COUNT(*) as count FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+        return self.cursor.fetchone()['count'] > 0
+
+    def index_exists(self, table, index):
+        self.cursor.execute("""
+            SELECT COUNT(*) as count FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (table, index))
+        return self.cursor.fetchone()['count'] > 0
+
+    def columns(self, table):
+        self.cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+        """, (table,))
+        return [row['COLUMN_NAME'] for row in self.cursor.fetchall()]
+
+    # ---- changes ----
+
+    def execute(self, statement, params=None):
+        """Run a statement (printed instead on a dry run)"""
+        if self.dry_run:
+            self.log(' '.join(statement.split()) + ';')
+            return 0
+        self.cursor.execute(statement, params)
+        return self.cursor.rowcount
+
+    def create_table(self, table, statement):
+        """Run a CREATE TABLE statement unless the table exists; returns True if created"""
+        if self.table_exists(table):
+            self.log(f"[SKIP] {table} table already exists")
+            return False
+        self.execute(statement)
+        self.log(f"[OK] Created {table} table")
+        return True
+
+    def add_column(self, table, column, definition, online=False):
+        """Add a column unless it exists; returns True if added"""
+        if self.column_exists(table, column):
+            self.log(f"[SKIP] {table}.{column} column already exists")
+            return False
+        clause = f"ADD COLUMN {column} {definition}"
+        if online:
+            self.online_alter(table, clause)
+        else:
+            self.execute(f"ALTER TABLE {table} {clause}")
+        self.log(f"[OK] Added {table}.{column} column")
+        return True
+
+    def add_index(self, table, index, columns, unique=False, online=False):
+        """Add an index unless it exists; returns True if added"""
+        if self.index_exists(table, index):
+            self.log(f"[SKIP] {table}.{index} index already exists")
+            return False
+        clause = f"ADD {'UNIQUE ' if unique else ''}INDEX {index} ({columns})"
+        if online:
+            self.online_alter(table, clause)
+        else:
+            self.execute(f"ALTER TABLE {table} {clause}")
+        self.log(f"[OK] Added {table}.{index} index")
+        return True
+
+    def drop_index(self, table, index):
+        """Drop an index if it exists; returns True if dropped"""
+        if not self.index_exists(table, index):
+            self.log(f"[SKIP] {table}.{index} index does not exist")
+            return False
+        self.execute(f"ALTER TABLE {table} DROP INDEX {index}")
+        self.log(f"[OK] Dropped {table}.{index} index")
+        return True
+
+    def online_alter(self, table, alteration, chunk_size=1000, pause=0.05):
+        """Apply ALTER TABLE clauses through a shadow table without blocking writes
+
+        1. _{table}_new is created LIKE the table and altered.
+        2. Triggers copy every insert/update/delete on the table to it.
+        3. Existing rows are copied in id ranges of chunk_size.
+        4. RENAME TABLE swaps the two tables atomically; the old one is dropped.
+
+        The table needs an integer id primary key. Tables referenced by other
+        tables' foreign keys are refused, since the references would follow
+        the renamed original. Outgoing foreign keys are recreated on the new
+        table. With binary logging on, creating triggers may need the
+        log_bin_trust_function_creators setting.
+        """
+        shadow = f"_{table}_new"
+        old = f"_{table}_old"
+
+        self.cursor.execute("""
+            SELECT COUNT(*) as count FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = %s
+        """, (table,))
+        if self.cursor.fetchone()['count']:
+            raise RuntimeError(f"{table} is referenced by foreign keys; use a plain ALTER in a maintenance window")
+
+        self.cursor.execute("""
+            SELECT k.CONSTRAINT_NAME, k.COLUMN_NAME, k.REFERENCED_TABLE_NAME,
+                   k.REFERENCED_COLUMN_NAME, r.UPDATE_RULE, r.DELETE_RULE
+            FROM information_schema.KEY_COLUMN_USAGE k
+            JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+              ON r.CONSTRAINT_SCHEMA = k.TABLE_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+            WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = %s
+              AND k.REFERENCED_TABLE_NAME IS NOT NULL
+        """, (table,))
+        foreign_keys = [
+            f"ADD FOREIGN KEY ({fk['COLUMN_NAME']}) REFERENCES {fk['REFERENCED_TABLE_NAME']}"
+            f"({fk['REFERENCED_COLUMN_NAME']}) ON UPDATE {fk['UPDATE_RULE']} ON DELETE {fk['DELETE_RULE']}"
+            for fk in self.cursor.fetchall()
+        ]
+
+        self.execute(f"DROP TABLE IF EXISTS {shadow}")
+        self.execute(f"CREATE TABLE {shadow} LIKE {table}")
+        self.execute(f"ALTER TABLE {shadow} " + ', '.join([alteration] + foreign_keys))
+
+        if self.dry_run:
+            # The shadow table does not exist, so assume the columns are unchanged
+            shared = self.columns(table)
+        else:
+            new_columns = set(self.columns(shadow))
+            shared = [column for column in self.columns(table) if column in new_columns]
+        column_list = ', '.join(f"`{column}`" for column in shared)
+        new_values = ', '.join(f"NEW.`{column}`" for column in shared)
+
+        self.execute(f"""
+            CREATE TRIGGER {shadow}_ins AFTER INSERT ON {table} FOR EACH ROW
+            REPLACE INTO {shadow} ({column_list}) VALUES ({new_values})
+        """)
+        self.execute(f"""
+            CREATE TRIGGER {shadow}_upd AFTER UPDATE ON {table} FOR EACH ROW
+            REPLACE INTO {shadow} ({column_list}) VALUES ({new_values})
+        """)
+        self.execute(f"""
+            CREATE TRIGGER {shadow}_del AFTER DELETE ON {table} FOR EACH ROW
+            DELETE FROM {shadow} WHERE id = OLD.id
+        """)
+
+        try:
+            if self.dry_run:
+                self.log(f"-- copy {table} into {shadow} in chunks of {chunk_size} rows")
+            else:
+                self.cursor.execute(f"SELECT COALESCE(MAX(id), 0) as max_id FROM {table}")
+                max_id = self.cursor.fetchone()['max_id']
+                start = 0
+                while start < max_id:
+                    # IGNORE: rows already written by the triggers are newer
+                    self.cursor.execute(f"""
+                        INSERT IGNORE INTO {shadow} ({column_list})
+                        SELECT {column_list} FROM {table}
+                        WHERE id > %s AND id <= %s
+                        LOCK IN SHARE MODE
+                    """, (start, start + chunk_size))
+                    self.cursor.connection.commit()
+                    start += chunk_size
+                    self.log(f"  {table}: copied up to id {min(start, max_id)}/{max_id}")
+                    time.sleep(pause)
+
+            self.execute(f"RENAME TABLE {table} TO {old}, {shadow} TO {table}")
+        finally:
+            for suffix in ('ins', 'upd', 'del'):
+                self.execute(f"DROP TRIGGER IF EXISTS {shadow}_{suffix}")
+        self.execute(f"DROP TABLE IF EXISTS {old}")
+
+
+def status():
+    """Get [(migration, applied)] for every migration on disk"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        ensure_table(cursor)
+        conn.commit()
+        done = applied_versions(cursor)
+        return [(migration, migration.version in done) for migration in discover()]
+    finally:
+        conn.close()
+
+
+def migrate(target=None, dry_run=False, log=print, allow_deletes=False):
+    """Apply pending migrations up to target (all when None); returns versions applied"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        ensure_table(cursor)
+        conn.commit()
+        done = applied_versions(cursor)
+
+        applied = []
+        for migration in discover():
+            if target and migration.version > target:
+                break
+            if migration.version in done:
+                continue
+
+            log(f"== {migration.version} {migration.name}")
+            started = time.time()
+            migration.load().up(Migrator(cursor, dry_run, log, allow_deletes))
+            if dry_run:
+                continue
+
+            # DDL commits implicitly, so each step is recorded right after it runs
+            cursor.execute("""
+                INSERT INTO schema_migrations (version, name, duration_ms)
+                VALUES (%s, %s, %s)
+            """, (migration.version, migration.name, int((time.time() - started) * 1000)))
+            conn.commit()
+            applied.append(migration.version)
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def baseline(target=None):
+    """Mark migrations up to target as applied without running them"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        ensure_table(cursor)
+        marked = []
+        for migration in discover():
+            if target and migration.version > target:
+                break
+            cursor.execute("""
+                INSERT IGNORE INTO schema_migrations (version, name) VALUES (%s, %s)
+            """, (migration.version, migration.name))
+            if cursor.rowcount:
+                marked.append(migration.version)
+        conn.commit()
+        return marked
+    finally:
+        conn.close()
@@ -8,23 +8,31 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import uuid
 from flask import current_app
+from backend.db import get_connection
+from backend.versions import JOBS, EMPLOYERS, bump_version
+from backend.cache import cached_query
+from backend import metrics
+from backend.geo import covering_prefixes, distance_km, geocode, geohash
+from backend.regions import match_region
+from backend import events, risk, sla, tasks, triage
 
-# Database connection pool
-def get_connection():
-    """Get database connection"""
-    return pymysql.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='mlgms_db',
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=False
-    )
+
+def projection(columns, alias=None):
+    """Render a model's column set as a SELECT list, optionally qualified by a table alias"""
+    prefix = f"{alias}." if alias else ''
+    return ', '.join(f"{prefix}{column}" for column in columns)
 
 
 class Worker:
     """Worker model for migrant workers"""
     
+    # Column sets callers ask for by name (none include the password hash).
+    # 'login' is answered from idx_workers_login, 'lookup' from the phone index.
+    COLUMNS = {
+        'login': ('id', 'migrant_id', 'name', 'phone', 'skill'),
+        'lookup': ('id',)
+    }
+    
     @staticmethod
     def generate_migrant_id(cursor):
         """Generate unique migrant ID"""
@@ -41,10 +49,12 @@ class Worker:
             cursor = conn.cursor()
             migrant_id = Worker.generate_migrant_id(cursor)
             hashed_password = generate_password_hash(str(data.get('password', data.get('phone'))))
+            region_id = Region.resolve(cursor, state=data.get('state'), district=data.get('district'))
             
             cursor.execute("""
-                INSERT INTO workers (migrant_id, name, email, phone, password, aadhaar, skill, age, gender, state, district, address)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO workers (migrant_id, name, email, phone, password, aadhaar, skill, age, gender, state, district, address,
+                                     region_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (
                 migrant_id,
                 data.get('name'),
@@ -57,7 +67,8 @@ class Worker:
                 data.get('gender'),
                 data.get('state'),
                 data.get('district'),
-                data.get('address')
+                data.get('address'),
+                region_id
             ))
             conn.commit()
             worker_id = cursor.lastrowid
@@ -71,7 +82,7 @@ class Worker:
     @staticmethod
     def get_by_id(worker_id):
         """Get worker by ID"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
@@ -88,7 +99,7 @@ class Worker:
     @staticmethod
     def get_by_migrant_id(migrant_id):
         """Get worker by migrant ID"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
@@ -103,25 +114,26 @@ class Worker:
             conn.close()
     
     @staticmethod
-    def get_by_phone(phone):
-        """Get worker by phone number"""
-        conn = get_connection()
+    def get_by_phone(phone, fields='lookup', readonly=True):
+        """Get worker by phone number (readonly=False for uniqueness checks before a write)"""
+        conn = get_connection(readonly=readonly)
         try:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM workers WHERE phone = %s", (phone,))
+            cursor.execute(f"SELECT {projection(Worker.COLUMNS[fields])} FROM workers WHERE phone = %s", (phone,))
             result = cursor.fetchone()
             return result
         finally:
             conn.close()
     
     @staticmethod
-    def authenticate(migrant_id, phone):
+    def authenticate(migrant_id, phone, fields='login'):
         """Authenticate worker by migrant ID and phone"""
+        # Primary: a just-registered or just-verified account may not be on a replica yet
         conn = get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM workers 
+            cursor.execute(f"""
+                SELECT {projection(Worker.COLUMNS[fields])} FROM workers 
                 WHERE migrant_id = %s AND phone = %s
             """, (migrant_id, phone))
             result = cursor.fetchone()
@@ -148,6 +160,15 @@ class Worker:
             if not update_fields:
                 return {'success': False, 'error': 'No fields to update'}
             
+            if data.get('state') is not None or data.get('district') is not None:
+                # Re-match the region from the new values and whichever one is unchanged
+                cursor.execute("SELECT state, district FROM workers WHERE id = %s", (worker_id,))
+                current = cursor.fetchone() or {}
+                state = data.get('state') if data.get('state') is not None else current.get('state')
+                district = data.get('district') if data.get('district') is not None else current.get('district')
+                update_fields.append("region_id = %s")
+                update_values.append(Region.resolve(cursor, state=state, district=district))
+            
             update_values.append(worker_id)
             
             query = f"UPDATE workers SET {', '.join(update_fields)} WHERE id = %s"
@@ -188,13 +209,20 @@ class Worker:
 class Complaint:
     """Complaint model for worker grievances"""
     
+    # 'summary' is answered from idx_complaints_worker_summary alone
+    COLUMNS = {
+        'list': ('id', 'complaint_id', 'worker_id', 'employer_id', 'category',
+                 'status', 'admin_remarks', 'created_at', 'updated_at', 'resolved_at'),
+        'summary': ('id', 'complaint_id', 'category', 'status', 'created_at')
+    }
+    
     @staticmethod
     def generate_complaint_id(cursor):
         """Generate unique complaint ID"""
-        cursor.execute("SELECT COALESCE(MAX(CAST(SUBSTRING(complaint_id, 4) AS UNSIGNED)), 0) as max_id FROM complaints")
-        result = cursor.fetchone()
-        max_id = result['max_id'] if result else 0
-        return f"CMP{str(max_id + 1).zfill(5)}"
+        # AUTO_INCREMENT never hands out a number twice, even to concurrent
+        # filings; a partitioned complaints table cannot enforce this itself
+        cursor.execute("INSERT INTO complaint_id_sequence () VALUES ()")
+        return f"CMP{str(cursor.lastrowid).zfill(5)}"
     
     @staticmethod
     def create(data):
@@ -202,6 +230,13 @@ class Complaint:
         conn = get_connection()
         try:
             cursor = conn.cursor()
+            if data.get('employer_id'):
+                # Stands in for the foreign key, which partitioning drops
+                cursor.execute("SELECT id FROM employers WHERE id = %s LOCK IN SHARE MODE",
+                               (data.get('employer_id'),))
+                if not cursor.fetchone():
+                    conn.rollback()
+                    return {'success': False, 'error': 'Employer not found'}
             complaint_id = Complaint.generate_complaint_id(cursor)
             
             cursor.execute("""
@@ -214,8 +249,25 @@ class Complaint:
                 data.get('category'),
                 data.get('description')
             ))
-            conn.commit()
             complaint_db_id = cursor.lastrowid
+            cursor.execute("SELECT created_at FROM complaints WHERE id = %s", (complaint_db_id,))
+            complaint = {
+                'id': complaint_db_id,
+                'category': data.get('category'),
+                'employer_id': data.get('employer_id'),
+                'created_at': cursor.fetchone()['created_at'],
+                'status': None
+            }
+            sla.status_changed(cursor, complaint, 'pending')
+            risk.complaint_filed(cursor, complaint)
+            triage.complaint_filed(cursor, complaint_db_id, data.get('employer_id'))
+            if data.get('employer_id'):
+                # Duplicate detection runs in the task worker, off the request thread
+                tasks.enqueue('fingerprint_complaint', {'complaint_id': complaint_db_id},
+                              idempotency_key=f"complaint_fingerprint:{complaint_db_id}", cursor=cursor)
+            conn.commit()
+            events.complaint_changed(dict(complaint, complaint_id=complaint_id, worker_id=data.get('worker_id')),
+                                     'pending')
             return {'success': True, 'complaint_id': complaint_id, 'id': complaint_db_id}
         except Exception as e:
             conn.rollback()
@@ -224,18 +276,34 @@ class Complaint:
             conn.close()
     
     @staticmethod
-    def get_by_worker(worker_id):
-        """Get all complaints by worker ID"""
-        conn = get_connection()
+    def get_by_worker(worker_id, fields='list', limit=None):
+        """Get complaints by worker ID, newest first (optionally only the latest few)"""
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT c.*, e.company_name as employer_name
-                FROM complaints c
-                LEFT JOIN employers e ON c.employer_id = e.id
-                WHERE c.worker_id = %s
+            columns = Complaint.COLUMNS[fields]
+            # Each branch stops early when limited, reading only the newest index entries
+            branch_limit = f"ORDER BY created_at DESC LIMIT {int(limit)}" if limit else ''
+            employer_join = ''
+            select = 'c.*'
+            if 'employer_id' in columns:
+                select += ', e.company_name as employer_name'
+                employer_join = 'LEFT JOIN employers e ON c.employer_id = e.id'
+            query = f"""
+                SELECT {select}
+                FROM (
+                    (SELECT {projection(columns)}
+                     FROM complaints WHERE worker_id = %s {branch_limit})
+                    UNION ALL
+                    (SELECT {projection(columns)}
+                     FROM complaints_archive WHERE worker_id = %s {branch_limit})
+                ) c
+                {employer_join}
                 ORDER BY c.created_at DESC
-            """, (worker_id,))
+            """
+            if limit:
+                query += f" LIMIT {int(limit)}"
+            cursor.execute(query, (worker_id, worker_id))
             results = cursor.fetchall()
             return results
         finally:
@@ -244,18 +312,21 @@ class Complaint:
     @staticmethod
     def get_by_id(complaint_id):
         """Get complaint by ID"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT c.*, w.name as worker_name, w.migrant_id, e.company_name as employer_name
-                FROM complaints c
-                JOIN workers w ON c.worker_id = w.id
-                LEFT JOIN employers e ON c.employer_id = e.id
-                WHERE c.id = %s OR c.complaint_id = %s
-            """, (complaint_id, complaint_id))
-            result = cursor.fetchone()
-            return result
+            for table in ('complaints', 'complaints_archive'):
+                cursor.execute(f"""
+                    SELECT c.*, w.name as worker_name, w.migrant_id, e.company_name as employer_name
+                    FROM {table} c
+                    JOIN workers w ON c.worker_id = w.id
+                    LEFT JOIN employers e ON c.employer_id = e.id
+                    WHERE c.id = %s OR c.complaint_id = %s
+                """, (complaint_id, complaint_id))
+                result = cursor.fetchone()
+                if result:
+                    return result
+            return None
         finally:
             conn.close()
     
@@ -266,13 +337,22 @@ class Complaint:
         try:
             cursor = conn.cursor()
             resolved_at = datetime.now() if status == 'resolved' else None
+            complaint = sla.lock_complaint(cursor, complaint_id)
             
-            cursor.execute("""
+            # Only an in-progress complaint stays claimed
+            claim = "" if status == 'in_progress' else ", assigned_admin_id = NULL, claimed_at = NULL"
+            cursor.execute(f"""
                 UPDATE complaints 
-                SET status = %s, admin_remarks = %s, resolved_at = %s
+                SET status = %s, admin_remarks = %s, resolved_at = %s{claim}
                 WHERE id = %s OR complaint_id = %s
             """, (status, admin_remarks, resolved_at, complaint_id, complaint_id))
+            if complaint:
+                sla.status_changed(cursor, complaint, status, resolved_at)
+                risk.status_changed(cursor, complaint, status)
             conn.commit()
+            if complaint:
+                fields = {} if status == 'in_progress' else {'assigned_admin_id': None}
+                events.complaint_changed(complaint, status, admin_remarks=admin_remarks, **fields)
             
             return {'success': True, 'message': 'Complaint status updated'}
         except Exception as e:
@@ -284,7 +364,7 @@ class Complaint:
     @staticmethod
     def get_stats_by_worker(worker_id):
         """Get complaint statistics for a worker"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
@@ -293,9 +373,12 @@ class Complaint:
                     SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending_complaints,
                     SUM(CASE WHEN status = 'resolved' THEN 1 ELSE 0 END) as resolved_complaints,
                     SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) as in_progress_complaints
-                FROM complaints
-                WHERE worker_id = %s
-            """, (worker_id,))
+                FROM (
+                    SELECT status FROM complaints WHERE worker_id = %s
+                    UNION ALL
+                    SELECT status FROM complaints_archive WHERE worker_id = %s
+                ) c
+            """, (worker_id, worker_id))
             result = cursor.fetchone()
             return result
         finally:
@@ -305,6 +388,17 @@ class Complaint:
 class Employer:
     """Employer model for companies"""
     
+    # 'session' is what the employer_login_required decorator and the
+    # dashboard need; 'detail' is the admin verification view
+    COLUMNS = {
+        'session': ('id', 'employer_id', 'company_name', 'industry', 'location', 'contact_person',
+                    'email', 'phone', 'is_verified', 'rating', 'workers_count'),
+        'detail': ('id', 'employer_id', 'company_name', 'industry', 'location', 'contact_person',
+                   'phone', 'email', 'gst_number', 'registration_number', 'address', 'status',
+                   'is_verified', 'verification_notes', 'verified_at', 'verified_by', 'rating',
+                   'rating_count', 'workers_count', 'created_at', 'updated_at')
+    }
+    
     @staticmethod
     def generate_employer_id(cursor):
         """Generate unique employer ID"""
@@ -321,12 +415,13 @@ class Employer:
             cursor = conn.cursor()
             employer_id = Employer.generate_employer_id(cursor)
             hashed_password = generate_password_hash(str(data.get('password')))
+            region_id = Region.resolve(cursor, location=data.get('location'))
             
             cursor.execute("""
                 INSERT INTO employers (employer_id, company_name, industry, location, 
                                        contact_person, phone, email, password, 
-                                       gst_number, registration_number, address)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                                       gst_number, registration_number, address, region_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (
                 employer_id,
                 data.get('company_name'),
@@ -338,8 +433,10 @@ class Employer:
                 hashed_password,
                 data.get('gst_number'),
                 data.get('registration_number'),
-                data.get('address')
+                data.get('address'),
+                region_id
             ))
+            bump_version(cursor, EMPLOYERS)
             conn.commit()
             emp_id = cursor.lastrowid
             return {'success': True, 'employer_id': employer_id, 'id': emp_id}
@@ -352,6 +449,7 @@ class Employer:
     @staticmethod
     def authenticate(employer_id, password):
         """Authenticate employer by employer_id and password"""
+        # Primary: a just-registered or just-verified account may not be on a replica yet
         conn = get_connection()
         try:
             cursor = conn.cursor()
@@ -368,13 +466,13 @@ class Employer:
             conn.close()
     
     @staticmethod
-    def get_by_employer_id(employer_id):
+    def get_by_employer_id(employer_id, fields='session'):
         """Get employer by employer_id"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM employers 
+            cursor.execute(f"""
+                SELECT {projection(Employer.COLUMNS[fields])} FROM employers 
                 WHERE employer_id = %s
             """, (employer_id,))
             result = cursor.fetchone()
@@ -383,9 +481,25 @@ class Employer:
             conn.close()
     
     @staticmethod
-    def get_all(status=None, verification_status=None):
-        """Get all employers"""
-        conn = get_connection()
+    def get_all(status=None, verification_status=None, sort=None):
+        """Get all employers, newest first or highest complaint risk first (sort='risk')"""
+        employers = cached_query(
+            (EMPLOYERS,), 'Employer.get_all', (status, verification_status),
+            lambda: Employer._query_all(status, verification_status)
+        )
+        # Risk changes with every complaint, so it comes from the short-lived
+        # snapshot rather than invalidating the cached list
+        scores = risk.snapshot()
+        employers = [dict(employer, **scores.get(employer['id'], {})) for employer in employers]
+        if sort == 'risk':
+            # Stable, so ties stay newest first
+            employers.sort(key=lambda employer: employer.get('risk_key') or 0, reverse=True)
+        return employers
+    
+    @staticmethod
+    def _query_all(status=None, verification_status=None):
+        """Load all employers from the database, newest first"""
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             
@@ -417,15 +531,17 @@ class Employer:
     @staticmethod
     def get_by_id(employer_id):
         """Get employer by ID"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT id, employer_id, company_name as name, industry as type, location, 
+                SELECT id, employers.employer_id, company_name as name, industry as type, location, 
                        contact_person, phone, email, status, is_verified, verification_notes,
                        rating, workers_count as workers, created_at, gst_number, 
-                       registration_number, address
+                       registration_number, address,
+                       r.complaints_total, r.complaints_open, r.risk_key
                 FROM employers 
+                LEFT JOIN employer_risk r ON r.employer_id = employers.id
                 WHERE id = %s
             """, (employer_id,))
             result = cursor.fetchone()
@@ -433,6 +549,18 @@ class Employer:
         finally:
             conn.close()
     
+    @staticmethod
+    def get_detail(employer_id, fields='detail'):
+        """Get employer by database ID with the named column set"""
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {projection(Employer.COLUMNS[fields])} FROM employers WHERE id = %s",
+                           (employer_id,))
+            return cursor.fetchone()
+        finally:
+            conn.close()
+    
     @staticmethod
     def update_verification(employer_id, verification_status, notes=None, admin_id=None):
         """Update employer verification status"""
@@ -456,6 +584,7 @@ class Employer:
                     WHERE id = %s
                 """, (verification_status, notes, admin_id, employer_id))
             
+            bump_version(cursor, EMPLOYERS)
             conn.commit()
             return {'success': True, 'message': 'Verification status updated'}
         except Exception as e:
@@ -467,7 +596,7 @@ class Employer:
     @staticmethod
     def get_pending_verifications():
         """Get all employers pending verification"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
@@ -483,10 +612,170 @@ class Employer:
         finally:
             conn.close()
     
+    @staticmethod
+    def adjust_workers_count(cursor, previous_employer_id, new_employer_id):
+        """Move one worker between employers' workers_count (caller's transaction)"""
+        if previous_employer_id == new_employer_id:
+            return
+        if previous_employer_id is not None:
+            cursor.execute("""
+                UPDATE employers SET workers_count = GREATEST(workers_count - 1, 0)
+                WHERE id = %s
+            """, (previous_employer_id,))
+        if new_employer_id is not None:
+            cursor.execute("""
+                UPDATE employers SET workers_count = workers_count + 1
+                WHERE id = %s
+            """, (new_employer_id,))
+        bump_version(cursor, EMPLOYERS)
+    
+    @staticmethod
+    def can_be_rated_by(employer_id, worker_id):
+        """Check whether a worker has worked for (been accepted by) an employer"""
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT 1 FROM job_applications a
+                JOIN jobs j ON a.job_id = j.id
+                WHERE j.employer_id = %s AND a.worker_id = %s AND a.status = 'accepted'
+                UNION ALL
+                SELECT 1 FROM job_applications_archive a
+                JOIN jobs_archive j ON a.job_id = j.id
+                WHERE j.employer_id = %s AND a.worker_id = %s AND a.status = 'accepted'
+                LIMIT 1
+            """, (employer_id, worker_id, employer_id, worker_id))
+            return cursor.fetchone() is not None
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def rate(employer_id, worker_id, rating, review=None):
+        """Add or change a worker's rating and update the running average"""
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            
+            # Lock the employer row so concurrent ratings apply one at a time
+            cursor.execute("SELECT id FROM employers WHERE id = %s FOR UPDATE", (employer_id,))
+            if not cursor.fetchone():
+                conn.rollback()
+                return {'success': False, 'error': 'Employer not found'}
+            
+            cursor.execute("""
+                SELECT rating FROM employer_ratings
+                WHERE employer_id = %s AND worker_id = %s
+            """, (employer_id, worker_id))
+            existing = cursor.fetchone()
+            
+            if existing:
+                cursor.execute("""
+                    UPDATE employer_ratings SET rating = %s, review = %s
+                    WHERE employer_id = %s AND worker_id = %s
+                """, (rating, review, employer_id, worker_id))
+                sum_delta, count_delta = rating - existing['rating'], 0
+            else:
+                cursor.execute("""
+                    INSERT INTO employer_ratings (employer_id, worker_id, rating, review)
+                    VALUES (%s, %s, %s, %s)
+                """, (employer_id, worker_id, rating, review))
+                sum_delta, count_delta = rating, 1
+            
+            cursor.execute("""
+                UPDATE employers
+                SET rating_sum = rating_sum + %s,
+                    rating_count = rating_count + %s,
+                    rating = COALESCE(ROUND(rating_sum / NULLIF(rating_count, 0), 2), 0)
+                WHERE id = %s
+            """, (sum_delta, count_delta, employer_id))
+            bump_version(cursor, EMPLOYERS)
+            conn.commit()
+            return {'success': True, 'updated': existing is not None}
+        except Exception as e:
+            conn.rollback()
+            return {'success': False, 'error': str(e)}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def reconcile_stats(after_id=0, limit=200):
+        """Recompute workers_count and rating for the next chunk of employers
+
+        Only the chunk's employer rows are locked, and only for the length of
+        one short transaction. Returns (last_id, corrected); last_id is None
+        once every employer has been visited.
+        """
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            
+            # Locking the employer rows first makes concurrent deltas wait for
+            # this chunk, so they apply on top of the recomputed values
+            cursor.execute("""
+                SELECT id, workers_count, rating_sum, rating_count
+                FROM employers
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE
+            """, (after_id, limit))
+            employers = cursor.fetchall()
+            if not employers:
+                conn.commit()
+                return None, 0
+            
+            ids = [e['id'] for e in employers]
+            placeholders = ', '.join(['%s'] * len(ids))
+            
+            cursor.execute(f"""
+                SELECT current_employer_id as employer_id, COUNT(*) as workers
+                FROM workers
+                WHERE current_employer_id IN ({placeholders})
+                GROUP BY current_employer_id
+            """, ids)
+            workers = {row['employer_id']: row['workers'] for row in cursor.fetchall()}
+            
+            cursor.execute(f"""
+                SELECT employer_id, SUM(rating) as rating_sum, COUNT(*) as rating_count
+                FROM employer_ratings
+                WHERE employer_id IN ({placeholders})
+                GROUP BY employer_id
+            """, ids)
+            ratings = {row['employer_id']: row for row in cursor.fetchall()}
+            
+            corrected = 0
+            for employer in employers:
+                workers_count = workers.get(employer['id'], 0)
+                rating = ratings.get(employer['id'])
+                rating_sum = int(rating['rating_sum']) if rating else 0
+                rating_count = rating['rating_count'] if rating else 0
+                
+                if (employer['workers_count'], employer['rating_sum'], employer['rating_count']) == \
+                        (workers_count, rating_sum, rating_count):
+                    continue
+                
+                cursor.execute("""
+                    UPDATE employers
+                    SET workers_count = %s, rating_sum = %s, rating_count = %s,
+                        rating = COALESCE(ROUND(%s / NULLIF(%s, 0), 2), 0)
+                    WHERE id = %s
+                """, (workers_count, rating_sum, rating_count, rating_sum, rating_count, employer['id']))
+                corrected += 1
+            
+            if corrected:
+                bump_version(cursor, EMPLOYERS)
+            conn.commit()
+            return ids[-1], corrected
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
     @staticmethod
     def get_verification_stats():
         """Get employer verification statistics"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
@@ -520,6 +809,7 @@ class Session:
                 VALUES (%s, %s, %s, %s, %s)
             """, (session_id, worker_id, ip_address, user_agent, expires_at))
             conn.commit()
+            metrics.increment('sessions_created_total')
             
             return {'success': True, 'session_id': session_id}
         except Exception as e:
@@ -529,9 +819,46 @@ class Session:
             conn.close()
     
     @staticmethod
-    def get(session_id):
-        """Get session by ID"""
+    def login(migrant_id, phone, ip_address=None, user_agent=None):
+        """Authenticate a worker and create their session on one connection
+
+        The worker is found with the (migrant_id, phone) prefix of
+        idx_workers_login, and the session insert commits in the same
+        transaction. Returns {'success', 'worker', 'session_id'}; worker is
+        None when the credentials do not match.
+        """
         conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {projection(Worker.COLUMNS['login'])} FROM workers
+                WHERE migrant_id = %s AND phone = %s
+            """, (migrant_id, phone))
+            worker = cursor.fetchone()
+            if not worker:
+                conn.rollback()
+                return {'success': True, 'worker': None, 'session_id': None}
+            
+            session_id = str(uuid.uuid4())
+            expires_at = datetime.now() + timedelta(hours=1)
+            cursor.execute("""
+                INSERT INTO sessions (session_id, worker_id, ip_address, user_agent, expires_at)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (session_id, worker['id'], ip_address, user_agent, expires_at))
+            conn.commit()
+            metrics.increment('sessions_created_total')
+            
+            return {'success': True, 'worker': worker, 'session_id': session_id}
+        except Exception as e:
+            conn.rollback()
+            return {'success': False, 'worker': None, 'error': str(e)}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get(session_id, readonly=True):
+        """Get session by ID"""
+        conn = get_connection(readonly=readonly)
         try:
             cursor = conn.cursor()
             cursor.execute("""
@@ -541,9 +868,13 @@ class Session:
                 WHERE s.session_id = %s AND s.expires_at > NOW()
             """, (session_id,))
             result = cursor.fetchone()
-            return result
         finally:
             conn.close()
+
+        # A session created moments ago may not have reached the replica yet
+        if result is None and readonly:
+            return Session.get(session_id, readonly=False)
+        return result
     
     @staticmethod
     def delete(session_id):
@@ -574,6 +905,43 @@ class Session:
             return {'success': False, 'error': str(e)}
         finally:
             conn.close()
+    
+    @staticmethod
+    def sweep_expired(batch_size=500, retention_seconds=0):
+        """Delete one batch of sessions that expired more than retention_seconds ago
+
+        Each batch is its own short transaction on the expires_at index, so
+        only the deleted rows are locked. Returns the number deleted.
+        """
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM sessions
+                WHERE expires_at < NOW() - INTERVAL %s SECOND
+                ORDER BY expires_at
+                LIMIT %s
+            """, (retention_seconds, batch_size))
+            deleted = cursor.rowcount
+            conn.commit()
+            metrics.increment('sessions_swept_total', deleted)
+            return deleted
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def count_live():
+        """Count sessions that have not expired"""
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) as count FROM sessions WHERE expires_at > NOW()")
+            return cursor.fetchone()['count']
+        finally:
+            conn.close()
 
 
 class Admin:
@@ -582,6 +950,7 @@ class Admin:
     @staticmethod
     def authenticate(username, password):
         """Authenticate admin"""
+        # Primary: a just-registered or just-verified account may not be on a replica yet
         conn = get_connection()
         try:
             cursor = conn.cursor()
@@ -594,6 +963,19 @@ class Admin:
         finally:
             conn.close()
     
+    @staticmethod
+    def get_by_id(admin_id):
+        """Get admin by ID (without the password hash), or None"""
+        if not str(admin_id).isdigit():
+            return None
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, username, name, role FROM admin WHERE id = %s", (admin_id,))
+            return cursor.fetchone()
+        finally:
+            conn.close()
+    
     @staticmethod
     def create(username, password, name, email, role='admin'):
         """Create admin user"""
@@ -617,14 +999,48 @@ class Admin:
 class Job:
     """Job model for job listings"""
     
+    # Columns the job list serializes; the description TEXT is left to get_by_id
+    COLUMNS = {
+        'list': ('id', 'job_id', 'title', 'skill_required', 'location', 'wage_per_day',
+                 'duration_days', 'workers_needed', 'status', 'created_at')
+    }
+    
     @staticmethod
     def generate_job_id(cursor):
         """Generate unique job ID"""
-        cursor.execute("SELECT COALESCE(MAX(CAST(SUBSTRING(job_id, 4) AS UNSIGNED)), 0) as max_id FROM jobs")
+        # Archived rows keep their IDs, so they count towards the next one
+        cursor.execute("""
+            SELECT GREATEST(
+                (SELECT COALESCE(MAX(CAST(SUBSTRING(job_id, 4) AS UNSIGNED)), 0) FROM jobs),
+                (SELECT COALESCE(MAX(CAST(SUBSTRING(job_id, 4) AS UNSIGNED)), 0) FROM jobs_archive)
+            ) as max_id
+        """)
         result = cursor.fetchone()
         max_id = result['max_id'] if result else 0
         return f"JOB{str(max_id + 1).zfill(5)}"
     
+    @staticmethod
+    def locate(cursor, location, employer_id=None):
+        """(latitude, longitude, geohash) for a job location, falling back to the employer's"""
+        place = geocode(location)
+        if not place and employer_id:
+            cursor.execute("SELECT location FROM employers WHERE id = %s", (employer_id,))
+            employer = cursor.fetchone()
+            place = geocode(employer['location']) if employer else None
+        if not place:
+            return None, None, None
+        return place['latitude'], place['longitude'], geohash(place['latitude'], place['longitude'])
+    
+    @staticmethod
+    def region_for(cursor, location, employer_id=None):
+        """Region id for a job location, falling back to the employer's region"""
+        region_id = Region.resolve(cursor, location=location)
+        if region_id is None and employer_id:
+            cursor.execute("SELECT region_id FROM employers WHERE id = %s", (employer_id,))
+            employer = cursor.fetchone()
+            region_id = employer['region_id'] if employer else None
+        return region_id
+    
     @staticmethod
     def create(data):
         """Create a new job listing"""
@@ -632,10 +1048,13 @@ class Job:
         try:
             cursor = conn.cursor()
             job_id = Job.generate_job_id(cursor)
+            latitude, longitude, cell = Job.locate(cursor, data.get('location'), data.get('employer_id'))
+            region_id = Job.region_for(cursor, data.get('location'), data.get('employer_id'))
             
             cursor.execute("""
-                INSERT INTO jobs (job_id, employer_id, title, description, skill_required, location, wage_per_day, duration_days, workers_needed)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO jobs (job_id, employer_id, title, description, skill_required, location, wage_per_day, duration_days, workers_needed,
+                                  latitude, longitude, geohash, region_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (
                 job_id,
                 data.get('employer_id'),
@@ -645,8 +1064,13 @@ class Job:
                 data.get('location'),
                 data.get('wage_per_day'),
                 data.get('duration_days'),
-                data.get('workers_needed')
+                data.get('workers_needed'),
+                latitude,
+                longitude,
+                cell,
+                region_id
             ))
+            bump_version(cursor, JOBS)
             conn.commit()
             job_db_id = cursor.lastrowid
             return {'success': True, 'job_id': job_id, 'id': job_db_id}
@@ -657,13 +1081,21 @@ class Job:
             conn.close()
     
     @staticmethod
-    def get_all(status=None, skill=None):
+    def get_all(status=None, skill=None, region_id=None):
         """Get all open jobs"""
-        conn = get_connection()
+        return cached_query(
+            (JOBS, EMPLOYERS), 'Job.get_all', (status, skill, region_id),
+            lambda: Job._query_all(status, skill, region_id)
+        )
+    
+    @staticmethod
+    def _query_all(status=None, skill=None, region_id=None):
+        """Load jobs from the database"""
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
-            query = """
-                SELECT j.*, e.company_name as employer_name, e.industry
+            query = f"""
+                SELECT {projection(Job.COLUMNS['list'], 'j')}, e.company_name as employer_name, e.industry
                 FROM jobs j
                 JOIN employers e ON j.employer_id = e.id
             """
@@ -678,6 +1110,10 @@ class Job:
                 conditions.append("(j.skill_required = %s OR j.skill_required = 'other')")
                 params.append(skill)
             
+            if region_id:
+                conditions.append("j.region_id = %s")
+                params.append(region_id)
+            
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
@@ -690,19 +1126,89 @@ class Job:
             conn.close()
     
     @staticmethod
-    def get_by_id(job_id):
-        """Get job by ID"""
-        conn = get_connection()
+    def get_nearby(latitude, longitude, radius_km, skill=None, limit=50):
+        """Get open jobs within radius_km, nearest first, each with distance_km"""
+        prefixes = covering_prefixes(latitude, longitude, radius_km)
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT j.*, e.company_name as employer_name, e.industry, e.location as employer_location
+            query = f"""
+                SELECT {projection(Job.COLUMNS['list'], 'j')}, j.latitude, j.longitude,
+                       e.company_name as employer_name, e.industry
                 FROM jobs j
                 JOIN employers e ON j.employer_id = e.id
-                WHERE j.id = %s OR j.job_id = %s
-            """, (job_id, job_id))
-            result = cursor.fetchone()
-            return result
+                WHERE j.status = 'open'
+                  AND ({' OR '.join(['j.geohash LIKE %s'] * len(prefixes))})
+            """
+            params = [prefix + '%' for prefix in prefixes]
+            
+            if skill:
+                query += " AND (j.skill_required = %s OR j.skill_required = 'other')"
+                params.append(skill)
+            
+            cursor.execute(query, params)
+            nearby = []
+            for job in cursor.fetchall():
+                # The cells cover a square around the circle, so check the real distance
+                distance = distance_km(latitude, longitude, float(job['latitude']), float(job['longitude']))
+                if distance <= radius_km:
+                    job['distance_km'] = round(distance, 1)
+                    nearby.append(job)
+            nearby.sort(key=lambda job: job['distance_km'])
+            return nearby[:limit]
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def geocode_missing(after_id=0, limit=200):
+        """Geocode a chunk of jobs without coordinates; returns (last id visited or None, jobs located)"""
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, location, employer_id FROM jobs
+                WHERE geohash IS NULL AND id > %s
+                ORDER BY id LIMIT %s
+            """, (after_id, limit))
+            jobs = cursor.fetchall()
+            if not jobs:
+                return None, 0
+            
+            located = 0
+            for job in jobs:
+                latitude, longitude, cell = Job.locate(cursor, job['location'], job['employer_id'])
+                if cell:
+                    cursor.execute("""
+                        UPDATE jobs SET latitude = %s, longitude = %s, geohash = %s WHERE id = %s
+                    """, (latitude, longitude, cell, job['id']))
+                    located += 1
+            if located:
+                bump_version(cursor, JOBS)
+            conn.commit()
+            return jobs[-1]['id'], located
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_by_id(job_id):
+        """Get job by ID"""
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            for table in ('jobs', 'jobs_archive'):
+                cursor.execute(f"""
+                    SELECT j.*, e.company_name as employer_name, e.industry, e.location as employer_location
+                    FROM {table} j
+                    JOIN employers e ON j.employer_id = e.id
+                    WHERE j.id = %s OR j.job_id = %s
+                """, (job_id, job_id))
+                result = cursor.fetchone()
+                if result:
+                    return result
+            return None
         finally:
             conn.close()
     
@@ -716,6 +1222,7 @@ class Job:
                 UPDATE jobs SET status = %s
                 WHERE id = %s OR job_id = %s
             """, (status, job_id, job_id))
+            bump_version(cursor, JOBS)
             conn.commit()
             return {'success': True}
         except Exception as e:
@@ -731,10 +1238,9 @@ class JobApplication:
     @staticmethod
     def generate_application_id(cursor):
         """Generate unique application ID"""
-        cursor.execute("SELECT COALESCE(MAX(CAST(SUBSTRING(application_id, 4) AS UNSIGNED)), 0) as max_id FROM job_applications")
-        result = cursor.fetchone()
-        max_id = result['max_id'] if result else 0
-        return f"APP{str(max_id + 1).zfill(5)}"
+        # AUTO_INCREMENT never hands out a number twice, even to concurrent requests
+        cursor.execute("INSERT INTO application_id_sequence () VALUES ()")
+        return f"APP{str(cursor.lastrowid).zfill(5)}"
     
     @staticmethod
     def create(job_id, worker_id):
@@ -742,25 +1248,26 @@ class JobApplication:
         conn = get_connection()
         try:
             cursor = conn.cursor()
+            application_id = JobApplication.generate_application_id(cursor)
             
-            # Check if already applied
-            cursor.execute("""
-                SELECT * FROM job_applications 
-                WHERE job_id = %s AND worker_id = %s
-            """, (job_id, worker_id))
-            existing = cursor.fetchone()
-            
-            if existing:
+            # UNIQUE(job_id, worker_id) rejects a double submit instead of
+            # racing a separate duplicate check
+            try:
+                cursor.execute("""
+                    INSERT INTO job_applications (application_id, job_id, worker_id)
+                    VALUES (%s, %s, %s)
+                """, (application_id, job_id, worker_id))
+            except pymysql.IntegrityError as e:
+                # 1062 is a duplicate key; application IDs are never reused, so
+                # it can only be this worker's earlier application
+                if e.args[0] != 1062:
+                    raise
+                conn.rollback()
                 return {'success': False, 'error': 'You have already applied for this job'}
             
-            application_id = JobApplication.generate_application_id(cursor)
-            
-            cursor.execute("""
-                INSERT INTO job_applications (application_id, job_id, worker_id)
-                VALUES (%s, %s, %s)
-            """, (application_id, job_id, worker_id))
+            application = events.lock_application(cursor, application_id)
             conn.commit()
-            
+            events.application_changed(dict(application, status=None), 'pending')
             return {'success': True, 'application_id': application_id}
         except Exception as e:
             conn.rollback()
@@ -771,18 +1278,27 @@ class JobApplication:
     @staticmethod
     def get_by_worker(worker_id):
         """Get all applications by a worker"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT a.*, j.title, j.job_id, j.location, j.wage_per_day, j.duration_days,
-                       e.company_name as employer_name
+                SELECT a.id, a.application_id, a.job_id, a.worker_id, a.status, a.applied_at,
+                       a.responded_at, j.title, j.location, j.wage_per_day,
+                       j.duration_days, e.company_name as employer_name
                 FROM job_applications a
                 JOIN jobs j ON a.job_id = j.id
                 JOIN employers e ON j.employer_id = e.id
                 WHERE a.worker_id = %s
-                ORDER BY a.applied_at DESC
-            """, (worker_id,))
+                UNION ALL
+                SELECT a.id, a.application_id, a.job_id, a.worker_id, a.status, a.applied_at,
+                       a.responded_at, j.title, j.location, j.wage_per_day,
+                       j.duration_days, e.company_name as employer_name
+                FROM job_applications_archive a
+                JOIN jobs_archive j ON a.job_id = j.id
+                JOIN employers e ON j.employer_id = e.id
+                WHERE a.worker_id = %s
+                ORDER BY applied_at DESC
+            """, (worker_id, worker_id))
             results = cursor.fetchall()
             return results
         finally:
@@ -794,12 +1310,15 @@ class JobApplication:
         conn = get_connection()
         try:
             cursor = conn.cursor()
+            application = events.lock_application(cursor, application_id)
             cursor.execute("""
                 UPDATE job_applications 
                 SET status = %s, responded_at = NOW()
                 WHERE id = %s OR application_id = %s
             """, (status, application_id, application_id))
             conn.commit()
+            if application:
+                events.application_changed(application, status)
             return {'success': True}
         except Exception as e:
             conn.rollback()
@@ -810,7 +1329,7 @@ class JobApplication:
     @staticmethod
     def get_stats_by_worker(worker_id):
         """Get application statistics for a worker"""
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         try:
             cursor = conn.cursor()
             cursor.execute("""
@@ -819,10 +1338,128 @@ class JobApplication:
                     SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending_applications,
                     SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END) as accepted_applications,
                     SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END) as rejected_applications
-                FROM job_applications
-                WHERE worker_id = %s
-            """, (worker_id,))
+                FROM (
+                    SELECT status FROM job_applications WHERE worker_id = %s
+                    UNION ALL
+                    SELECT status FROM job_applications_archive WHERE worker_id = %s
+                ) a
+            """, (worker_id, worker_id))
             result = cursor.fetchone()
             return result
         finally:
             conn.close()
+
+
+class Region:
+    """Region dimension - normalized (state, district) pairs with integer IDs"""
+    
+    # {(state, district): id}; regions only change through migrations
+    _ids = None
+    
+    @staticmethod
+    def ids(cursor):
+        """Get the region id map, loaded once per process"""
+        if Region._ids is None:
+            cursor.execute("SELECT id, state, district FROM regions")
+            ids = {(row['state'], row['district']): row['id'] for row in cursor.fetchall()}
+            if ids:
+                Region._ids = ids
+            return ids
+        return Region._ids
+    
+    @staticmethod
+    def resolve(cursor, state=None, district=None, location=None):
+        """Region id for worker state/district or a free-text location (None if unmatched)"""
+        match = match_region(state=state, district=district, location=location)
+        if not match:
+            return None
+        ids = Region.ids(cursor)
+        return ids.get(match) or ids.get((match[0], ''))
+    
+    @staticmethod
+    def get_all(state=None):
+        """Get all regions, optionally only one state's"""
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            if state:
+                cursor.execute("""
+                    SELECT id, state, district, latitude, longitude FROM regions
+                    WHERE state = %s ORDER BY district
+                """, (state,))
+            else:
+                cursor.execute("SELECT id, state, district, latitude, longitude FROM regions ORDER BY state, district")
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def summary():
+        """Get {region_id: {'workers', 'open_jobs', 'complaints'}} counted with integer GROUP BYs"""
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            counts = {}
+            queries = {
+                'workers': "SELECT region_id, COUNT(*) as count FROM workers WHERE status = 'active' GROUP BY region_id",
+                'open_jobs': "SELECT region_id, COUNT(*) as count FROM jobs WHERE status = 'open' GROUP BY region_id",
+                'complaints': """
+                    SELECT w.region_id, COUNT(*) as count
+                    FROM complaints c
+                    JOIN workers w ON c.worker_id = w.id
+                    GROUP BY w.region_id
+                """
+            }
+            for name, query in queries.items():
+                cursor.execute(query)
+                for row in cursor.fetchall():
+                    region = counts.setdefault(row['region_id'], {'workers': 0, 'open_jobs': 0, 'complaints': 0})
+                    region[name] = row['count']
+            return counts
+        finally:
+            conn.close()
+    
+    # Text columns each table is matched from, in backfill order (jobs fall back to their employer)
+    BACKFILL = {
+        'employers': "SELECT id, location FROM employers",
+        'workers': "SELECT id, state, district FROM workers",
+        'jobs': "SELECT id, location, employer_id FROM jobs"
+    }
+    
+    @staticmethod
+    def backfill(table, after_id=0, limit=200):
+        """Set region_id on the next chunk of rows without one
+
+        Returns (last_id, matched); last_id is None once the table is done.
+        """
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(Region.BACKFILL[table] + """
+                WHERE region_id IS NULL AND id > %s
+                ORDER BY id LIMIT %s
+            """, (after_id, limit))
+            rows = cursor.fetchall()
+            if not rows:
+                return None, 0
+            
+            matched = 0
+            for row in rows:
+                if table == 'workers':
+                    region_id = Region.resolve(cursor, state=row['state'], district=row['district'])
+                elif table == 'jobs':
+                    region_id = Job.region_for(cursor, row['location'], row['employer_id'])
+                else:
+                    region_id = Region.resolve(cursor, location=row['location'])
+                if region_id:
+                    cursor.execute(f"UPDATE {table} SET region_id = %s WHERE id = %s", (region_id, row['id']))
+                    matched += 1
+            if table == 'jobs' and matched:
+                bump_version(cursor, JOBS)
+            conn.commit()
+            return rows[-1]['id'], matched
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
@@ -0,0 +1,198 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Monthly RANGE Partitioning for Append-Mostly Tables
+# =====================================================
+#
+# complaints is partitioned by month on its creation timestamp, so
+# date-bounded queries only read the partitions they need. MySQL requires,
+# for a partitioned table:
+#   - no foreign keys (Complaint.create checks the employer exists; no code
+#     path deletes workers or employers, which the keys would cascade from)
+#   - the partition column in the primary key and every unique key, so
+#     complaint_id is only unique per created_at; IDs come from the
+#     complaint_id_sequence table (migration 0017), never from MAX()+1
+# convert_statements() produces the ALTERs for that, and roll_forward()
+# keeps empty partitions ready for PARTITION_MONTHS_AHEAD months (the
+# task worker calls it daily).
+#
+# Queries only prune when they bound the partition column itself, e.g.
+# created_at >= %s AND created_at < %s - not DATE(created_at) = %s.
+
+from datetime import date
+from backend.db import get_connection, get_settings
+
+# {table: partition column}
+# job_applications is not partitioned: its UNIQUE(job_id, worker_id) would
+# have to include applied_at, which would no longer stop duplicate
+# applications, and it would lose its foreign keys.
+PARTITION_TARGETS = {
+    'complaints': 'created_at'
+}
+
+MAXVALUE_PARTITION = 'pmax'
+
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _partition_definition(month):
+    """PARTITION clause holding the rows of the given month"""
+    upper = _add_months(month, 1)
+    return (f"PARTITION p{month:%Y%m} VALUES LESS THAN "
+            f"(UNIX_TIMESTAMP('{upper:%Y-%m-%d} 00:00:00'))")
+
+
+def is_partitioned(cursor, table):
+    """Check whether a table is already partitioned"""
+    cursor.execute("""
+        SELECT COUNT(*) as count FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+    """, (table,))
+    return cursor.fetchone()['count'] > 0
+
+
+def existing_partitions(cursor, table):
+    """Names of a table's partitions, in order"""
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    return [row['PARTITION_NAME'] for row in cursor.fetchall()]
+
+
+def convert_statements(cursor, table, column, months_ahead=3):
+    """ALTER statements that convert an unpartitioned table to monthly partitions"""
+    statements = []
+
+    # Foreign keys from and to the table
+    cursor.execute("""
+        SELECT TABLE_NAME, CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)
+    """, (table, table))
+    for row in cursor.fetchall():
+        statements.append(f"ALTER TABLE {row['TABLE_NAME']} DROP FOREIGN KEY `{row['CONSTRAINT_NAME']}`")
+
+    # Unique keys must include the partition column
+    cursor.execute("""
+        SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) as columns
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+          AND NON_UNIQUE = 0 AND INDEX_NAME != 'PRIMARY'
+        GROUP BY INDEX_NAME
+    """, (table,))
+    unique_keys = cursor.fetchall()
+
+    key_changes = [
+        f"MODIFY {column} TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP",
+        "DROP PRIMARY KEY",
+        f"ADD PRIMARY KEY (id, {column})"
+    ]
+    for key in unique_keys:
+        columns = key['columns'].split(',')
+        if column not in columns:
+            columns.append(column)
+        key_changes.append(f"DROP INDEX `{key['INDEX_NAME']}`")
+        key_changes.append(f"ADD UNIQUE KEY `{key['INDEX_NAME']}` ({', '.join(columns)})")
+    statements.append(f"ALTER TABLE {table} " + ', '.join(key_changes))
+
+    cursor.execute(f"SELECT MIN({column}) as oldest FROM {table}")
+    oldest = cursor.fetchone()['oldest']
+    first = _month_start(oldest.date() if oldest else date.today())
+    last = _add_months(_month_start(date.today()), months_ahead)
+
+    definitions = []
+    month = first
+    while month <= last:
+        definitions.append(_partition_definition(month))
+        month = _add_months(month, 1)
+    definitions.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE")
+
+    statements.append(
+        f"ALTER TABLE {table} PARTITION BY RANGE (UNIX_TIMESTAMP({column})) (\n    "
+        + ',\n    '.join(definitions) + "\n)"
+    )
+    return statements
+
+
+def roll_forward_statement(cursor, table, months_ahead=3):
+    """REORGANIZE statement adding the missing future monthly partitions, or None"""
+    names = existing_partitions(cursor, table)
+    months = [name[1:] for name in names if name != MAXVALUE_PARTITION]
+    if not months:
+        return None
+
+    newest = date(int(months[-1][:4]), int(months[-1][4:]), 1)
+    target = _add_months(_month_start(date.today()), months_ahead)
+
+    definitions = []
+    month = _add_months(newest, 1)
+    while month <= target:
+        definitions.append(_partition_definition(month))
+        month = _add_months(month, 1)
+    if not definitions:
+        return None
+
+    # pmax is empty while it stays ahead of today, so splitting it is cheap
+    definitions.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE")
+    return (f"ALTER TABLE {table} REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO (\n    "
+            + ',\n    '.join(definitions) + "\n)")
+
+
+def plan(months_ahead=None, tables=None):
+    """Get [(table, statement)] needed to partition and roll forward the target tables"""
+    if months_ahead is None:
+        months_ahead = get_settings().get('PARTITION_MONTHS_AHEAD', 3)
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        steps = []
+        for table, column in PARTITION_TARGETS.items():
+            if tables and table not in tables:
+                continue
+            if is_partitioned(cursor, table):
+                statement = roll_forward_statement(cursor, table, months_ahead)
+                if statement:
+                    steps.append((table, statement))
+            else:
+                steps.extend((table, statement) for statement in convert_statements(cursor, table, column, months_ahead))
+        return steps
+    finally:
+        conn.close()
+
+
+def apply(steps):
+    """Run planned statements (DDL commits implicitly)"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        for _, statement in steps:
+            cursor.execute(statement)
+    finally:
+        conn.close()
+
+
+def roll_forward(months_ahead=None):
+    """Add future partitions to the already partitioned tables; returns tables changed"""
+    if months_ahead is None:
+        months_ahead = get_settings().get('PARTITION_MONTHS_AHEAD', 3)
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        changed = []
+        for table in PARTITION_TARGETS:
+            if not is_partitioned(cursor, table):
+                continue
+            statement = roll_forward_statement(cursor, table, months_ahead)
+            if statement:
+                cursor.execute(statement)
+                changed.append(table)
+        return changed
+    finally:
+        conn.close()
@@ -0,0 +1,58 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Query Capture - Records the Statements the App Executes
+# =====================================================
+#
+# When QUERY_CAPTURE_FILE is set, every SELECT/UPDATE/DELETE run through
+# backend.db connections is appended to that file as one JSON line:
+#   {"fingerprint": <statement with %s placeholders>,
+#    "sql": <statement with the actual values>, "ms": <duration>}
+# index_advisor.py reads the file. Leave capture off in production; it
+# costs a file write per statement.
+
+import json
+import threading
+import time
+import pymysql
+
+_capture_file = None
+_lock = threading.Lock()
+
+CAPTURED_VERBS = ('SELECT', 'UPDATE', 'DELETE')
+
+
+def configure(config):
+    """Turn capture on or off from the app configuration"""
+    global _capture_file
+    _capture_file = config.get('QUERY_CAPTURE_FILE') or None
+
+
+def enabled():
+    return _capture_file is not None
+
+
+class CapturingCursor(pymysql.cursors.DictCursor):
+    """DictCursor that records each statement and its duration"""
+
+    def execute(self, query, args=None):
+        # Only successful statements are recorded; a failed one raises as
+        # usual (mogrify could fail on the same bad arguments and hide it)
+        started = time.perf_counter()
+        result = super().execute(query, args)
+        elapsed = (time.perf_counter() - started) * 1000
+        record(query, self.mogrify(query, args), elapsed)
+        return result
+
+
+def record(query, sql, ms):
+    """Append one statement to the capture file"""
+    path = _capture_file
+    if path is None:
+        return
+    fingerprint = ' '.join(query.split())
+    if not fingerprint.lstrip('( ').upper().startswith(CAPTURED_VERBS):
+        return
+    line = json.dumps({'fingerprint': fingerprint, 'sql': ' '.join(sql.split()), 'ms': round(ms, 3)})
+    with _lock:
+        with open(path, 'a', encoding='utf-8') as capture:
+            capture.write(line + '\n')
@@ -0,0 +1,320 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Rate Limiting - Token Buckets, Admission Control and Login Limiter
+# =====================================================
+#
+# Every /api request takes a token from a bucket per client IP and, when
+# the request carries a session, one per principal. Quotas come from
+# RATE_LIMITS, looked up by endpoint ('auth.register') and then by
+# blueprint ('job'). An empty bucket gets 429 with Retry-After. Worker
+# and employer logins map to None and take no tokens; the login limiter
+# below covers them.
+#
+# Before any of that, requests are shed with 429 while this process
+# already holds ADMISSION_MAX_DB_CONNECTIONS database connections, so an
+# overloaded database is not handed more work.
+#
+# Failed logins are counted per client IP and per migrant_id (employer_id
+# for employer logins) in fixed windows. Once a key reaches its limit,
+# further attempts are rejected with 429 until the window ends, before
+# any database work is done.
+# Successful logins are never counted, so a shift change with many
+# workers behind one NAT address is only limited by its failures.
+#
+# The memory backends count per process; use RATE_LIMIT_BACKEND = 'redis'
+# to share the counts between workers and hosts.
+
+import threading
+import time
+from flask import jsonify, request, session
+from backend import db, metrics
+from backend.db import get_settings
+
+
+class MemoryCounter:
+    """In-process fixed-window counters"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def incr(self, key, window):
+        now = time.time()
+        with self._lock:
+            expires_at, count = self._counts.get(key, (0, 0))
+            if expires_at <= now:
+                expires_at, count = now + window, 0
+            self._counts[key] = (expires_at, count + 1)
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                self._purge(now)
+            return count + 1
+
+    def get(self, key):
+        """Get (count, seconds until the window ends)"""
+        now = time.time()
+        with self._lock:
+            expires_at, count = self._counts.get(key, (0, 0))
+        if expires_at <= now:
+            return 0, 0
+        return count, expires_at - now
+
+    def delete(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def _purge(self, now):
+        for key in [key for key, (expires_at, _) in self._counts.items() if expires_at <= now]:
+            del self._counts[key]
+
+
+class RedisCounter:
+    """Redis fixed-window counters shared by all processes"""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND = 'redis' requires the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+
+    def incr(self, key, window):
+        count = self.client.incr(key)
+        if count == 1:
+            # First failure opens the window
+            self.client.expire(key, int(window))
+        return count
+
+    def get(self, key):
+        pipe = self.client.pipeline()
+        pipe.get(key)
+        pipe.ttl(key)
+        count, ttl = pipe.execute()
+        if count is None or ttl is None or ttl < 0:
+            return 0, 0
+        return int(count), ttl
+
+    def delete(self, key):
+        self.client.delete(key)
+
+
+class MemoryBuckets:
+    """In-process token buckets"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def take(self, key, rate, burst):
+        """Take one token; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                self._purge(now)
+            return wait
+
+    def _purge(self, now):
+        """Forget buckets idle long enough to have refilled (they start full anyway)"""
+        idle = [key for key, (_, last) in self._buckets.items() if now - last > 3600]
+        for key in idle:
+            del self._buckets[key]
+
+
+# Refill, take one token and return the wait in seconds, atomically in Redis
+TOKEN_BUCKET_SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Token buckets shared by all processes"""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND = 'redis' requires the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key, rate, burst):
+        return float(self.script(keys=[key], args=[rate, burst, time.time()]))
+
+
+class AttemptLimiter:
+    """Limits failures per identity, e.g. rules = {'ip': (30, 300), 'migrant_id': (5, 300)}"""
+
+    def __init__(self, name, counter, rules):
+        self.name = name
+        self.counter = counter
+        self.rules = rules
+
+    def _key(self, kind, value):
+        return f"mlgms:rl:{self.name}:{kind}:{value}"
+
+    def retry_after(self, **identities):
+        """Seconds until attempts are allowed again (0 if allowed now)"""
+        wait = 0
+        for kind, value in identities.items():
+            if not value or kind not in self.rules:
+                continue
+            limit, _ = self.rules[kind]
+            count, remaining = self.counter.get(self._key(kind, value))
+            if count >= limit:
+                wait = max(wait, remaining)
+        return int(wait + 0.999)
+
+    def failed(self, **identities):
+        for kind, value in identities.items():
+            if value and kind in self.rules:
+                self.counter.incr(self._key(kind, value), self.rules[kind][1])
+
+    def succeeded(self, **identities):
+        """Clear failures for the identities that just proved themselves"""
+        for kind, value in identities.items():
+            if value and kind in self.rules:
+                self.counter.delete(self._key(kind, value))
+
+
+_counter = None
+_buckets = None
+_login_limiters = {}
+_lock = threading.Lock()
+
+
+def get_counter():
+    """Get the process-wide counter backend, created from config on first use"""
+    global _counter
+    if _counter is None:
+        with _lock:
+            if _counter is None:
+                settings = get_settings()
+                if settings.get('RATE_LIMIT_BACKEND', 'memory') == 'redis':
+                    _counter = RedisCounter(settings.get('RATE_LIMIT_REDIS_URL'))
+                else:
+                    _counter = MemoryCounter()
+    return _counter
+
+
+def get_buckets():
+    """Get the process-wide token bucket store, created from config on first use"""
+    global _buckets
+    if _buckets is None:
+        with _lock:
+            if _buckets is None:
+                settings = get_settings()
+                if settings.get('RATE_LIMIT_BACKEND', 'memory') == 'redis':
+                    _buckets = RedisBuckets(settings.get('RATE_LIMIT_REDIS_URL'))
+                else:
+                    _buckets = MemoryBuckets()
+    return _buckets
+
+
+# Probes must keep working while the server is overloaded
+EXEMPT_ENDPOINTS = {'health_check', 'get_metrics'}
+
+
+def principal():
+    """Identify the caller's session without a database lookup (None if anonymous)
+
+    The value is not verified here - a made-up token only gets its own
+    bucket, and the IP bucket still applies.
+    """
+    if session.get('worker_id'):
+        return f"worker:{session['worker_id']}"
+    employer_session = session.get('employer_session') or request.headers.get('X-Employer-Session')
+    if employer_session:
+        return f"employer:{employer_session}"
+    token = request.headers.get('Authorization') or request.headers.get('X-Admin-ID')
+    if token:
+        return f"token:{token[:128]}"
+    return None
+
+
+def quota_for(config):
+    """(requests, per_seconds) for the current endpoint, or None if unlimited"""
+    limits = config.get('RATE_LIMITS', {})
+    if request.endpoint in limits:
+        return limits[request.endpoint]
+    if request.blueprint in limits:
+        return limits[request.blueprint]
+    return config.get('RATE_LIMIT_DEFAULT')
+
+
+def too_many_requests(message, retry_after):
+    retry_after = max(1, int(retry_after + 0.999))
+    response = jsonify({
+        'success': False,
+        'message': message,
+        'retry_after': retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def admission_control():
+    """before_request hook: shed load when the database is saturated, then apply quotas"""
+    if not request.path.startswith('/api/') or request.endpoint in EXEMPT_ENDPOINTS:
+        return None
+    config = get_settings()
+
+    max_connections = config.get('ADMISSION_MAX_DB_CONNECTIONS', 0)
+    if max_connections and db.open_connections() >= max_connections:
+        metrics.increment('requests_shed_total')
+        return too_many_requests('Server is busy. Please try again shortly.', 1)
+
+    quota = quota_for(config)
+    if not quota:
+        return None
+    requests_allowed, per_seconds = quota
+    rate = requests_allowed / per_seconds
+    scope = request.endpoint if request.endpoint in config.get('RATE_LIMITS', {}) else request.blueprint
+
+    buckets = get_buckets()
+    identities = [f"ip:{request.remote_addr}"]
+    caller = principal()
+    if caller:
+        identities.append(caller)
+    for identity in identities:
+        wait = buckets.take(f"mlgms:tb:{scope}:{identity}", rate, requests_allowed)
+        if wait:
+            metrics.increment('requests_rate_limited_total')
+            return too_many_requests('Too many requests. Please slow down.', wait)
+    return None
+
+
+
+def init_rate_limiting(app):
+    """Register the admission control hook unless RATE_LIMIT_ENABLED is off"""
+    if app.config.get('RATE_LIMIT_ENABLED', True):
+        app.before_request(admission_control)
+
+
+def get_login_limiter(id_kind='migrant_id'):
+    """Get the login attempt limiter for workers ('migrant_id') or employers ('employer_id')"""
+    if id_kind not in _login_limiters:
+        settings = get_settings()
+        window = settings.get('LOGIN_FAILURE_WINDOW', 300)
+        name = 'login' if id_kind == 'migrant_id' else 'employer_login'
+        _login_limiters[id_kind] = AttemptLimiter(name, get_counter(), {
+            'ip': (settings.get('LOGIN_MAX_FAILURES_PER_IP', 30), window),
+            id_kind: (settings.get('LOGIN_MAX_FAILURES_PER_ID', 5), window)
+        })
+    return _login_limiters[id_kind]
@@ -0,0 +1,144 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Region Matching - Free-Text Locations to (state, district)
+# =====================================================
+#
+# workers.state/district, jobs.location and employers.location are typed
+# by people ("Bombay", "Maharastra", "Delhi NCR", "MH"). match_region()
+# turns them into a canonical (state, district) pair, which maps to an
+# integer id in the regions table:
+#   - states and union territories by name, old name or vehicle code,
+#     with typo-tolerant (difflib) matching on full names
+#   - districts/cities from the gazetteer (backend/geo.py), same way
+# A known state with an unknown district matches the state-level region
+# (district ''), so grouping by state still works.
+
+import difflib
+from backend.geo import normalize, get_gazetteer
+
+# Canonical name -> other spellings (old names, abbreviations, vehicle codes)
+STATES = {
+    'Andhra Pradesh': ['AP'],
+    'Arunachal Pradesh': ['AR'],
+    'Assam': ['AS'],
+    'Bihar': ['BR'],
+    'Chhattisgarh': ['CG', 'Chattisgarh', 'Chhatisgarh'],
+    'Goa': ['GA'],
+    'Gujarat': ['GJ', 'Gujrat'],
+    'Haryana': ['HR'],
+    'Himachal Pradesh': ['HP'],
+    'Jharkhand': ['JH'],
+    'Karnataka': ['KA'],
+    'Kerala': ['KL'],
+    'Madhya Pradesh': ['MP'],
+    'Maharashtra': ['MH'],
+    'Manipur': ['MN'],
+    'Meghalaya': ['ML'],
+    'Mizoram': ['MZ'],
+    'Nagaland': ['NL'],
+    'Odisha': ['OD', 'OR', 'Orissa'],
+    'Punjab': ['PB'],
+    'Rajasthan': ['RJ'],
+    'Sikkim': ['SK'],
+    'Tamil Nadu': ['TN', 'Tamilnadu'],
+    'Telangana': ['TS', 'TG'],
+    'Tripura': ['TR'],
+    'Uttar Pradesh': ['UP'],
+    'Uttarakhand': ['UK', 'Uttaranchal'],
+    'West Bengal': ['WB', 'Bengal'],
+    'Andaman and Nicobar Islands': ['AN', 'Andaman', 'Andaman & Nicobar'],
+    'Chandigarh': ['CH'],
+    'Dadra and Nagar Haveli and Daman and Diu': ['DD', 'DN', 'Daman', 'Diu', 'Dadra and Nagar Haveli'],
+    'Delhi': ['DL', 'NCT of Delhi', 'Delhi NCR', 'NCR'],
+    'Jammu and Kashmir': ['JK', 'J&K', 'Jammu & Kashmir'],
+    'Ladakh': ['LA'],
+    'Lakshadweep': ['LD'],
+    'Puducherry': ['PY', 'Pondicherry']
+}
+
+# Typos closer than this to a known name count as that name
+FUZZY_CUTOFF = 0.85
+# Codes like 'UP' are only trusted as exact matches
+MIN_FUZZY_LENGTH = 4
+
+_state_names = {}
+for _state, _aliases in STATES.items():
+    for _name in [_state] + _aliases:
+        _state_names[normalize(_name)] = _state
+
+
+def _fuzzy(text, choices):
+    """Closest choice to text, or None"""
+    if len(text) < MIN_FUZZY_LENGTH:
+        return None
+    matches = difflib.get_close_matches(text, choices, n=1, cutoff=FUZZY_CUTOFF)
+    return matches[0] if matches else None
+
+
+def match_state(text):
+    """Canonical state name for free text, or None"""
+    key = normalize(text)
+    if not key:
+        return None
+    if key in _state_names:
+        return _state_names[key]
+    key = _fuzzy(key, [name for name in _state_names if len(name) >= MIN_FUZZY_LENGTH])
+    return _state_names[key] if key else None
+
+
+def match_district(text, state=None):
+    """Gazetteer place for a district/city name, preferring places in state, or None"""
+    key = normalize(text)
+    if not key:
+        return None
+    places = get_gazetteer()
+    if key not in places:
+        if state:
+            # Only consider names in the known state, so a typo cannot jump states
+            candidates = [name for name, matches in places.items()
+                          if any(place['state'] == state for place in matches)]
+        else:
+            candidates = list(places)
+        key = _fuzzy(key, candidates)
+        if not key:
+            return None
+    matches = places[key]
+    for place in matches:
+        if place['state'] == state:
+            return place
+    return None if state else matches[0]
+
+
+def match_region(state=None, district=None, location=None):
+    """(state, district) for worker fields or a free-text location, or None
+
+    district is '' when only the state could be matched.
+    """
+    parts = [part for part in (location or '').replace('/', ',').replace(';', ',').split(',') if part.strip()]
+    if state is None and district is None and parts:
+        # "City, State" - any part may be either; a city wins over a state name
+        states = [match_state(part) for part in parts if normalize(part) not in get_gazetteer()]
+        state = next((name for name in states if name), None)
+        for part in parts:
+            place = match_district(part, state)
+            if place:
+                return place['state'], place['name']
+        return (state, '') if state else None
+
+    canonical_state = match_state(state) if state else None
+    place = match_district(district, canonical_state) if district else None
+    if place:
+        return place['state'], place['name']
+    return (canonical_state, '') if canonical_state else None
+
+
+def region_rows():
+    """Every (state, district, latitude, longitude) the regions table is seeded with"""
+    rows = [(state, '', None, None) for state in STATES]
+    seen = set()
+    for matches in get_gazetteer().values():
+        for place in matches:
+            if (place['state'], place['name']) not in seen:
+                seen.add((place['state'], place['name']))
+                rows.append((place['state'], place['name'], place['latitude'], place['longitude']))
+    return rows
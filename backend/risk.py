@@ -0,0 +1,300 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Employer Risk Scores - Complaint Counts and Recency-Weighted Score
+# =====================================================
+#
+# employer_risk keeps, per employer, the number of complaints (all and
+# still open) and a risk score; employer_complaint_categories has the same
+# counts per category. Both are updated in the complaint's own transaction
+# (complaint_filed / status_changed), so listing employers with their risk
+# never joins the complaints table.
+#
+# The score sums each complaint's category weight (RISK_CATEGORY_WEIGHTS),
+# halved every RISK_HALF_LIFE_DAYS since the complaint was filed; rejected
+# complaints count for nothing. Every term decays at the same rate, so
+# the stored risk_key holds the terms scaled up to their filing time
+# (weight * 2^(days since RISK_EPOCH / half-life)) and never needs
+# decaying; score() scales it back down to now, and ordering by risk_key
+# is ordering by score.
+#
+# Counts change with every complaint, so they are kept out of the
+# version-keyed employer cache and ETags: public employer reads take them
+# from snapshot(), reloaded once per RISK_SNAPSHOT_SECONDS wall-clock
+# window, and the ETag carries that window (etag_part()).
+#
+# Each row records the formula (weights and half-life) it was computed
+# with. After changing those, recompute() rebuilds the stale rows from the
+# full complaint history in chunks (maintenance.py rescore-employers).
+# Until it reaches an employer, a complaint change against that employer
+# rebuilds its row instead of adding a term under the new formula.
+
+import hashlib
+import json
+import math
+import threading
+import time
+from datetime import datetime
+from backend.db import get_connection, get_settings
+
+RISK_EPOCH = datetime(2024, 1, 1)
+
+# Shorter half-lives overflow a double within a few decades of RISK_EPOCH
+MIN_HALF_LIFE_DAYS = 30
+# 2^MAX_GROWTH_EXPONENT leaves room to sum many terms below the double limit
+MAX_GROWTH_EXPONENT = 900
+
+OPEN_STATUSES = ('pending', 'in_progress')
+
+LEVELS = ('low', 'medium', 'high')
+
+
+def _half_life():
+    return get_settings().get('RISK_HALF_LIFE_DAYS', 180)
+
+
+def validate_config(settings):
+    """Reject scoring settings that would overflow risk_key (called by create_app)"""
+    half_life = settings.get('RISK_HALF_LIFE_DAYS', 180)
+    if not isinstance(half_life, (int, float)) or half_life < MIN_HALF_LIFE_DAYS:
+        raise ValueError(f"RISK_HALF_LIFE_DAYS must be a number of at least {MIN_HALF_LIFE_DAYS}")
+
+
+def weight(category):
+    settings = get_settings()
+    return settings.get('RISK_CATEGORY_WEIGHTS', {}).get(category, settings.get('RISK_DEFAULT_WEIGHT', 1))
+
+
+def formula():
+    """Short fingerprint of the current scoring settings"""
+    settings = get_settings()
+    described = json.dumps([settings.get('RISK_CATEGORY_WEIGHTS', {}), settings.get('RISK_DEFAULT_WEIGHT', 1),
+                            _half_life()], sort_keys=True)
+    return hashlib.sha1(described.encode('utf-8')).hexdigest()[:8]
+
+
+def _growth(moment):
+    """2^(days since RISK_EPOCH / half-life)"""
+    exponent = (moment - RISK_EPOCH).total_seconds() / 86400 / _half_life()
+    return 2 ** min(exponent, MAX_GROWTH_EXPONENT)
+
+
+def contribution(complaint):
+    """A complaint's term in risk_key"""
+    return weight(complaint['category']) * _growth(complaint['created_at'])
+
+
+def score(risk_key):
+    """The recency-weighted score today for a stored risk_key"""
+    return round((risk_key or 0) / _growth(datetime.now()), 2)
+
+
+def level(risk_score):
+    low, high = get_settings().get('RISK_LEVEL_THRESHOLDS', (3, 8))
+    if risk_score >= high:
+        return LEVELS[2]
+    return LEVELS[1] if risk_score >= low else LEVELS[0]
+
+
+def _apply(cursor, complaint, total, opened, key):
+    current = formula()
+    cursor.execute("SELECT formula FROM employer_risk WHERE employer_id = %s FOR UPDATE",
+                   (complaint['employer_id'],))
+    row = cursor.fetchone()
+    if row and row['formula'] != current:
+        # A term under the new formula cannot be added to a key built with the
+        # old one; rebuild the employer instead (the complaint is already changed)
+        _rebuild(cursor, [complaint['employer_id']], current)
+        return
+    cursor.execute("""
+        INSERT INTO employer_risk (employer_id, complaints_total, complaints_open, risk_key, formula)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE complaints_total = complaints_total + VALUES(complaints_total),
+                                complaints_open = complaints_open + VALUES(complaints_open),
+                                risk_key = risk_key + VALUES(risk_key)
+    """, (complaint['employer_id'], total, opened, key, current))
+    cursor.execute("""
+        INSERT INTO employer_complaint_categories (employer_id, category, total, open_count)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE total = total + VALUES(total), open_count = open_count + VALUES(open_count)
+    """, (complaint['employer_id'], complaint['category'], total, opened))
+
+
+def complaint_filed(cursor, complaint):
+    """Count a new complaint against its employer (complaint: employer_id, category, created_at)"""
+    if complaint.get('employer_id'):
+        _apply(cursor, complaint, 1, 1, contribution(complaint))
+
+
+def status_changed(cursor, complaint, status):
+    """Update the counts for complaint (the row before the change) moving to status"""
+    previous = complaint.get('status')
+    if not complaint.get('employer_id') or previous == status:
+        return
+    opened = (status in OPEN_STATUSES) - (previous in OPEN_STATUSES)
+    key = 0
+    if status == 'rejected':
+        key = -contribution(complaint)
+    elif previous == 'rejected':
+        key = contribution(complaint)
+    if opened or key:
+        _apply(cursor, complaint, 0, opened, key)
+
+
+def _rebuild(cursor, ids, current):
+    """Overwrite the risk and category rows of employers ids from all their complaints"""
+    placeholders = ', '.join(['%s'] * len(ids))
+    rate = math.log(2) / _half_life()
+    counts = {}
+    for table in ('complaints', 'complaints_archive'):
+        cursor.execute(f"""
+            SELECT employer_id, category, COUNT(*) as total,
+                   SUM(status IN ('pending', 'in_progress')) as open_count,
+                   SUM(CASE WHEN status != 'rejected'
+                            THEN EXP(%s * TIMESTAMPDIFF(SECOND, %s, created_at) / 86400) ELSE 0 END) as growth
+            FROM {table}
+            WHERE employer_id IN ({placeholders})
+            GROUP BY employer_id, category
+        """, [rate, RISK_EPOCH] + ids)
+        for row in cursor.fetchall():
+            cell = counts.setdefault((row['employer_id'], row['category']), [0, 0, 0.0])
+            cell[0] += int(row['total'])
+            cell[1] += int(row['open_count'] or 0)
+            cell[2] += float(row['growth'] or 0)
+
+    risk = {employer_id: [0, 0, 0.0] for employer_id in ids}
+    for (employer_id, category), (total, open_count, growth) in counts.items():
+        risk[employer_id][0] += total
+        risk[employer_id][1] += open_count
+        risk[employer_id][2] += weight(category) * growth
+
+    cursor.execute(f"DELETE FROM employer_complaint_categories WHERE employer_id IN ({placeholders})", ids)
+    if counts:
+        cursor.executemany("""
+            INSERT INTO employer_complaint_categories (employer_id, category, total, open_count)
+            VALUES (%s, %s, %s, %s)
+        """, [(employer_id, category, total, open_count)
+              for (employer_id, category), (total, open_count, _) in counts.items()])
+    cursor.executemany("""
+        INSERT INTO employer_risk (employer_id, complaints_total, complaints_open, risk_key, formula)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE complaints_total = VALUES(complaints_total),
+                                complaints_open = VALUES(complaints_open),
+                                risk_key = VALUES(risk_key), formula = VALUES(formula)
+    """, [(employer_id, total, open_count, key, current)
+          for employer_id, (total, open_count, key) in risk.items()])
+
+
+def recompute(after_id=0, limit=200, stale_only=True):
+    """Rebuild the risk rows of the next chunk of employers from all their complaints
+
+    With stale_only, employers whose row already matches the current
+    formula are skipped. Returns (last_id, recomputed); last_id is None
+    once every employer has been visited.
+    """
+    current = formula()
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        # Locking the employer and employer_risk rows makes concurrent
+        # complaint updates wait for this chunk, so they apply on top of the
+        # recomputed values
+        cursor.execute("""
+            SELECT e.id, r.formula FROM employers e
+            LEFT JOIN employer_risk r ON r.employer_id = e.id
+            WHERE e.id > %s
+            ORDER BY e.id
+            LIMIT %s
+            FOR UPDATE
+        """, (after_id, limit))
+        employers = cursor.fetchall()
+        if not employers:
+            conn.commit()
+            return None, 0
+        last_id = employers[-1]['id']
+        ids = [row['id'] for row in employers if not stale_only or row['formula'] != current]
+        if not ids:
+            conn.commit()
+            return last_id, 0
+
+        _rebuild(cursor, ids, current)
+        conn.commit()
+        return last_id, len(ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+_snapshot = (None, {})
+_snapshot_lock = threading.Lock()
+
+
+def generation():
+    """Index of the current RISK_SNAPSHOT_SECONDS window (the same in every process)"""
+    return int(time.time() // get_settings().get('RISK_SNAPSHOT_SECONDS', 60))
+
+
+def etag_part():
+    """ETag component for responses carrying snapshot() values"""
+    return {'employer_risk': generation()}
+
+
+def snapshot():
+    """{employer_id: {complaints_total, complaints_open, risk_key}}, reloaded once per window"""
+    global _snapshot
+    current = generation()
+    if _snapshot[0] != current:
+        with _snapshot_lock:
+            if _snapshot[0] != current:
+                conn = get_connection(readonly=True)
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                        SELECT employer_id, complaints_total, complaints_open, risk_key FROM employer_risk
+                    """)
+                    rows = {row.pop('employer_id'): row for row in cursor.fetchall()}
+                finally:
+                    conn.close()
+                _snapshot = (current, rows)
+    return _snapshot[1]
+
+
+def describe(row):
+    """Risk fields for an employer row joined to employer_risk (risk_key, complaints_total, complaints_open)"""
+    risk_score = score(row.get('risk_key'))
+    return {
+        'complaints_total': int(row.get('complaints_total') or 0),
+        'complaints_open': int(row.get('complaints_open') or 0),
+        'risk_score': risk_score,
+        'risk_level': level(risk_score)
+    }
+
+
+def categories(employer_id):
+    """Complaint counts per category for one employer, most complaints first"""
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT category, total, open_count FROM employer_complaint_categories
+            WHERE employer_id = %s
+            ORDER BY total DESC, category
+        """, (employer_id,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def summary(employer_id):
+    """Risk fields (as in describe) for one employer"""
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT complaints_total, complaints_open, risk_key FROM employer_risk
+            WHERE employer_id = %s
+        """, (employer_id,))
+        return describe(cursor.fetchone() or {})
+    finally:
+        conn.close()
@@ -0,0 +1,234 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Complaint Rollup - Pre-aggregated Fact Table for Analytics
+# =====================================================
+#
+# complaint_rollup holds one row per (month, worker region, employer,
+# category) with complaint counts by status. refresh() keeps it current
+# incrementally:
+#   1. find the months of complaints whose updated_at passed the
+#      watermark (new complaints and status changes both bump updated_at)
+#   2. recompute each of those months from complaints + complaints_archive
+#      with one GROUP BY bounded on created_at (partition-pruned), and
+#      replace the month's rows in one short transaction
+#   3. move the watermark
+# The watermark trails NOW() by ROLLUP_LAG_SECONDS so transactions still
+# committing are picked up by the next run. Deleted workers' complaints
+# and region changes are only reflected by a full rebuild().
+#
+# slice_complaints() answers analytics queries from the rollup alone.
+
+from datetime import date, datetime
+from backend.db import get_connection, get_settings
+
+WATERMARK = 'complaint_rollup'
+
+STATUSES = ('pending', 'in_progress', 'resolved', 'rejected')
+
+# Dimension -> (SELECT expressions, GROUP BY expressions)
+DIMENSIONS = {
+    'month': (['f.month'], ['f.month']),
+    'category': (['f.category'], ['f.category']),
+    'state': (["COALESCE(r.state, 'Unmatched') as state"], ['r.state']),
+    'district': (["COALESCE(r.state, 'Unmatched') as state", "r.district"], ['r.state', 'r.district']),
+    'employer': (['f.employer_id', 'e.company_name as employer_name'], ['f.employer_id', 'e.company_name'])
+}
+
+MAX_ROWS = 1000
+
+
+def _add_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def get_watermark(cursor):
+    cursor.execute("SELECT watermark FROM rollup_watermarks WHERE name = %s", (WATERMARK,))
+    row = cursor.fetchone()
+    return row['watermark'] if row else None
+
+
+def _set_watermark(cursor, watermark):
+    cursor.execute("""
+        INSERT INTO rollup_watermarks (name, watermark) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE watermark = VALUES(watermark)
+    """, (WATERMARK, watermark))
+
+
+def rebuild_month(conn, month):
+    """Recompute one month of the rollup; returns the number of fact rows"""
+    cursor = conn.cursor()
+    upper = _add_month(month)
+    counts = ', '.join(f"SUM(c.status = '{status}') as {status}" for status in STATUSES)
+    rows = []
+    for table in ('complaints', 'complaints_archive'):
+        cursor.execute(f"""
+            SELECT COALESCE(w.region_id, 0) as region_id, COALESCE(c.employer_id, 0) as employer_id,
+                   c.category, COUNT(*) as total, {counts}
+            FROM {table} c
+            LEFT JOIN workers w ON c.worker_id = w.id
+            WHERE c.created_at >= %s AND c.created_at < %s
+            GROUP BY COALESCE(w.region_id, 0), COALESCE(c.employer_id, 0), c.category
+        """, (month, upper))
+        rows.extend(cursor.fetchall())
+
+    # A cell can appear in both tables; add them up
+    facts = {}
+    for row in rows:
+        key = (row['region_id'], row['employer_id'], row['category'])
+        fact = facts.setdefault(key, dict.fromkeys(('total',) + STATUSES, 0))
+        for name in fact:
+            fact[name] += int(row[name] or 0)
+
+    try:
+        cursor.execute("DELETE FROM complaint_rollup WHERE month = %s", (month,))
+        if facts:
+            cursor.executemany(f"""
+                INSERT INTO complaint_rollup (month, region_id, employer_id, category, total, {', '.join(STATUSES)})
+                VALUES (%s, %s, %s, %s, %s, {', '.join(['%s'] * len(STATUSES))})
+            """, [(month, region_id, employer_id, category, fact['total'], *(fact[status] for status in STATUSES))
+                  for (region_id, employer_id, category), fact in facts.items()])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(facts)
+
+
+def refresh(lag=None):
+    """Rebuild the months touched since the watermark; returns the months rebuilt"""
+    if lag is None:
+        lag = get_settings().get('ROLLUP_LAG_SECONDS', 120)
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT NOW() - INTERVAL %s SECOND as until", (lag,))
+        until = cursor.fetchone()['until']
+        since = get_watermark(cursor)
+        if since is None:
+            conn.commit()
+            return rebuild(until)
+
+        cursor.execute("""
+            SELECT DISTINCT YEAR(created_at) as year, MONTH(created_at) as month
+            FROM complaints
+            WHERE updated_at > %s AND updated_at <= %s
+        """, (since, until))
+        months = sorted(date(row['year'], row['month'], 1) for row in cursor.fetchall())
+        conn.commit()
+
+        for month in months:
+            rebuild_month(conn, month)
+        _set_watermark(cursor, until)
+        conn.commit()
+        return months
+    finally:
+        conn.close()
+
+
+def rebuild(until=None):
+    """Recompute every month from scratch; returns the months rebuilt"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        if until is None:
+            cursor.execute("SELECT NOW() - INTERVAL %s SECOND as until",
+                           (get_settings().get('ROLLUP_LAG_SECONDS', 120),))
+            until = cursor.fetchone()['until']
+        cursor.execute("""
+            SELECT LEAST(COALESCE((SELECT MIN(created_at) FROM complaints), NOW()),
+                         COALESCE((SELECT MIN(created_at) FROM complaints_archive), NOW())) as oldest
+        """)
+        oldest = cursor.fetchone()['oldest']
+        conn.commit()
+
+        months = []
+        month = date(oldest.year, oldest.month, 1)
+        last = date(until.year, until.month, 1)
+        while month <= last:
+            rebuild_month(conn, month)
+            months.append(month)
+            month = _add_month(month)
+        if months:
+            # Months that no longer have complaints at all
+            cursor.execute("DELETE FROM complaint_rollup WHERE month < %s OR month > %s", (months[0], last))
+        _set_watermark(cursor, until)
+        conn.commit()
+        return months
+    finally:
+        conn.close()
+
+
+def _parse_month(value):
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+def slice_complaints(group_by, filters):
+    """Aggregate the rollup by the given dimensions
+
+    filters: from/to ('YYYY-MM', inclusive), category, state, region_id,
+    employer_id. Raises ValueError on unknown dimensions or bad filters.
+    Returns (rows, totals, watermark).
+    """
+    unknown = [name for name in group_by if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)} (use {', '.join(DIMENSIONS)})")
+
+    select, group = [], []
+    for name in group_by:
+        for expression in DIMENSIONS[name][0]:
+            if expression not in select:
+                select.append(expression)
+        for expression in DIMENSIONS[name][1]:
+            if expression not in group:
+                group.append(expression)
+
+    conditions, params = [], []
+    if filters.get('from'):
+        conditions.append("f.month >= %s")
+        params.append(_parse_month(filters['from']))
+    if filters.get('to'):
+        conditions.append("f.month <= %s")
+        params.append(_parse_month(filters['to']))
+    if filters.get('category'):
+        conditions.append("f.category = %s")
+        params.append(filters['category'])
+    if filters.get('state'):
+        conditions.append("r.state = %s")
+        params.append(filters['state'])
+    if filters.get('region_id'):
+        conditions.append("f.region_id = %s")
+        params.append(int(filters['region_id']))
+    if filters.get('employer_id'):
+        conditions.append("f.employer_id = %s")
+        params.append(int(filters['employer_id']))
+
+    measures = ['SUM(f.total) as total'] + [f"SUM(f.{status}) as {status}" for status in STATUSES]
+    source = """
+        FROM complaint_rollup f
+        LEFT JOIN regions r ON f.region_id = r.id
+        LEFT JOIN employers e ON f.employer_id = e.id
+    """
+    if conditions:
+        source += " WHERE " + " AND ".join(conditions)
+    query = f"SELECT {', '.join(select + measures)} {source}"
+    if group:
+        query += " GROUP BY " + ", ".join(group)
+    query += f" ORDER BY {'f.month, ' if 'month' in group_by else ''}total DESC LIMIT {MAX_ROWS}"
+
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.execute(f"SELECT {', '.join(measures)} {source}", params)
+        totals = cursor.fetchone()
+        watermark = get_watermark(cursor)
+    finally:
+        conn.close()
+
+    for row in rows + [totals]:
+        for name in ('total',) + STATUSES:
+            row[name] = int(row[name] or 0)
+        if 'month' in row:
+            row['month'] = row['month'].strftime('%Y-%m')
+    return rows, totals, watermark
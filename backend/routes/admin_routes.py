@@ -3,31 +3,24 @@
 # Admin Routes - For managing applications and complaints
 # =====================================================
 
+from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
-from backend.models import JobApplication, Complaint, Worker, Job
+from backend.models import Admin, JobApplication, Complaint, Worker, Job, Employer, Region
 from werkzeug.security import generate_password_hash, check_password_hash
-import pymysql
+from backend.db import get_connection
+from backend.versions import EMPLOYERS, bump_version
+from backend.tasks import enqueue
+from backend.rollup import slice_complaints
+from backend import dedup, events, risk, sla, triage
 
 admin_bp = Blueprint('admin', __name__)
 
-def get_connection():
-    """Get database connection"""
-    return pymysql.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='mlgms_db',
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=False
-    )
-
-
 def admin_required(f):
     """Decorator to check admin authentication"""
     def decorated_function(*args, **kwargs):
         # Simple admin check - in production use proper session/auth
         admin_id = request.headers.get('X-Admin-ID')
-        if not admin_id:
+        if not admin_id or not Admin.get_by_id(admin_id):
             return jsonify({
                 'success': False,
                 'message': 'Admin authentication required'
@@ -37,6 +30,30 @@ def admin_required(f):
     return decorated_function
 
 
+def date_window(column):
+    """Build conditions on column from ?from=YYYY-MM-DD&to=YYYY-MM-DD or ?days=N
+
+    The bounds compare the column directly (no DATE()), so MySQL only reads
+    the monthly partitions inside the window. Raises ValueError on bad input.
+    """
+    conditions = []
+    params = []
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    days = request.args.get('days')
+
+    if days:
+        date_from = (datetime.now() - timedelta(days=int(days))).strftime('%Y-%m-%d')
+    if date_from:
+        conditions.append(f"{column} >= %s")
+        params.append(datetime.strptime(date_from, '%Y-%m-%d'))
+    if date_to:
+        # 'to' is inclusive of the whole day
+        conditions.append(f"{column} < %s")
+        params.append(datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1))
+    return conditions, params
+
+
 # =====================================================
 # Admin Authentication
 # =====================================================
@@ -89,10 +106,18 @@ def admin_login():
 def get_all_applications():
     """Get all job applications (for admin)"""
     try:
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         cursor = conn.cursor()
         
         status_filter = request.args.get('status')
+        try:
+            conditions, params = date_window('a.applied_at')
+        except ValueError:
+            conn.close()
+            return jsonify({
+                'success': False,
+                'message': 'Invalid date range (use from/to=YYYY-MM-DD or days=N)'
+            }), 400
         
         query = """
             SELECT a.*, j.title as job_title, j.location, j.wage_per_day,
@@ -105,11 +130,12 @@ def get_all_applications():
         """
         
         if status_filter:
-            query += " WHERE a.status = %s"
-            cursor.execute(query, (status_filter,))
-        else:
-            query += " ORDER BY a.applied_at DESC"
-            cursor.execute(query)
+            conditions.append("a.status = %s")
+            params.append(status_filter)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY a.applied_at DESC"
+        cursor.execute(query, params)
         
         applications = cursor.fetchall()
         conn.close()
@@ -152,6 +178,7 @@ def accept_application(application_id):
     try:
         conn = get_connection()
         cursor = conn.cursor()
+        application = events.lock_application(cursor, application_id)
         
         # Update application status
         cursor.execute("""
@@ -162,7 +189,7 @@ def accept_application(application_id):
         
         # Get the application details
         cursor.execute("""
-            SELECT a.*, j.id as job_id, w.id as worker_id
+            SELECT a.*, j.id as job_id, j.employer_id, w.id as worker_id
             FROM job_applications a
             JOIN jobs j ON a.job_id = j.id
             JOIN workers w ON a.worker_id = w.id
@@ -172,15 +199,19 @@ def accept_application(application_id):
         app = cursor.fetchone()
         
         if app:
-            # Update worker's current employer
-            cursor.execute("""
-                UPDATE workers 
-                SET current_employer_id = (SELECT employer_id FROM jobs WHERE id = %s)
-                WHERE id = %s
-            """, (app['job_id'], app['worker_id']))
+            # Update worker's current employer after commit (background task).
+            # The key includes responded_at so accepting again after a
+            # rejection queues a new task.
+            enqueue('set_current_employer', {
+                'worker_id': app['worker_id'],
+                'employer_id': app['employer_id']
+            }, idempotency_key=f"accept_application:{app['id']}:{app['responded_at']:%Y%m%d%H%M%S}",
+               cursor=cursor)
         
         conn.commit()
         conn.close()
+        if application:
+            events.application_changed(application, 'accepted')
         
         return jsonify({
             'success': True,
@@ -201,6 +232,7 @@ def reject_application(application_id):
     try:
         conn = get_connection()
         cursor = conn.cursor()
+        application = events.lock_application(cursor, application_id)
         
         cursor.execute("""
             UPDATE job_applications 
@@ -210,6 +242,8 @@ def reject_application(application_id):
         
         conn.commit()
         conn.close()
+        if application:
+            events.application_changed(application, 'rejected')
         
         return jsonify({
             'success': True,
@@ -230,30 +264,45 @@ def reject_application(application_id):
 
 @admin_bp.route('/complaints', methods=['GET'])
 def get_all_complaints():
-    """Get all complaints (for admin)"""
+    """Get all complaints (for admin), newest first or by priority with ?sort=priority"""
     try:
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         cursor = conn.cursor()
         
         status_filter = request.args.get('status')
+        try:
+            conditions, params = date_window('c.created_at')
+        except ValueError:
+            conn.close()
+            return jsonify({
+                'success': False,
+                'message': 'Invalid date range (use from/to=YYYY-MM-DD or days=N)'
+            }), 400
         
         query = """
             SELECT c.*, w.name as worker_name, w.migrant_id, w.phone,
-                   e.company_name as employer_name
+                   e.company_name as employer_name, f.cluster_id as duplicate_cluster_id
             FROM complaints c
             JOIN workers w ON c.worker_id = w.id
             LEFT JOIN employers e ON c.employer_id = e.id
+            LEFT JOIN complaint_fingerprints f ON f.complaint_id = c.id
         """
         
         if status_filter:
-            query += " WHERE c.status = %s ORDER BY c.created_at DESC"
-            cursor.execute(query, (status_filter,))
+            conditions.append("c.status = %s")
+            params.append(status_filter)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if request.args.get('sort') == 'priority':
+            query += " ORDER BY c.priority_score DESC, c.created_at"
         else:
             query += " ORDER BY c.created_at DESC"
-            cursor.execute(query)
+        cursor.execute(query, params)
         
         complaints = cursor.fetchall()
         conn.close()
+        for complaint in complaints:
+            complaint['priority'] = triage.current_score(complaint)
         
         return jsonify({
             'success': True,
@@ -269,6 +318,111 @@ def get_all_complaints():
         }), 500
 
 
+@admin_bp.route('/complaints/next', methods=['POST'])
+@admin_required
+def claim_next_complaint():
+    """Assign the highest-priority pending complaint to the calling admin (?category= to narrow)"""
+    try:
+        admin_id = request.headers.get('X-Admin-ID')
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            claimed = complaint = triage.claim_next(cursor, admin_id, request.args.get('category'))
+            if complaint:
+                sla.status_changed(cursor, complaint, 'in_progress')
+                cursor.execute("""
+                    SELECT c.*, w.name as worker_name, w.migrant_id, w.phone,
+                           e.company_name as employer_name
+                    FROM complaints c
+                    JOIN workers w ON c.worker_id = w.id
+                    LEFT JOIN employers e ON c.employer_id = e.id
+                    WHERE c.id = %s
+                """, (complaint['id'],))
+                complaint = cursor.fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        
+        if not complaint:
+            return jsonify({
+                'success': True,
+                'message': 'No pending complaints',
+                'complaint': None
+            }), 200
+        
+        events.complaint_changed(claimed, 'in_progress', assigned_admin_id=complaint['assigned_admin_id'])
+        complaint['priority'] = triage.current_score(complaint)
+        return jsonify({
+            'success': True,
+            'message': f"Complaint {complaint['complaint_id']} assigned to you",
+            'complaint': complaint
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error claiming complaint',
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/complaints/<complaint_id>/release', methods=['POST'])
+@admin_required
+def release_complaint(complaint_id):
+    """Put the calling admin's claimed (in progress) complaint back in the pending queue"""
+    try:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            complaint = triage.release(cursor, complaint_id, request.headers.get('X-Admin-ID'))
+            if complaint:
+                sla.status_changed(cursor, complaint, 'pending')
+            conn.commit()
+        except PermissionError as e:
+            conn.rollback()
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 403
+        finally:
+            conn.close()
+        
+        if not complaint:
+            return jsonify({
+                'success': False,
+                'message': 'Complaint not found or not in progress'
+            }), 404
+        
+        events.complaint_changed(complaint, 'pending', assigned_admin_id=None)
+        return jsonify({
+            'success': True,
+            'message': 'Complaint returned to the queue'
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error releasing complaint',
+            'error': str(e)
+        }), 500
+
+
+def resolve_in_transaction(cursor, complaint_id, remarks, resolved_at):
+    """Mark one complaint resolved; returns the row before, or None"""
+    complaint = sla.lock_complaint(cursor, complaint_id)
+    cursor.execute("""
+        UPDATE complaints 
+        SET status = 'resolved', admin_remarks = %s, resolved_at = %s,
+            assigned_admin_id = NULL, claimed_at = NULL
+        WHERE id = %s OR complaint_id = %s
+    """, (remarks, resolved_at, complaint_id, complaint_id))
+    
+    if complaint:
+        sla.status_changed(cursor, complaint, 'resolved', resolved_at)
+        risk.status_changed(cursor, complaint, 'resolved')
+    return complaint
+
+
 @admin_bp.route('/complaints/<complaint_id>/resolve', methods=['POST'])
 def resolve_complaint(complaint_id):
     """Resolve a complaint"""
@@ -279,14 +433,12 @@ def resolve_complaint(complaint_id):
         conn = get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE complaints 
-            SET status = 'resolved', admin_remarks = %s, resolved_at = NOW()
-            WHERE id = %s OR complaint_id = %s
-        """, (remarks, complaint_id, complaint_id))
+        complaint = resolve_in_transaction(cursor, complaint_id, remarks, datetime.now())
         
         conn.commit()
         conn.close()
+        if complaint:
+            events.complaint_changed(complaint, 'resolved', admin_remarks=remarks, assigned_admin_id=None)
         
         return jsonify({
             'success': True,
@@ -301,6 +453,104 @@ def resolve_complaint(complaint_id):
         }), 500
 
 
+@admin_bp.route('/complaints/duplicates', methods=['GET'])
+def get_duplicate_clusters():
+    """Clusters of near-duplicate open complaints, largest first (?employer_id=, ?limit=)"""
+    try:
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        clusters = dedup.clusters(request.args.get('employer_id', type=int), limit)
+        
+        return jsonify({
+            'success': True,
+            'clusters': clusters,
+            'count': len(clusters)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching duplicate complaints',
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/complaints/clusters/<int:cluster_id>/resolve', methods=['POST'])
+def resolve_cluster(cluster_id):
+    """Resolve every open complaint in a duplicate cluster with the same remarks"""
+    try:
+        data = request.get_json(silent=True) or {}
+        remarks = data.get('remarks', '')
+        resolved_at = datetime.now()
+        
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            complaint_ids = dedup.cluster_members(cursor, cluster_id)
+            resolved = []
+            for complaint_id in complaint_ids:
+                resolved.append(resolve_in_transaction(cursor, complaint_id, remarks, resolved_at))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        for complaint in resolved:
+            if complaint:
+                events.complaint_changed(complaint, 'resolved', admin_remarks=remarks, assigned_admin_id=None)
+        
+        if not complaint_ids:
+            return jsonify({
+                'success': False,
+                'message': 'No open complaints in this cluster'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'message': f'Resolved {len(complaint_ids)} complaint(s)',
+            'resolved': len(complaint_ids)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error resolving complaints',
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/complaints/<int:complaint_id>/unlink', methods=['POST'])
+def unlink_duplicate(complaint_id):
+    """Take a complaint out of its duplicate cluster"""
+    try:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            unlinked = dedup.unlink(cursor, complaint_id)
+            conn.commit()
+        finally:
+            conn.close()
+        
+        if not unlinked:
+            return jsonify({
+                'success': False,
+                'message': 'Complaint has no fingerprint yet'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'message': 'Complaint is no longer marked as a duplicate'
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error unlinking complaint',
+            'error': str(e)
+        }), 500
+
+
 # =====================================================
 # Dashboard Stats
 # =====================================================
@@ -309,7 +559,7 @@ def resolve_complaint(complaint_id):
 def get_admin_stats():
     """Get admin dashboard statistics"""
     try:
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         cursor = conn.cursor()
         
         stats = {}
@@ -372,25 +622,204 @@ def get_admin_stats():
         }), 500
 
 
+@admin_bp.route('/regions/summary', methods=['GET'])
+def get_region_summary():
+    """Active workers, open jobs and complaints per state (?group=district for districts)"""
+    try:
+        group = request.args.get('group', 'state')
+        if group not in ('state', 'district'):
+            return jsonify({
+                'success': False,
+                'message': 'group must be state or district'
+            }), 400
+        
+        regions = {region['id']: region for region in Region.get_all()}
+        totals = {}
+        for region_id, counts in Region.summary().items():
+            region = regions.get(region_id)
+            if region is None:
+                key = ('Unmatched', None)
+            elif group == 'state':
+                key = (region['state'], None)
+            else:
+                key = (region['state'], region['district'] or None)
+            entry = totals.setdefault(key, {'state': key[0], 'district': key[1],
+                                            'workers': 0, 'open_jobs': 0, 'complaints': 0})
+            for name, count in counts.items():
+                entry[name] += count
+        
+        summary = sorted(totals.values(), key=lambda entry: (-entry['workers'], entry['state'], entry['district'] or ''))
+        if group == 'state':
+            for entry in summary:
+                del entry['district']
+        
+        return jsonify({
+            'success': True,
+            'regions': summary,
+            'count': len(summary)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching region summary',
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/analytics/complaints', methods=['GET'])
+def get_complaint_analytics():
+    """Complaint counts from the rollup, e.g. ?group_by=state,category&from=2024-01&to=2024-06
+
+    Dimensions: month, category, state, district, employer. Filters: from, to
+    (YYYY-MM), category, state, region_id, employer_id. Figures are as of
+    as_of (the last rollup refresh).
+    """
+    try:
+        group_by = [name.strip() for name in request.args.get('group_by', 'category').split(',') if name.strip()]
+        try:
+            rows, totals, watermark = slice_complaints(group_by, request.args)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid analytics query',
+                'error': str(e)
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'group_by': group_by,
+            'rows': rows,
+            'totals': totals,
+            'count': len(rows),
+            'as_of': watermark.isoformat() if watermark else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching complaint analytics',
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/sla/resolution', methods=['GET'])
+def get_sla_resolution():
+    """Resolution-time histograms per category (or ?by=employer), worst breach rate first"""
+    try:
+        dimension = request.args.get('by', 'category')
+        if dimension not in ('category', 'employer'):
+            return jsonify({
+                'success': False,
+                'message': 'by must be category or employer'
+            }), 400
+        
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            groups = sla.resolution_histograms(cursor, dimension)
+            if dimension == 'employer' and groups:
+                ids = [int(group['key']) for group in groups if group['key'] != sla.NO_EMPLOYER]
+                names = {}
+                if ids:
+                    cursor.execute(f"""
+                        SELECT id, company_name FROM employers
+                        WHERE id IN ({', '.join(['%s'] * len(ids))})
+                    """, ids)
+                    names = {str(row['id']): row['company_name'] for row in cursor.fetchall()}
+                for group in groups:
+                    group['employer_name'] = names.get(group['key'], 'No employer' if group['key'] == sla.NO_EMPLOYER else None)
+        finally:
+            conn.close()
+        
+        return jsonify({
+            'success': True,
+            'by': dimension,
+            'buckets': list(sla.BUCKET_LABELS),
+            'groups': groups,
+            'count': len(groups)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching SLA histograms',
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/sla/aging', methods=['GET'])
+def get_sla_aging():
+    """Open complaints per category by age bucket, with overdue counts"""
+    try:
+        conn = get_connection(readonly=True)
+        try:
+            aging = sla.aging(conn.cursor())
+        finally:
+            conn.close()
+        
+        return jsonify({
+            'success': True,
+            'buckets': list(sla.BUCKET_LABELS),
+            'categories': aging,
+            'open': sum(row['open'] for row in aging),
+            'overdue': sum(row['overdue'] for row in aging)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching complaint aging',
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/sla/overdue', methods=['GET'])
+def get_sla_overdue():
+    """Open complaints past their SLA target, most overdue first (?category=, ?limit=)"""
+    try:
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        conn = get_connection(readonly=True)
+        try:
+            complaints = sla.overdue(conn.cursor(), limit, request.args.get('category'))
+        finally:
+            conn.close()
+        
+        return jsonify({
+            'success': True,
+            'complaints': complaints,
+            'count': len(complaints)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching overdue complaints',
+            'error': str(e)
+        }), 500
+
+
 # =====================================================
 # Employer Verification Management
 # =====================================================
 
 @admin_bp.route('/employers', methods=['GET'])
 def get_all_employers():
-    """Get all employers for admin"""
+    """Get all employers for admin, newest first or highest complaint risk first (?sort=risk)"""
     try:
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         cursor = conn.cursor()
         
         verification_filter = request.args.get('verification')
         
         query = """
-            SELECT id, employer_id, company_name, industry, location, 
+            SELECT e.id, e.employer_id, company_name, industry, location, 
                    contact_person, phone, email, gst_number, registration_number,
                    address, status, is_verified, verification_notes, 
-                   rating, workers_count, created_at, verified_at
-            FROM employers
+                   rating, workers_count, created_at, verified_at,
+                   r.complaints_total, r.complaints_open, r.risk_key
+            FROM employers e
+            LEFT JOIN employer_risk r ON r.employer_id = e.id
             WHERE 1=1
         """
         params = []
@@ -399,11 +828,17 @@ def get_all_employers():
             query += " AND is_verified = %s"
             params.append(verification_filter)
         
-        query += " ORDER BY created_at DESC"
+        if request.args.get('sort') == 'risk':
+            query += " ORDER BY r.risk_key DESC, created_at DESC"
+        else:
+            query += " ORDER BY created_at DESC"
         
         cursor.execute(query, params)
         employers = cursor.fetchall()
         conn.close()
+        for employer in employers:
+            employer.update(risk.describe(employer))
+            del employer['risk_key']
         
         return jsonify({
             'success': True,
@@ -423,20 +858,24 @@ def get_all_employers():
 def get_pending_employers():
     """Get employers pending verification"""
     try:
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT id, employer_id, company_name, industry, location, 
+            SELECT e.id, e.employer_id, company_name, industry, location, 
                    contact_person, phone, email, gst_number, registration_number,
-                   address, created_at
-            FROM employers
+                   address, created_at, r.complaints_total, r.complaints_open, r.risk_key
+            FROM employers e
+            LEFT JOIN employer_risk r ON r.employer_id = e.id
             WHERE is_verified = 'pending'
             ORDER BY created_at ASC
         """)
         
         employers = cursor.fetchall()
         conn.close()
+        for employer in employers:
+            employer.update(risk.describe(employer))
+            del employer['risk_key']
         
         return jsonify({
             'success': True,
@@ -456,15 +895,7 @@ def get_pending_employers():
 def get_employer_details(employer_id):
     """Get employer details for verification"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM employers WHERE id = %s
-        """, (employer_id,))
-        
-        employer = cursor.fetchone()
-        conn.close()
+        employer = Employer.get_detail(employer_id)
         
         if not employer:
             return jsonify({
@@ -472,6 +903,8 @@ def get_employer_details(employer_id):
                 'message': 'Employer not found'
             }), 404
         
+        employer['complaint_categories'] = risk.categories(employer_id)
+        employer.update(risk.summary(employer_id))
         return jsonify({
             'success': True,
             'employer': employer
@@ -516,6 +949,7 @@ def verify_employer(employer_id):
             WHERE id = %s
         """, (notes, employer_id))
         
+        bump_version(cursor, EMPLOYERS)
         conn.commit()
         conn.close()
         
@@ -563,6 +997,7 @@ def reject_employer(employer_id):
             WHERE id = %s
         """, (notes, employer_id))
         
+        bump_version(cursor, EMPLOYERS)
         conn.commit()
         conn.close()
         
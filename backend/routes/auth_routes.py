@@ -5,6 +5,9 @@
 
 from flask import Blueprint, request, jsonify, session
 from backend.models import Worker, Session
+from backend.ratelimit import get_login_limiter
+from backend.idempotency import idempotent
+from backend import metrics
 from functools import wraps
 
 auth_bp = Blueprint('auth', __name__)
@@ -43,6 +46,7 @@ def login_required(f):
 
 
 @auth_bp.route('/register', methods=['POST'])
+@idempotent
 def register():
     """Register a new worker"""
     try:
@@ -66,7 +70,7 @@ def register():
             }), 400
         
         # Check if phone already exists
-        existing_worker = Worker.get_by_phone(phone)
+        existing_worker = Worker.get_by_phone(phone, readonly=False)
         if existing_worker:
             return jsonify({
                 'success': False,
@@ -156,23 +160,36 @@ def login():
                 'message': 'Mobile number is required'
             }), 400
         
-        # Authenticate worker
-        worker = Worker.authenticate(migrant_id, phone)
-        
-        if not worker:
-            return jsonify({
+        # Reject repeated failures before touching the database
+        limiter = get_login_limiter()
+        retry_after = limiter.retry_after(ip=request.remote_addr, migrant_id=migrant_id)
+        if retry_after:
+            metrics.increment('login_throttled_total')
+            response = jsonify({
                 'success': False,
-                'message': 'Invalid Migrant ID or Mobile number'
-            }), 401
+                'message': 'Too many failed login attempts. Please try again later.',
+                'retry_after': retry_after
+            })
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
         
-        # Create session
-        session_result = Session.create(
-            worker_id=worker['id'],
+        # Authenticate worker and create the session in one transaction
+        session_result = Session.login(
+            migrant_id, phone,
             ip_address=request.remote_addr,
             user_agent=request.headers.get('User-Agent', '')
         )
+        worker = session_result['worker']
+        
+        if session_result['success'] and not worker:
+            limiter.failed(ip=request.remote_addr, migrant_id=migrant_id)
+            return jsonify({
+                'success': False,
+                'message': 'Invalid Migrant ID or Mobile number'
+            }), 401
         
         if session_result['success']:
+            limiter.succeeded(migrant_id=migrant_id)
             # Set session in flask session
             session['session_id'] = session_result['session_id']
             session['worker_id'] = worker['id']
@@ -0,0 +1,136 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Bootstrap Routes - All data a page needs in one request
+# =====================================================
+#
+# Each portal page used to make two to four API calls on load. These
+# endpoints authenticate once, run the existing handlers for that page
+# concurrently and return their payloads together, keyed by part name.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, make_response, copy_current_request_context
+from backend.db import get_settings
+from backend.routes.auth_routes import login_required
+from backend.routes.job_routes import get_jobs, get_my_applications, get_application_stats
+from backend.routes.admin_routes import get_admin_stats, get_all_applications
+from backend.routes.employer_routes import (
+    employer_login_required,
+    format_dashboard_employer,
+    get_dashboard_job_stats,
+    get_dashboard_application_stats,
+    get_dashboard_recent_applications
+)
+
+bootstrap_bp = Blueprint('bootstrap', __name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Get the shared thread pool used to run page parts concurrently"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = get_settings().get('BOOTSTRAP_MAX_WORKERS', 8)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bootstrap')
+    return _executor
+
+
+def _view_payload(view):
+    """Run a view function and return its JSON body"""
+    response = make_response(view())
+    return response.get_json()
+
+
+def _gather(**parts):
+    """Run each part concurrently within the current request, returning {name: result}"""
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(copy_current_request_context(func))
+        for name, func in parts.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+@bootstrap_bp.route('/jobs', methods=['GET'])
+@login_required
+def jobs_page():
+    """Get open jobs (same filters as /api/jobs/list) and application stats"""
+    try:
+        parts = _gather(
+            jobs=lambda: _view_payload(get_jobs.__wrapped__),
+            application_stats=lambda: _view_payload(get_application_stats.__wrapped__)
+        )
+        return jsonify({'success': True, **parts}), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error loading jobs',
+            'error': str(e)
+        }), 500
+
+
+@bootstrap_bp.route('/applications', methods=['GET'])
+@login_required
+def applications_page():
+    """Get the logged-in worker's applications and their stats"""
+    try:
+        parts = _gather(
+            applications=lambda: _view_payload(get_my_applications.__wrapped__),
+            application_stats=lambda: _view_payload(get_application_stats.__wrapped__)
+        )
+        return jsonify({'success': True, **parts}), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error loading applications',
+            'error': str(e)
+        }), 500
+
+
+@bootstrap_bp.route('/admin-dashboard', methods=['GET'])
+def admin_dashboard():
+    """Get admin stats and all applications"""
+    try:
+        parts = _gather(
+            stats=lambda: _view_payload(get_admin_stats),
+            applications=lambda: _view_payload(get_all_applications)
+        )
+        return jsonify({'success': True, **parts}), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error loading admin dashboard',
+            'error': str(e)
+        }), 500
+
+
+@bootstrap_bp.route('/employer-dashboard', methods=['GET'])
+@employer_login_required
+def employer_dashboard():
+    """Get the logged-in employer's dashboard (same shape as /api/employers/dashboard)"""
+    try:
+        employer = request.employer
+        parts = _gather(
+            job_stats=lambda: get_dashboard_job_stats(employer['id']),
+            application_stats=lambda: get_dashboard_application_stats(employer['id']),
+            recent_applications=lambda: get_dashboard_recent_applications(employer['id'])
+        )
+        return jsonify({
+            'success': True,
+            'employer': format_dashboard_employer(employer),
+            **parts
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error loading dashboard',
+            'error': str(e)
+        }), 500
@@ -6,6 +6,7 @@
 from flask import Blueprint, request, jsonify
 from backend.models import Complaint, Worker
 from backend.routes.auth_routes import login_required
+from backend.idempotency import idempotent
 from datetime import datetime
 
 complaint_bp = Blueprint('complaint', __name__)
@@ -25,6 +26,7 @@ COMPLAINT_TYPES = {
 
 @complaint_bp.route('/add', methods=['POST'])
 @login_required
+@idempotent
 def add_complaint():
     """Submit a new complaint"""
     try:
@@ -101,7 +103,6 @@ def list_complaints():
                 'id': complaint['complaint_id'],
                 'db_id': complaint['id'],
                 'type': complaint['category'],
-                'description': complaint['description'],
                 'status': complaint['status'].title().replace('_', ' '),
                 'employer_name': complaint.get('employer_name'),
                 'admin_remarks': complaint.get('admin_remarks'),
@@ -137,7 +138,6 @@ def get_complaints_by_worker(worker_id):
                 'id': complaint['complaint_id'],
                 'db_id': complaint['id'],
                 'type': complaint['category'],
-                'description': complaint['description'],
                 'status': complaint['status'].title().replace('_', ' '),
                 'employer_name': complaint.get('employer_name'),
                 'admin_remarks': complaint.get('admin_remarks'),
@@ -6,6 +6,8 @@
 from flask import Blueprint, request, jsonify
 from backend.models import Worker, Complaint, Employer
 from backend.routes.auth_routes import login_required
+from backend.http_cache import conditional_get
+from backend.versions import EMPLOYERS
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -80,9 +82,9 @@ def get_current_dashboard():
         stats = Complaint.get_stats_by_worker(worker_id)
         
         # Get recent complaints (last 5)
-        complaints = Complaint.get_by_worker(worker_id)
+        complaints = Complaint.get_by_worker(worker_id, fields='summary', limit=5)
         recent_complaints = []
-        for complaint in complaints[:5]:
+        for complaint in complaints:
             recent_complaints.append({
                 'id': complaint['complaint_id'],
                 'type': complaint['category'],
@@ -127,6 +129,7 @@ def get_current_dashboard():
 
 
 @dashboard_bp.route('/summary', methods=['GET'])
+@conditional_get(EMPLOYERS)
 def get_system_summary():
     """Get overall system summary (public stats)"""
     try:
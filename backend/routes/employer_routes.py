@@ -8,22 +8,17 @@ from backend.models import Employer, Job, JobApplication
 from functools import wraps
 import uuid
 from datetime import datetime, timedelta
-import pymysql
+from backend.db import get_connection
+from backend.http_cache import conditional_get
+from backend import events, metrics, risk
+from backend.versions import EMPLOYERS, JOBS, bump_version
+from backend.tasks import enqueue
+from backend.routes.auth_routes import login_required
+from backend.idempotency import idempotent
+from backend.ratelimit import get_login_limiter
 
 employer_bp = Blueprint('employer', __name__)
 
-def get_connection():
-    """Get database connection"""
-    return pymysql.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='mlgms_db',
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=False
-    )
-
-
 def employer_login_required(f):
     """Decorator to require employer login for protected routes"""
     @wraps(f)
@@ -37,33 +32,24 @@ def employer_login_required(f):
             }), 401
         
         # Get employer from session
-        conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM employers WHERE employer_id = %s
-            """, (employer_session,))
-            employer = cursor.fetchone()
-            
-            if not employer:
-                return jsonify({
-                    'success': False,
-                    'message': 'Invalid session. Please login again.'
-                }), 401
-            
-            # Check if employer is verified
-            if employer['is_verified'] != 'verified':
-                return jsonify({
-                    'success': False,
-                    'message': 'Your account is not yet verified. Please wait for admin approval.',
-                    'verification_status': employer['is_verified']
-                }), 403
-            
-            request.employer = employer
-            request.employer_id = employer['id']
-            
-        finally:
-            conn.close()
+        employer = Employer.get_by_employer_id(employer_session, fields='session')
+        
+        if not employer:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid session. Please login again.'
+            }), 401
+        
+        # Check if employer is verified
+        if employer['is_verified'] != 'verified':
+            return jsonify({
+                'success': False,
+                'message': 'Your account is not yet verified. Please wait for admin approval.',
+                'verification_status': employer['is_verified']
+            }), 403
+        
+        request.employer = employer
+        request.employer_id = employer['id']
         
         return f(*args, **kwargs)
     return decorated_function
@@ -74,6 +60,7 @@ def employer_login_required(f):
 # =====================================================
 
 @employer_bp.route('/register', methods=['POST'])
+@idempotent
 def register():
     """Register a new employer"""
     try:
@@ -96,7 +83,8 @@ def register():
                 'message': 'Please enter a valid phone number'
             }), 400
         
-        # Check if email already exists
+        # Check if email already exists (on the primary: a replica may not have a
+        # registration submitted a moment ago yet)
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM employers WHERE email = %s", (data.get('email'),))
@@ -181,15 +169,31 @@ def login():
                 'message': 'Password is required'
             }), 400
         
+        # Reject repeated failures before touching the database
+        limiter = get_login_limiter('employer_id')
+        retry_after = limiter.retry_after(ip=request.remote_addr, employer_id=employer_id)
+        if retry_after:
+            metrics.increment('login_throttled_total')
+            response = jsonify({
+                'success': False,
+                'message': 'Too many failed login attempts. Please try again later.',
+                'retry_after': retry_after
+            })
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
+        
         # Authenticate employer
         employer = Employer.authenticate(employer_id, password)
         
         if not employer:
+            limiter.failed(ip=request.remote_addr, employer_id=employer_id)
             return jsonify({
                 'success': False,
                 'message': 'Invalid Employer ID or Password'
             }), 401
         
+        limiter.succeeded(employer_id=employer_id)
+        
         # Check verification status
         if employer['is_verified'] == 'pending':
             return jsonify({
@@ -297,16 +301,11 @@ def check_session():
 # Employer Dashboard
 # =====================================================
 
-@employer_bp.route('/dashboard', methods=['GET'])
-@employer_login_required
-def get_dashboard():
-    """Get employer dashboard data"""
+def get_dashboard_job_stats(employer_id):
+    """Get job counts by status for an employer's dashboard"""
+    conn = get_connection(readonly=True)
     try:
-        employer = request.employer
-        conn = get_connection()
         cursor = conn.cursor()
-        
-        # Get job stats
         cursor.execute("""
             SELECT 
                 COUNT(*) as total_jobs,
@@ -315,10 +314,17 @@ def get_dashboard():
                 SUM(CASE WHEN status = 'filled' THEN 1 ELSE 0 END) as filled_jobs
             FROM jobs
             WHERE employer_id = %s
-        """, (employer['id'],))
-        job_stats = cursor.fetchone()
-        
-        # Get application stats
+        """, (employer_id,))
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def get_dashboard_application_stats(employer_id):
+    """Get application counts by status across an employer's jobs"""
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
         cursor.execute("""
             SELECT 
                 COUNT(*) as total_applications,
@@ -328,10 +334,17 @@ def get_dashboard():
             FROM job_applications a
             JOIN jobs j ON a.job_id = j.id
             WHERE j.employer_id = %s
-        """, (employer['id'],))
-        app_stats = cursor.fetchone()
-        
-        # Get recent applications
+        """, (employer_id,))
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def get_dashboard_recent_applications(employer_id):
+    """Get the 10 most recent applications across an employer's jobs"""
+    conn = get_connection(readonly=True)
+    try:
+        cursor = conn.cursor()
         cursor.execute("""
             SELECT a.*, j.title as job_title, w.name as worker_name, 
                    w.migrant_id, w.phone, w.skill
@@ -341,28 +354,41 @@ def get_dashboard():
             WHERE j.employer_id = %s
             ORDER BY a.applied_at DESC
             LIMIT 10
-        """, (employer['id'],))
-        recent_applications = cursor.fetchall()
-        
+        """, (employer_id,))
+        return cursor.fetchall()
+    finally:
         conn.close()
+
+
+def format_dashboard_employer(employer):
+    """Format the logged-in employer for the dashboard response"""
+    return {
+        'id': employer['id'],
+        'employer_id': employer['employer_id'],
+        'company_name': employer['company_name'],
+        'industry': employer['industry'],
+        'location': employer['location'],
+        'contact_person': employer['contact_person'],
+        'email': employer['email'],
+        'phone': employer['phone'],
+        'rating': float(employer['rating']) if employer['rating'] else 0.0,
+        'workers_count': employer['workers_count'] or 0
+    }
+
+
+@employer_bp.route('/dashboard', methods=['GET'])
+@employer_login_required
+def get_dashboard():
+    """Get employer dashboard data"""
+    try:
+        employer = request.employer
         
         return jsonify({
             'success': True,
-            'employer': {
-                'id': employer['id'],
-                'employer_id': employer['employer_id'],
-                'company_name': employer['company_name'],
-                'industry': employer['industry'],
-                'location': employer['location'],
-                'contact_person': employer['contact_person'],
-                'email': employer['email'],
-                'phone': employer['phone'],
-                'rating': float(employer['rating']) if employer['rating'] else 0.0,
-                'workers_count': employer['workers_count'] or 0
-            },
-            'job_stats': job_stats,
-            'application_stats': app_stats,
-            'recent_applications': recent_applications
+            'employer': format_dashboard_employer(employer),
+            'job_stats': get_dashboard_job_stats(employer['id']),
+            'application_stats': get_dashboard_application_stats(employer['id']),
+            'recent_applications': get_dashboard_recent_applications(employer['id'])
         }), 200
         
     except Exception as e:
@@ -383,7 +409,7 @@ def get_employer_jobs():
     """Get all jobs by employer"""
     try:
         employer_id = request.employer_id
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -415,6 +441,7 @@ def get_employer_jobs():
 
 @employer_bp.route('/jobs', methods=['POST'])
 @employer_login_required
+@idempotent
 def create_job():
     """Create a new job listing"""
     try:
@@ -485,6 +512,7 @@ def close_job(job_id):
             }), 404
         
         cursor.execute("UPDATE jobs SET status = 'closed' WHERE id = %s", (job_id,))
+        bump_version(cursor, JOBS)
         conn.commit()
         conn.close()
         
@@ -513,7 +541,7 @@ def get_employer_applications():
         employer_id = request.employer_id
         status_filter = request.args.get('status')
         
-        conn = get_connection()
+        conn = get_connection(readonly=True)
         cursor = conn.cursor()
         
         query = """
@@ -581,15 +609,21 @@ def accept_application(application_id):
             WHERE id = %s
         """, (application_id,))
         
-        # Update worker's current employer
-        cursor.execute("""
-            UPDATE workers 
-            SET current_employer_id = %s
-            WHERE id = %s
-        """, (employer_id, app['worker_id']))
+        cursor.execute("SELECT responded_at FROM job_applications WHERE id = %s", (application_id,))
+        responded_at = cursor.fetchone()['responded_at']
+        
+        # Update worker's current employer after commit (background task).
+        # The key includes responded_at so accepting again after a
+        # rejection queues a new task.
+        enqueue('set_current_employer', {
+            'worker_id': app['worker_id'],
+            'employer_id': employer_id
+        }, idempotency_key=f"accept_application:{application_id}:{responded_at:%Y%m%d%H%M%S}",
+           cursor=cursor)
         
         conn.commit()
         conn.close()
+        events.application_changed(app, 'accepted')
         
         return jsonify({
             'success': True,
@@ -638,6 +672,7 @@ def reject_application(application_id):
         
         conn.commit()
         conn.close()
+        events.application_changed(app, 'rejected')
         
         return jsonify({
             'success': True,
@@ -657,13 +692,20 @@ def reject_application(application_id):
 # =====================================================
 
 @employer_bp.route('/list', methods=['GET'])
+@conditional_get(EMPLOYERS, extra=risk.etag_part)
 def get_employers():
-    """Get all verified employers (public)"""
+    """Get all verified employers (public), newest first or ?sort=risk"""
     try:
         # Get status filter from query params
         status = request.args.get('status')
+        sort = request.args.get('sort')
+        if sort not in (None, 'newest', 'risk'):
+            return jsonify({
+                'success': False,
+                'message': 'sort must be newest or risk'
+            }), 400
         
-        employers = Employer.get_all(status=status, verification_status='verified')
+        employers = Employer.get_all(status=status, verification_status='verified', sort=sort)
         
         # Format employers for response
         employer_list = []
@@ -681,7 +723,8 @@ def get_employers():
                 'status': employer['status'].title() if employer['status'] else 'Active',
                 'rating': float(employer['rating']) if employer['rating'] else 0.0,
                 'workers': employer['workers'] or 0,
-                'created_at': employer['created_at'].isoformat() if employer['created_at'] else None
+                'created_at': employer['created_at'].isoformat() if employer['created_at'] else None,
+                **risk.describe(employer)
             })
         
         return jsonify({
@@ -699,6 +742,7 @@ def get_employers():
 
 
 @employer_bp.route('/<int:employer_id>', methods=['GET'])
+@conditional_get(EMPLOYERS, extra=risk.etag_part)
 def get_employer(employer_id):
     """Get employer by ID (public)"""
     try:
@@ -723,7 +767,8 @@ def get_employer(employer_id):
             'status': employer['status'].title() if employer['status'] else 'Active',
             'rating': float(employer['rating']) if employer['rating'] else 0.0,
             'workers': employer['workers'] or 0,
-            'created_at': employer['created_at'].isoformat() if employer['created_at'] else None
+            'created_at': employer['created_at'].isoformat() if employer['created_at'] else None,
+            **risk.describe(employer)
         }
         
         return jsonify({
@@ -739,7 +784,53 @@ def get_employer(employer_id):
         }), 500
 
 
+@employer_bp.route('/<int:employer_id>/rate', methods=['POST'])
+@login_required
+@idempotent
+def rate_employer(employer_id):
+    """Rate an employer (workers whose application the employer accepted)"""
+    try:
+        data = request.get_json() or {}
+        
+        try:
+            rating = int(data.get('rating'))
+        except (TypeError, ValueError):
+            rating = 0
+        if rating < 1 or rating > 5:
+            return jsonify({
+                'success': False,
+                'message': 'Rating must be a whole number from 1 to 5'
+            }), 400
+        
+        if not Employer.can_be_rated_by(employer_id, request.worker_id):
+            return jsonify({
+                'success': False,
+                'message': 'You can only rate employers you have worked for'
+            }), 403
+        
+        result = Employer.rate(employer_id, request.worker_id, rating, data.get('review'))
+        
+        if not result['success']:
+            return jsonify({
+                'success': False,
+                'message': result.get('error', 'Failed to save rating')
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'message': 'Rating updated' if result['updated'] else 'Rating submitted'
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error saving rating',
+            'error': str(e)
+        }), 500
+
+
 @employer_bp.route('/stats', methods=['GET'])
+@conditional_get(EMPLOYERS)
 def get_employer_stats():
     """Get employer statistics"""
     try:
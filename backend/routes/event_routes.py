@@ -0,0 +1,99 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Event Routes - Server-Sent Events Stream of Status Changes
+# =====================================================
+
+import time
+from flask import Blueprint, Response, request, session, jsonify, stream_with_context
+from backend import events
+from backend.db import get_settings
+from backend.models import Admin, Session, Employer
+
+event_bp = Blueprint('events', __name__)
+
+
+def stream_channels():
+    """Channels the caller may subscribe to
+
+    EventSource cannot send headers, so besides the session cookie the
+    worker token, employer session and admin id are accepted as ?token=,
+    ?employer_session= and ?admin_id=.
+    """
+    channels = []
+
+    token = session.get('session_id') or request.args.get('token') or request.headers.get('Authorization')
+    if token:
+        if token.startswith('Bearer '):
+            token = token[7:]
+        session_data = Session.get(token)
+        if session_data:
+            channels.append(events.worker_channel(session_data['worker_id']))
+
+    employer_session = (session.get('employer_session') or request.args.get('employer_session')
+                        or request.headers.get('X-Employer-Session'))
+    if employer_session:
+        employer = Employer.get_by_employer_id(employer_session, fields='session')
+        if employer and employer['is_verified'] == 'verified':
+            channels.append(events.employer_channel(employer['id']))
+
+    # Looked up as admin_required does; the admin channel carries every complaint
+    admin_id = request.args.get('admin_id') or request.headers.get('X-Admin-ID')
+    if admin_id and Admin.get_by_id(admin_id):
+        channels.append(events.ADMIN)
+
+    return channels
+
+
+@event_bp.route('/stream', methods=['GET'])
+def stream():
+    """text/event-stream of 'complaint' and 'application' status events for the caller"""
+    channels = stream_channels()
+    if not channels:
+        return jsonify({
+            'success': False,
+            'message': 'Authentication required. Please login.'
+        }), 401
+
+    settings = get_settings()
+    broker = events.get_broker()
+    if broker.subscriber_count() >= settings.get('EVENTS_MAX_SUBSCRIBERS', 64):
+        response = jsonify({
+            'success': False,
+            'message': 'Too many live connections. Please reload later.'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    heartbeat = settings.get('EVENTS_HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + settings.get('EVENTS_MAX_STREAM_SECONDS', 300)
+    retry_ms = settings.get('EVENTS_RETRY_MS', 3000)
+    sub = broker.subscribe(channels, last_event_id)
+
+    def generate():
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            # Ends every EVENTS_MAX_STREAM_SECONDS; the browser reconnects with
+            # Last-Event-ID, so a handler thread is never held indefinitely
+            while time.monotonic() < deadline:
+                if sub.resync:
+                    # The page reloads its list; the id moves the browser's
+                    # Last-Event-ID past the events it missed
+                    yield f"id: {time.time_ns()}\nevent: resync\ndata: {{}}\n\n"
+                    return
+                event = sub.get(timeout=min(heartbeat, max(deadline - time.monotonic(), 0.1)))
+                # Comment lines keep proxies from closing an idle connection
+                yield events.format_event(event) if event else ": keepalive\n\n"
+        finally:
+            sub.close()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -3,51 +3,114 @@
 # Job Routes
 # =====================================================
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from backend.models import Job, JobApplication, Worker
 from backend.routes.auth_routes import login_required
+from backend.http_cache import conditional_get
+from backend.versions import JOBS, EMPLOYERS
+from backend.idempotency import idempotent
+from backend.geo import geocode
 
 job_bp = Blueprint('job', __name__)
 
 
+def format_job(job):
+    """Format a job list row for the response"""
+    return {
+        'id': job['id'],
+        'job_id': job['job_id'],
+        'title': job['title'],
+        'skill_required': job['skill_required'],
+        'location': job['location'],
+        'wage_per_day': float(job['wage_per_day']) if job['wage_per_day'] else 0,
+        'duration_days': job['duration_days'],
+        'workers_needed': job['workers_needed'],
+        'status': job['status'],
+        'employer_name': job['employer_name'],
+        'industry': job['industry'],
+        'created_at': job['created_at'].isoformat() if job['created_at'] else None
+    }
+
+
 @job_bp.route('/list', methods=['GET'])
+@conditional_get(JOBS, EMPLOYERS)
 def get_jobs():
     """Get all open jobs"""
     try:
         status = request.args.get('status', 'open')
         skill = request.args.get('skill')
+        region_id = request.args.get('region_id', type=int)
+        
+        jobs = Job.get_all(status=status, skill=skill, region_id=region_id)
+        job_list = [format_job(job) for job in jobs]
+        
+        return jsonify({
+            'success': True,
+            'jobs': job_list,
+            'count': len(job_list)
+        }), 200
         
-        jobs = Job.get_all(status=status, skill=skill)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching jobs',
+            'error': str(e)
+        }), 500
+
+
+@job_bp.route('/nearby', methods=['GET'])
+@conditional_get(JOBS, EMPLOYERS)
+def get_nearby_jobs():
+    """Get open jobs within ?radius= km of ?lat=&lon= (or of a ?place= name), nearest first"""
+    try:
+        config = current_app.config
+        try:
+            if request.args.get('lat') is not None and request.args.get('lon') is not None:
+                latitude = float(request.args['lat'])
+                longitude = float(request.args['lon'])
+                if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                    raise ValueError('lat/lon out of range')
+            elif request.args.get('place'):
+                place = geocode(request.args['place'])
+                if not place:
+                    return jsonify({
+                        'success': False,
+                        'message': 'Unknown place - try a nearby city name'
+                    }), 404
+                latitude, longitude = place['latitude'], place['longitude']
+            else:
+                raise ValueError('lat and lon, or place, are required')
+            radius = float(request.args.get('radius', config.get('NEARBY_DEFAULT_RADIUS_KM', 25)))
+            if radius <= 0:
+                raise ValueError('radius must be positive')
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid location parameters',
+                'error': str(e)
+            }), 400
+        radius = min(radius, config.get('NEARBY_MAX_RADIUS_KM', 200))
         
-        # Format jobs for response
+        jobs = Job.get_nearby(latitude, longitude, radius, skill=request.args.get('skill'),
+                              limit=config.get('NEARBY_MAX_RESULTS', 50))
         job_list = []
         for job in jobs:
-            job_list.append({
-                'id': job['id'],
-                'job_id': job['job_id'],
-                'title': job['title'],
-                'description': job['description'],
-                'skill_required': job['skill_required'],
-                'location': job['location'],
-                'wage_per_day': float(job['wage_per_day']) if job['wage_per_day'] else 0,
-                'duration_days': job['duration_days'],
-                'workers_needed': job['workers_needed'],
-                'status': job['status'],
-                'employer_name': job['employer_name'],
-                'industry': job['industry'],
-                'created_at': job['created_at'].isoformat() if job['created_at'] else None
-            })
+            formatted = format_job(job)
+            formatted['distance_km'] = job['distance_km']
+            job_list.append(formatted)
         
         return jsonify({
             'success': True,
             'jobs': job_list,
-            'count': len(job_list)
+            'count': len(job_list),
+            'center': {'lat': latitude, 'lon': longitude},
+            'radius_km': radius
         }), 200
         
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': 'Error fetching jobs',
+            'message': 'Error searching nearby jobs',
             'error': str(e)
         }), 500
 
@@ -96,6 +159,7 @@ def get_job(job_id):
 
 @job_bp.route('/apply/<int:job_id>', methods=['POST'])
 @login_required
+@idempotent
 def apply_for_job(job_id):
     """Apply for a job"""
     try:
@@ -0,0 +1,39 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Region Routes
+# =====================================================
+
+from flask import Blueprint, request, jsonify
+from backend.models import Region
+
+region_bp = Blueprint('region', __name__)
+
+
+@region_bp.route('', methods=['GET'])
+def get_regions():
+    """Get the regions (for filters); ?state= limits them to one state"""
+    try:
+        regions = Region.get_all(state=request.args.get('state'))
+        region_list = [{
+            'id': region['id'],
+            'state': region['state'],
+            'district': region['district'] or None,
+            'latitude': float(region['latitude']) if region['latitude'] is not None else None,
+            'longitude': float(region['longitude']) if region['longitude'] is not None else None
+        } for region in regions]
+        
+        response = jsonify({
+            'success': True,
+            'regions': region_list,
+            'count': len(region_list)
+        })
+        # Regions only change through migrations
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching regions',
+            'error': str(e)
+        }), 500
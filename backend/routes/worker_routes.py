@@ -124,7 +124,7 @@ def update_profile():
                     }), 400
                 
                 # Check if phone is already used by another worker
-                existing = Worker.get_by_phone(phone)
+                existing = Worker.get_by_phone(phone, readonly=False)
                 if existing and existing['id'] != worker_id:
                     return jsonify({
                         'success': False,
@@ -0,0 +1,226 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Complaint SLA Tracking - Resolution Histograms and Open-Complaint Aging
+# =====================================================
+#
+# Two small tables are kept up to date in the same transaction as every
+# complaint status change (Complaint.create/update_status and the admin
+# resolve route call status_changed()):
+#   - sla_resolution_histogram: resolution times per category and per
+#     employer, counted into the AGE_BUCKETS, with how many breached the
+#     category's SLA target. Reopening a resolved complaint takes its
+#     earlier resolution back out.
+#   - complaint_sla: one row per open (pending/in_progress) complaint with
+#     its due time. Aging counts and the overdue list read only this table
+#     through its due_at index, never the whole complaints table.
+# rebuild() recomputes both from the complaint tables (after changing the
+# targets, or to repair drift).
+
+from datetime import timedelta
+from backend.db import get_settings
+
+OPEN_STATUSES = ('pending', 'in_progress')
+
+# Upper bounds in hours; anything older falls in the last bucket
+AGE_BUCKETS = (24, 72, 168, 336, 720)
+BUCKET_LABELS = ('<1d', '1-3d', '3-7d', '7-14d', '14-30d', '>30d')
+
+NO_EMPLOYER = '0'
+
+
+def target_hours(category):
+    """SLA target for a complaint category, in hours"""
+    settings = get_settings()
+    return settings.get('SLA_TARGET_HOURS_BY_CATEGORY', {}).get(category, settings.get('SLA_TARGET_HOURS', 168))
+
+
+def bucket_for(hours):
+    for index, upper in enumerate(AGE_BUCKETS):
+        if hours < upper:
+            return index
+    return len(AGE_BUCKETS)
+
+
+def lock_complaint(cursor, complaint_id):
+    """Fetch a complaint (by id or complaint_id) with FOR UPDATE, before changing its status"""
+    cursor.execute("""
+        SELECT id, complaint_id, worker_id, employer_id, category, status, created_at, resolved_at
+        FROM complaints
+        WHERE id = %s OR complaint_id = %s
+        FOR UPDATE
+    """, (complaint_id, complaint_id))
+    return cursor.fetchone()
+
+
+def _record_resolution(cursor, complaint, resolved_at, sign):
+    hours = max((resolved_at - complaint['created_at']).total_seconds() / 3600, 0)
+    breached = 1 if hours > target_hours(complaint['category']) else 0
+    for dimension, key in (('category', complaint['category']),
+                           ('employer', str(complaint['employer_id'] or NO_EMPLOYER))):
+        cursor.execute("""
+            INSERT INTO sla_resolution_histogram (dimension, dim_key, bucket, resolved, breached, hours_total)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE resolved = resolved + VALUES(resolved),
+                                    breached = breached + VALUES(breached),
+                                    hours_total = hours_total + VALUES(hours_total)
+        """, (dimension, key, bucket_for(hours), sign, sign * breached, sign * hours))
+
+
+def status_changed(cursor, complaint, status, resolved_at=None):
+    """Update the SLA tables for a complaint moving from complaint['status'] to status
+
+    complaint is the row before the change (see lock_complaint); call this
+    in the same transaction as the UPDATE.
+    """
+    previous = complaint.get('status')
+    if previous == 'resolved' and status != 'resolved' and complaint.get('resolved_at'):
+        _record_resolution(cursor, complaint, complaint['resolved_at'], -1)
+    if status == 'resolved' and previous != 'resolved' and resolved_at:
+        _record_resolution(cursor, complaint, resolved_at, 1)
+
+    if status in OPEN_STATUSES:
+        if previous not in OPEN_STATUSES:
+            due_at = complaint['created_at'] + timedelta(hours=target_hours(complaint['category']))
+            cursor.execute("""
+                INSERT INTO complaint_sla (id, category, employer_id, created_at, due_at)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE due_at = VALUES(due_at)
+            """, (complaint['id'], complaint['category'], complaint['employer_id'],
+                  complaint['created_at'], due_at))
+    else:
+        cursor.execute("DELETE FROM complaint_sla WHERE id = %s", (complaint['id'],))
+
+
+def _target_case(column):
+    """CASE expression giving each category's target hours, with its parameters"""
+    by_category = get_settings().get('SLA_TARGET_HOURS_BY_CATEGORY', {})
+    default = get_settings().get('SLA_TARGET_HOURS', 168)
+    if not by_category:
+        return '%s', [default]
+    whens = ' '.join(['WHEN %s THEN %s'] * len(by_category))
+    params = [value for item in by_category.items() for value in item]
+    return f"CASE {column} {whens} ELSE %s END", params + [default]
+
+
+def rebuild(cursor):
+    """Recompute the histograms and the open-complaint table from scratch"""
+    target_sql, target_params = _target_case('category')
+    bucket_sql = 'CASE ' + ' '.join(f'WHEN hours < {upper} THEN {index}' for index, upper in enumerate(AGE_BUCKETS)) \
+        + f' ELSE {len(AGE_BUCKETS)} END'
+
+    cursor.execute("DELETE FROM sla_resolution_histogram")
+    cursor.execute(f"""
+        SELECT category, COALESCE(employer_id, 0) as employer_id, {bucket_sql} as bucket,
+               COUNT(*) as resolved, SUM(hours > {target_sql}) as breached, SUM(hours) as hours_total
+        FROM (
+            SELECT category, employer_id, GREATEST(TIMESTAMPDIFF(SECOND, created_at, resolved_at), 0) / 3600 as hours
+            FROM complaints WHERE status = 'resolved' AND resolved_at IS NOT NULL
+            UNION ALL
+            SELECT category, employer_id, GREATEST(TIMESTAMPDIFF(SECOND, created_at, resolved_at), 0) / 3600 as hours
+            FROM complaints_archive WHERE status = 'resolved' AND resolved_at IS NOT NULL
+        ) r
+        GROUP BY category, COALESCE(employer_id, 0), bucket
+    """, target_params)
+
+    cells = {}
+    for row in cursor.fetchall():
+        for key in (('category', row['category']), ('employer', str(row['employer_id']))):
+            cell = cells.setdefault(key + (row['bucket'],), [0, 0, 0.0])
+            cell[0] += int(row['resolved'])
+            cell[1] += int(row['breached'] or 0)
+            cell[2] += float(row['hours_total'] or 0)
+    if cells:
+        cursor.executemany("""
+            INSERT INTO sla_resolution_histogram (dimension, dim_key, bucket, resolved, breached, hours_total)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [key + tuple(values) for key, values in cells.items()])
+
+    cursor.execute("DELETE FROM complaint_sla")
+    cursor.execute(f"""
+        INSERT INTO complaint_sla (id, category, employer_id, created_at, due_at)
+        SELECT id, category, employer_id, created_at, created_at + INTERVAL {target_sql} HOUR
+        FROM complaints
+        WHERE status IN ('pending', 'in_progress')
+    """, target_params)
+    return len(cells), cursor.rowcount
+
+
+def resolution_histograms(cursor, dimension):
+    """Per category (or employer) resolution histogram, worst breach rate first"""
+    cursor.execute("""
+        SELECT dim_key, bucket, resolved, breached, hours_total
+        FROM sla_resolution_histogram
+        WHERE dimension = %s
+    """, (dimension,))
+    groups = {}
+    for row in cursor.fetchall():
+        group = groups.setdefault(row['dim_key'], {
+            'key': row['dim_key'], 'buckets': dict.fromkeys(BUCKET_LABELS, 0),
+            'resolved': 0, 'breached': 0, 'hours_total': 0.0
+        })
+        group['buckets'][BUCKET_LABELS[row['bucket']]] += row['resolved']
+        group['resolved'] += row['resolved']
+        group['breached'] += row['breached']
+        group['hours_total'] += float(row['hours_total'])
+
+    results = []
+    for group in groups.values():
+        if group['resolved'] <= 0:
+            continue
+        hours_total = group.pop('hours_total')
+        group['avg_hours'] = round(hours_total / group['resolved'], 1)
+        group['breach_rate'] = round(group['breached'] / group['resolved'], 3)
+        if dimension == 'category':
+            group['target_hours'] = target_hours(group['key'])
+        results.append(group)
+    results.sort(key=lambda group: (group['breach_rate'], group['breached']), reverse=True)
+    return results
+
+
+def aging(cursor):
+    """Open complaints per category by age bucket, with how many are overdue"""
+    ages = ', '.join(
+        f"SUM(created_at >= NOW() - INTERVAL {upper} HOUR"
+        + (f" AND created_at < NOW() - INTERVAL {AGE_BUCKETS[index - 1]} HOUR" if index else '')
+        + f") as `{BUCKET_LABELS[index]}`"
+        for index, upper in enumerate(AGE_BUCKETS)
+    )
+    cursor.execute(f"""
+        SELECT category, COUNT(*) as open_count, {ages},
+               SUM(created_at < NOW() - INTERVAL {AGE_BUCKETS[-1]} HOUR) as `{BUCKET_LABELS[-1]}`,
+               SUM(due_at < NOW()) as overdue
+        FROM complaint_sla
+        GROUP BY category
+        ORDER BY overdue DESC, open_count DESC
+    """)
+    results = []
+    for row in cursor.fetchall():
+        results.append({
+            'category': row['category'],
+            'open': int(row['open_count']),
+            'overdue': int(row['overdue'] or 0),
+            'buckets': {label: int(row[label] or 0) for label in BUCKET_LABELS}
+        })
+    return results
+
+
+def overdue(cursor, limit=100, category=None):
+    """Open complaints past their due time, most overdue first"""
+    query = """
+        SELECT c.id, c.complaint_id, c.category, c.status, c.created_at, s.due_at,
+               TIMESTAMPDIFF(HOUR, s.due_at, NOW()) as hours_overdue,
+               w.name as worker_name, w.migrant_id, e.company_name as employer_name
+        FROM complaint_sla s
+        JOIN complaints c ON c.id = s.id
+        JOIN workers w ON c.worker_id = w.id
+        LEFT JOIN employers e ON c.employer_id = e.id
+        WHERE s.due_at < NOW()
+    """
+    params = []
+    if category:
+        query += " AND s.category = %s"
+        params.append(category)
+    query += " ORDER BY s.due_at LIMIT %s"
+    params.append(int(limit))
+    cursor.execute(query, params)
+    return cursor.fetchall()
@@ -0,0 +1,64 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Session Sweeper - Background Cleanup of Expired Sessions
+# =====================================================
+
+import threading
+import time
+from backend import metrics
+from backend.models import Session
+
+
+def sweep_sessions(batch_size, retention_seconds, max_batches=None, pause=0.05):
+    """Delete expired sessions batch by batch until none are left (or max_batches)
+
+    Returns the total number of sessions deleted.
+    """
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        deleted = Session.sweep_expired(batch_size, retention_seconds)
+        total += deleted
+        batches += 1
+        if deleted < batch_size:
+            break
+        # Let other transactions in between batches
+        time.sleep(pause)
+    return total
+
+
+class SessionSweeper(threading.Thread):
+    """Daemon thread that periodically sweeps expired sessions"""
+
+    def __init__(self, app):
+        super().__init__(name='session-sweeper', daemon=True)
+        self.app = app
+        self.stopped = threading.Event()
+
+    def run(self):
+        config = self.app.config
+        interval = config.get('SESSION_SWEEP_INTERVAL', 300)
+        while not self.stopped.wait(interval):
+            with self.app.app_context():
+                try:
+                    sweep_sessions(
+                        config.get('SESSION_SWEEP_BATCH_SIZE', 500),
+                        config.get('SESSION_RETENTION_SECONDS', 0),
+                        max_batches=config.get('SESSION_SWEEP_MAX_BATCHES', 100)
+                    )
+                    metrics.increment('session_sweeps_total')
+                except Exception:
+                    # Database unavailable - try again next interval
+                    metrics.increment('session_sweep_errors_total')
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start_session_sweeper(app):
+    """Start the sweeper for an app unless SESSION_SWEEP_INTERVAL is 0"""
+    if not app.config.get('SESSION_SWEEP_INTERVAL'):
+        return None
+    sweeper = SessionSweeper(app)
+    sweeper.start()
+    return sweeper
@@ -0,0 +1,244 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Background Task Queue - Durable, Retried, Idempotent
+# =====================================================
+#
+# Tasks are rows in the task_queue table. A route enqueues follow-up work
+# with the same cursor as its own changes, so the task exists if and only
+# if the transaction commits. Worker processes (task_worker.py) claim due
+# tasks with SELECT ... FOR UPDATE SKIP LOCKED (plain FOR UPDATE on servers
+# without it), run them, and retry failures with exponential backoff.
+
+import json
+import os
+import random
+import socket
+import traceback
+from backend import dedup, models, triage
+from backend.db import get_connection, get_settings, supports_skip_locked
+
+# Registered task handlers: {task_name: function(payload)}
+TASKS = {}
+
+
+def task(name):
+    """Register a function as the handler for a task name"""
+    def decorator(f):
+        TASKS[name] = f
+        return f
+    return decorator
+
+
+def enqueue(task_name, payload, idempotency_key=None, cursor=None, delay=0, max_attempts=None):
+    """Add a task to the queue
+
+    Pass the caller's cursor to enqueue inside its transaction; the task is
+    then committed (or rolled back) together with the caller's changes.
+    A task whose idempotency_key is already queued is silently skipped.
+    """
+    if max_attempts is None:
+        max_attempts = get_settings().get('TASK_MAX_ATTEMPTS', 5)
+
+    query = """
+        INSERT IGNORE INTO task_queue
+            (task_name, payload, idempotency_key, max_attempts, run_after)
+        VALUES (%s, %s, %s, %s, NOW() + INTERVAL %s SECOND)
+    """
+    params = (task_name, json.dumps(payload, default=str), idempotency_key, max_attempts, int(delay))
+
+    if cursor is not None:
+        cursor.execute(query, params)
+        return
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def worker_name():
+    """Identify this worker process in locked_by"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker, limit=10):
+    """Lock up to `limit` due tasks for this worker and return them"""
+    settings = get_settings()
+
+    conn = get_connection()
+    try:
+        use_skip_locked = settings.get('TASK_CLAIM_SKIP_LOCKED')
+        if use_skip_locked is None:
+            use_skip_locked = supports_skip_locked(conn)
+        skip_locked = ' SKIP LOCKED' if use_skip_locked else ''
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT * FROM task_queue
+            WHERE status = 'pending' AND run_after <= NOW()
+            ORDER BY run_after, id
+            LIMIT %s
+            FOR UPDATE{skip_locked}
+        """, (limit,))
+        rows = cursor.fetchall()
+
+        if rows:
+            ids = [row['id'] for row in rows]
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"""
+                UPDATE task_queue
+                SET status = 'running', locked_by = %s, locked_at = NOW(),
+                    attempts = attempts + 1
+                WHERE id IN ({placeholders})
+            """, (worker, *ids))
+            for row in rows:
+                row['attempts'] += 1
+
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def backoff_seconds(attempts):
+    """Exponential backoff with jitter: base * 2^(attempts - 1), capped"""
+    settings = get_settings()
+    base = settings.get('TASK_RETRY_BASE_SECONDS', 10)
+    cap = settings.get('TASK_RETRY_MAX_SECONDS', 3600)
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return int(delay * random.uniform(0.8, 1.2))
+
+
+def _finish(task_id, status, error=None, retry_in=None):
+    """Record the outcome of a task run"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        if retry_in is not None:
+            cursor.execute("""
+                UPDATE task_queue
+                SET status = 'pending', locked_by = NULL, locked_at = NULL,
+                    last_error = %s, run_after = NOW() + INTERVAL %s SECOND
+                WHERE id = %s
+            """, (error, retry_in, task_id))
+        else:
+            cursor.execute("""
+                UPDATE task_queue
+                SET status = %s, locked_by = NULL, locked_at = NULL, last_error = %s
+                WHERE id = %s
+            """, (status, error, task_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_task(row):
+    """Run one claimed task and record success, retry or failure
+
+    Returns the new status ('done', 'pending' or 'failed').
+    """
+    handler = TASKS.get(row['task_name'])
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for task '{row['task_name']}'")
+        handler(json.loads(row['payload']))
+    except Exception:
+        error = traceback.format_exc(limit=5)
+        if row['attempts'] >= row['max_attempts']:
+            _finish(row['id'], 'failed', error)
+            return 'failed'
+        _finish(row['id'], 'pending', error, retry_in=backoff_seconds(row['attempts']))
+        return 'pending'
+
+    _finish(row['id'], 'done')
+    return 'done'
+
+
+def release_stale(timeout=None):
+    """Return tasks stuck in 'running' (e.g. their worker died) to the queue"""
+    if timeout is None:
+        timeout = get_settings().get('TASK_LOCK_TIMEOUT', 600)
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE task_queue
+            SET status = 'pending', locked_by = NULL, locked_at = NULL
+            WHERE status = 'running' AND locked_at < NOW() - INTERVAL %s SECOND
+        """, (timeout,))
+        released = cursor.rowcount
+        conn.commit()
+        return released
+    finally:
+        conn.close()
+
+
+def purge_done(older_than_days=7):
+    """Delete finished tasks older than the given number of days"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM task_queue
+            WHERE status = 'done' AND updated_at < NOW() - INTERVAL %s DAY
+        """, (older_than_days,))
+        deleted = cursor.rowcount
+        conn.commit()
+        return deleted
+    finally:
+        conn.close()
+
+
+# =====================================================
+# Task Handlers
+# =====================================================
+
+@task('set_current_employer')
+def set_current_employer(payload):
+    """Point a worker at the employer that accepted their application"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT current_employer_id FROM workers WHERE id = %s FOR UPDATE",
+                       (payload['worker_id'],))
+        worker = cursor.fetchone()
+        if not worker:
+            conn.commit()
+            return
+
+        cursor.execute("""
+            UPDATE workers
+            SET current_employer_id = %s
+            WHERE id = %s
+        """, (payload['employer_id'], payload['worker_id']))
+
+        # Keep both employers' workers_count in step, in the same transaction
+        models.Employer.adjust_workers_count(cursor, worker['current_employer_id'], payload['employer_id'])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@task('fingerprint_complaint')
+def fingerprint_complaint(payload):
+    """Link a new complaint to near-duplicates against the same employer (see backend/dedup.py)"""
+    dedup.fingerprint(payload['complaint_id'])
+
+
+@task('rescore_employer_complaints')
+def rescore_employer_complaints(payload):
+    """Add a new complaint's repeat points to the employer's other open complaints (see backend/triage.py)"""
+    conn = get_connection()
+    try:
+        triage.rescore_employer(conn, payload['employer_id'])
+    finally:
+        conn.close()
@@ -0,0 +1,174 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Complaint Triage - Priority Scores and the Admin Work Queue
+# =====================================================
+#
+# An open complaint's priority is the sum of:
+#   - its category's weight (TRIAGE_CATEGORY_WEIGHTS, e.g. safety above wages)
+#   - TRIAGE_REPEAT_WEIGHT per other complaint against the same employer in
+#     the last TRIAGE_REPEAT_WINDOW_DAYS days (at most TRIAGE_REPEAT_CAP)
+#   - a vulnerability weight for minors and older workers
+#   - TRIAGE_POINTS_PER_DAY for every day it has been waiting
+# The age term grows at the same rate for every complaint, so the stored
+# complaints.priority_score leaves it out and subtracts the creation time
+# instead (score - points/day * days since PRIORITY_EPOCH). Ordering by the
+# stored value is then ordering by the full score, without rescoring rows
+# as they age, and the (status, priority_score) index serves the queue.
+#
+# A new complaint is scored in the transaction that files it. The other
+# open complaints against that employer gain a repeat point too; that
+# rescore is queued as a task, so filing does not update every one of
+# them. Repeat points also fall as complaints leave the window, so the
+# task worker runs rescore_all() daily; it also recomputes everything
+# after the weights change (maintenance.py rescore-complaints).
+
+from datetime import datetime
+from backend import tasks
+from backend.db import get_settings, supports_skip_locked
+
+PRIORITY_EPOCH = datetime(2024, 1, 1)
+
+MINOR_AGE = 18
+SENIOR_AGE = 60
+
+
+def _score_sql(repeat_points):
+    """Expression for the stored score of c (complaints) joined to w (workers), with its parameters"""
+    settings = get_settings()
+    weights = settings.get('TRIAGE_CATEGORY_WEIGHTS', {})
+    default = settings.get('TRIAGE_DEFAULT_WEIGHT', 10)
+    if weights:
+        category_sql = f"CASE c.category {' '.join(['WHEN %s THEN %s'] * len(weights))} ELSE %s END"
+        params = [value for item in weights.items() for value in item] + [default]
+    else:
+        category_sql, params = '%s', [default]
+
+    vulnerability_sql = f"""CASE WHEN w.age < {MINOR_AGE} THEN %s
+                                 WHEN w.age >= {SENIOR_AGE} THEN %s ELSE 0 END"""
+    params += [settings.get('TRIAGE_MINOR_WEIGHT', 20), settings.get('TRIAGE_SENIOR_WEIGHT', 10)]
+
+    age_sql = "%s * TIMESTAMPDIFF(SECOND, %s, c.created_at) / 86400"
+    params += [repeat_points, settings.get('TRIAGE_POINTS_PER_DAY', 5), PRIORITY_EPOCH]
+
+    return f"{category_sql} + {vulnerability_sql} + %s - {age_sql}", params
+
+
+def _repeat_points(cursor, employer_id):
+    """Repeat-complaint points for open complaints against employer_id"""
+    if not employer_id:
+        return 0
+    settings = get_settings()
+    cursor.execute("""
+        SELECT COUNT(*) as count FROM complaints
+        WHERE employer_id = %s AND created_at >= NOW() - INTERVAL %s DAY
+    """, (employer_id, settings.get('TRIAGE_REPEAT_WINDOW_DAYS', 90)))
+    others = max(cursor.fetchone()['count'] - 1, 0)
+    return min(others, settings.get('TRIAGE_REPEAT_CAP', 6)) * settings.get('TRIAGE_REPEAT_WEIGHT', 5)
+
+
+def _rescore(cursor, condition, params, repeat_points):
+    score_sql, score_params = _score_sql(repeat_points)
+    cursor.execute(f"""
+        UPDATE complaints c
+        JOIN workers w ON c.worker_id = w.id
+        SET c.priority_score = {score_sql}
+        WHERE {condition} AND c.status IN ('pending', 'in_progress')
+    """, score_params + list(params))
+    return cursor.rowcount
+
+
+def complaint_filed(cursor, complaint_id, employer_id):
+    """Score a new complaint, and queue a rescore of the employer's other open complaints"""
+    scored = _rescore(cursor, "c.id = %s", (complaint_id,), _repeat_points(cursor, employer_id))
+    if employer_id:
+        tasks.enqueue('rescore_employer_complaints', {'employer_id': employer_id},
+                      idempotency_key=f"complaint_rescore:{complaint_id}", cursor=cursor)
+    return scored
+
+
+def rescore_employer(conn, employer_id):
+    """Recompute the scores of the open complaints against one employer, in one transaction"""
+    cursor = conn.cursor()
+    rescored = _rescore(cursor, "c.employer_id = %s", (employer_id,), _repeat_points(cursor, employer_id))
+    conn.commit()
+    return rescored
+
+
+def rescore_all(conn):
+    """Recompute every open complaint's score, one employer per transaction"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT DISTINCT employer_id FROM complaints
+        WHERE status IN ('pending', 'in_progress') AND employer_id IS NOT NULL
+    """)
+    employer_ids = [row['employer_id'] for row in cursor.fetchall()]
+    rescored = _rescore(cursor, "c.employer_id IS NULL", (), 0)
+    conn.commit()
+    for employer_id in employer_ids:
+        rescored += rescore_employer(conn, employer_id)
+    return rescored
+
+
+def current_score(complaint):
+    """Full priority (including the age term) of a complaint row with priority_score"""
+    if complaint.get('priority_score') is None:
+        return None
+    days = (datetime.now() - PRIORITY_EPOCH).total_seconds() / 86400
+    return round(float(complaint['priority_score']) + get_settings().get('TRIAGE_POINTS_PER_DAY', 5) * days, 1)
+
+
+def release(cursor, complaint_id, admin_id):
+    """Put admin_id's claimed complaint back in the queue; returns the row before the change, or None
+
+    Raises PermissionError if another admin holds the claim.
+    """
+    cursor.execute("""
+        SELECT id, complaint_id, worker_id, employer_id, category, status, created_at, resolved_at,
+               assigned_admin_id
+        FROM complaints
+        WHERE (id = %s OR complaint_id = %s) AND status = 'in_progress'
+        FOR UPDATE
+    """, (complaint_id, complaint_id))
+    complaint = cursor.fetchone()
+    if not complaint:
+        return None
+    if str(complaint['assigned_admin_id']) != str(admin_id):
+        raise PermissionError('Complaint is assigned to another admin')
+    cursor.execute("""
+        UPDATE complaints SET status = 'pending', assigned_admin_id = NULL, claimed_at = NULL
+        WHERE id = %s
+    """, (complaint['id'],))
+    return complaint
+
+
+def claim_next(cursor, admin_id, category=None):
+    """Assign the highest-priority pending complaint to admin_id, or return None
+
+    Rows other admins are claiming right now are locked; SKIP LOCKED passes
+    over them instead of waiting, so concurrent callers get different
+    complaints. Servers without it (MariaDB before 10.6, e.g. XAMPP) make
+    the caller wait for the other claim instead. Call inside a transaction
+    and commit afterwards.
+    """
+    query = """
+        SELECT id, complaint_id, worker_id, employer_id, category, status, created_at, resolved_at
+        FROM complaints
+        WHERE status = 'pending'
+    """
+    params = []
+    if category:
+        query += " AND category = %s"
+        params.append(category)
+    query += " ORDER BY priority_score DESC LIMIT 1 FOR UPDATE"
+    if supports_skip_locked(cursor.connection):
+        query += " SKIP LOCKED"
+    cursor.execute(query, params)
+    complaint = cursor.fetchone()
+    if not complaint:
+        return None
+    cursor.execute("""
+        UPDATE complaints
+        SET status = 'in_progress', assigned_admin_id = %s, claimed_at = NOW()
+        WHERE id = %s
+    """, (admin_id, complaint['id']))
+    return complaint
@@ -0,0 +1,55 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Resource Version Counters
+# =====================================================
+#
+# Each cacheable resource ('jobs', 'employers') has a counter in the
+# resource_versions table. Writes bump the counter inside their own
+# transaction, so anything keyed on the version (ETags, cached query
+# results) is invalidated exactly when the change commits.
+
+from flask import g, has_request_context
+from backend.db import get_connection
+
+JOBS = 'jobs'
+EMPLOYERS = 'employers'
+
+
+def bump_version(cursor, resource):
+    """Increment a resource version as part of the caller's transaction"""
+    cursor.execute("""
+        INSERT INTO resource_versions (resource, version)
+        VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+    """, (resource,))
+
+    # Later reads in this request must not reuse the old version
+    if has_request_context():
+        g.pop('resource_versions', None)
+
+
+def get_versions(*resources):
+    """Get current versions for the given resources (memoized per request)"""
+    cached = g.get('resource_versions', {}) if has_request_context() else {}
+    missing = [resource for resource in resources if resource not in cached]
+
+    if missing:
+        conn = get_connection(readonly=True)
+        try:
+            cursor = conn.cursor()
+            placeholders = ', '.join(['%s'] * len(missing))
+            cursor.execute(f"""
+                SELECT resource, version FROM resource_versions
+                WHERE resource IN ({placeholders})
+            """, missing)
+            found = {row['resource']: row['version'] for row in cursor.fetchall()}
+        finally:
+            conn.close()
+
+        cached = dict(cached)
+        for resource in missing:
+            cached[resource] = found.get(resource, 0)
+        if has_request_context():
+            g.resource_versions = cached
+
+    return {resource: cached[resource] for resource in resources}
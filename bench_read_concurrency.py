@@ -0,0 +1,135 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Read Concurrency Benchmark - Sync (WSGI) vs ASGI Mode
+# =====================================================
+#
+# Fires concurrent GETs at a read endpoint while a number of slow
+# requests (e.g. an admin export) keep workers busy, and reports
+# throughput and latency for each server given.
+#
+# Start the two servers, then compare them:
+#   python backend/app.py                                     (sync, port 5000)
+#   uvicorn backend.asgi:app --port 8000                      (ASGI, port 8000)
+#   python bench_read_concurrency.py \
+#       --server sync=http://localhost:5000 --server asgi=http://localhost:8000 \
+#       --path /api/jobs/list --slow-path /api/admin/applications --slow-concurrency 8
+#
+# Uses only the standard library (asyncio streams, HTTP/1.1, no keep-alive).
+
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(host, port, path):
+    """Send one GET and return (status, seconds)"""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            f"Accept-Encoding: identity\r\nConnection: close\r\n\r\n".encode('latin-1')
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+    finally:
+        writer.close()
+    status = int(status_line.split()[1]) if status_line else 0
+    return status, time.perf_counter() - started
+
+
+async def slow_load(host, port, path, stop):
+    """Keep one slow request in flight until stop is set"""
+    while not stop.is_set():
+        try:
+            await fetch(host, port, path)
+        except OSError:
+            await asyncio.sleep(0.1)
+
+
+async def run_benchmark(base_url, path, total, concurrency, slow_path, slow_concurrency, timeout):
+    """Run the read load against one server and return its statistics"""
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+
+    stop = asyncio.Event()
+    slow_tasks = [asyncio.create_task(slow_load(host, port, slow_path, stop))
+                  for _ in range(slow_concurrency if slow_path else 0)]
+    if slow_tasks:
+        # Let the slow requests occupy their workers first
+        await asyncio.sleep(0.5)
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            try:
+                status, elapsed = await asyncio.wait_for(fetch(host, port, path), timeout)
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+                return
+            if status >= 500 or status == 0:
+                errors += 1
+            else:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    duration = time.perf_counter() - started
+
+    stop.set()
+    for task in slow_tasks:
+        task.cancel()
+    await asyncio.gather(*slow_tasks, return_exceptions=True)
+
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return float('nan')
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'ok': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / duration if duration else 0,
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare read concurrency of MLGMS serving modes')
+    parser.add_argument('--server', action='append', required=True,
+                        help='name=base_url, e.g. sync=http://localhost:5000 (repeatable)')
+    parser.add_argument('--path', default='/api/jobs/list', help='Read endpoint to load')
+    parser.add_argument('--requests', type=int, default=2000, help='Total read requests per server')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 200],
+                        help='Concurrent read clients (one run per value)')
+    parser.add_argument('--slow-path', help='Slow endpoint kept busy during the run')
+    parser.add_argument('--slow-concurrency', type=int, default=4, help='Slow requests kept in flight')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds')
+    args = parser.parse_args()
+
+    servers = [entry.split('=', 1) if '=' in entry else (entry, entry) for entry in args.server]
+
+    print(f"{'server':<10} {'clients':>7} {'ok':>7} {'errors':>7} {'req/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        for name, base_url in servers:
+            result = asyncio.run(run_benchmark(
+                base_url, args.path, args.requests, concurrency,
+                args.slow_path, args.slow_concurrency, args.timeout
+            ))
+            print(f"{name:<10} {concurrency:>7} {result['ok']:>7} {result['errors']:>7} "
+                  f"{result['rps']:>9.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['p99']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Static Asset Build - Content Hashing and Precompression
+# =====================================================
+#
+# Writes dist/ with content-hashed copies of pages/*.html, css/ and js/,
+# each alongside .gz (and .br when brotli is installed) versions, plus a
+# rewritten index.html and manifest.json. backend/app.py serves from
+# dist/ when it exists, with immutable cache headers on hashed files.
+#
+# Usage: python build_assets.py
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(PROJECT_ROOT, 'dist')
+
+
+def hashed_name(path, content):
+    """Insert a short content hash before the extension: app.js -> app.1a2b3c4d.js"""
+    base, ext = os.path.splitext(path)
+    digest = hashlib.sha256(content).hexdigest()[:8]
+    return f"{base}.{digest}{ext}"
+
+
+def write_asset(rel_path, content):
+    """Write a file to dist/ with its precompressed variants"""
+    target = os.path.join(DIST_DIR, rel_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    with open(target, 'wb') as f:
+        f.write(content)
+    with open(target + '.gz', 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9))
+    if brotli is not None:
+        with open(target + '.br', 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+
+
+def read(rel_path):
+    with open(os.path.join(PROJECT_ROOT, rel_path), 'rb') as f:
+        return f.read()
+
+
+def rewrite_references(content, manifest):
+    """Replace quoted references to source assets with their hashed names"""
+    text = content.decode('utf-8')
+    for source, built in manifest.items():
+        text = re.sub(r'''(["'])%s\1''' % re.escape(source), r'\g<1>%s\g<1>' % built, text)
+    return text.encode('utf-8')
+
+
+def build():
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifest = {}
+
+    # Leaf assets first: they reference nothing that gets hashed
+    leaves = ['css/style.css', 'js/controllers.js']
+    leaves += sorted(f"pages/{name}" for name in os.listdir(os.path.join(PROJECT_ROOT, 'pages'))
+                     if name.endswith('.html'))
+    for rel_path in leaves:
+        content = read(rel_path)
+        manifest[rel_path] = hashed_name(rel_path, content)
+        write_asset(manifest[rel_path], content)
+
+    # app.js holds the templateUrl for every page
+    content = rewrite_references(read('js/app.js'), manifest)
+    manifest['js/app.js'] = hashed_name('js/app.js', content)
+    write_asset(manifest['js/app.js'], content)
+
+    # index.html keeps its name (it is revalidated on every load)
+    write_asset('index.html', rewrite_references(read('index.html'), manifest))
+
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"[OK] Built {len(manifest) + 1} assets into {DIST_DIR}")
+    if brotli is None:
+        print("  brotli not installed - only .gz variants were written")
+
+
+if __name__ == '__main__':
+    build()
@@ -0,0 +1,26 @@
+# Employer verification fields (formerly migrate_employer_verification.py)
+
+
+def up(m):
+    added = m.add_column('employers', 'employer_id', 'VARCHAR(20) UNIQUE AFTER id')
+    m.add_column('employers', 'password', 'VARCHAR(255) AFTER email')
+    m.add_column('employers', 'gst_number', 'VARCHAR(20) AFTER password')
+    m.add_column('employers', 'registration_number', 'VARCHAR(50) AFTER gst_number')
+    m.add_column('employers', 'address', 'TEXT AFTER registration_number')
+    m.add_column('employers', 'is_verified',
+                 "ENUM('pending', 'verified', 'rejected') DEFAULT 'pending' AFTER status")
+    m.add_column('employers', 'verification_notes', 'TEXT AFTER is_verified')
+    m.add_column('employers', 'verified_at', 'TIMESTAMP NULL AFTER verification_notes')
+    m.add_column('employers', 'verified_by', 'INT AFTER verified_at')
+
+    if added:
+        # Employers that existed before verification are treated as verified
+        m.execute("""
+            UPDATE employers
+            SET is_verified = 'verified',
+                employer_id = CONCAT('EMP', LPAD(id, 5, '0'))
+            WHERE is_verified IS NULL OR is_verified = 'pending'
+        """)
+
+    m.add_index('employers', 'idx_employers_employer_id', 'employer_id')
+    m.add_index('employers', 'idx_employers_is_verified', 'is_verified')
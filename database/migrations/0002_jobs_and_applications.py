@@ -0,0 +1,54 @@
+# Jobs, job applications and the resource_versions counters
+
+
+def up(m):
+    m.create_table('jobs', """
+        CREATE TABLE jobs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            job_id VARCHAR(20) UNIQUE NOT NULL,
+            employer_id INT NOT NULL,
+            title VARCHAR(150) NOT NULL,
+            description TEXT,
+            skill_required VARCHAR(50),
+            location VARCHAR(200),
+            wage_per_day DECIMAL(10,2),
+            duration_days INT,
+            workers_needed INT,
+            status ENUM('open', 'closed', 'filled') DEFAULT 'open',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (employer_id) REFERENCES employers(id) ON DELETE CASCADE
+        )
+    """)
+    m.create_table('job_applications', """
+        CREATE TABLE job_applications (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            application_id VARCHAR(20) UNIQUE NOT NULL,
+            job_id INT NOT NULL,
+            worker_id INT NOT NULL,
+            status ENUM('pending', 'accepted', 'rejected') DEFAULT 'pending',
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            responded_at TIMESTAMP NULL,
+            FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE,
+            FOREIGN KEY (worker_id) REFERENCES workers(id) ON DELETE CASCADE
+        )
+    """)
+
+    m.add_index('jobs', 'idx_jobs_employer', 'employer_id')
+    m.add_index('jobs', 'idx_jobs_status', 'status')
+    m.add_index('jobs', 'idx_jobs_skill', 'skill_required')
+    m.add_index('job_applications', 'idx_applications_worker', 'worker_id')
+    m.add_index('job_applications', 'idx_applications_job', 'job_id')
+    m.add_index('job_applications', 'idx_applications_status', 'status')
+
+    m.create_table('resource_versions', """
+        CREATE TABLE resource_versions (
+            resource VARCHAR(50) PRIMARY KEY,
+            version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    m.execute("""
+        INSERT IGNORE INTO resource_versions (resource, version)
+        VALUES ('jobs', 1), ('employers', 1)
+    """)
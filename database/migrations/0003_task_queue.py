@@ -0,0 +1,23 @@
+# Durable background task queue (see backend/tasks.py)
+
+
+def up(m):
+    m.create_table('task_queue', """
+        CREATE TABLE task_queue (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            task_name VARCHAR(100) NOT NULL,
+            payload TEXT NOT NULL,
+            idempotency_key VARCHAR(191) NULL,
+            status ENUM('pending', 'running', 'done', 'failed') DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            max_attempts INT NOT NULL DEFAULT 5,
+            run_after DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            locked_by VARCHAR(100) NULL,
+            locked_at DATETIME NULL,
+            last_error TEXT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_task_queue_idempotency (idempotency_key),
+            INDEX idx_task_queue_claim (status, run_after)
+        )
+    """)
@@ -0,0 +1,23 @@
+# Employer ratings and the running rating aggregate (see Employer.rate)
+
+
+def up(m):
+    m.add_column('employers', 'rating_sum', 'INT NOT NULL DEFAULT 0 AFTER rating')
+    m.add_column('employers', 'rating_count', 'INT NOT NULL DEFAULT 0 AFTER rating_sum')
+
+    m.create_table('employer_ratings', """
+        CREATE TABLE employer_ratings (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            employer_id INT NOT NULL,
+            worker_id INT NOT NULL,
+            rating TINYINT NOT NULL,
+            review TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_employer_ratings_worker (employer_id, worker_id),
+            FOREIGN KEY (employer_id) REFERENCES employers(id) ON DELETE CASCADE,
+            FOREIGN KEY (worker_id) REFERENCES workers(id) ON DELETE CASCADE
+        )
+    """)
+
+    m.add_index('workers', 'idx_workers_current_employer', 'current_employer_id')
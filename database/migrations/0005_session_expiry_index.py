@@ -0,0 +1,5 @@
+# Index for the expired session sweeper (see backend/sweeper.py)
+
+
+def up(m):
+    m.add_index('sessions', 'idx_sessions_expires_at', 'expires_at')
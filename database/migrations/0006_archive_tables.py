@@ -0,0 +1,11 @@
+# Archive tables for finished complaints and jobs (see backend/archive.py)
+
+
+def up(m):
+    for table in ('complaints', 'jobs', 'job_applications'):
+        m.create_table(f"{table}_archive", f"CREATE TABLE {table}_archive LIKE {table}")
+        m.add_column(f"{table}_archive", 'archived_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+
+    m.add_index('job_applications_archive', 'idx_applications_archive_worker', 'worker_id')
+    m.add_index('job_applications_archive', 'idx_applications_archive_job', 'job_id')
+    m.add_index('complaints_archive', 'idx_complaints_archive_worker', 'worker_id')
@@ -0,0 +1,12 @@
+# Composite indexes for the hot list queries (found with index_advisor.py)
+
+
+def up(m):
+    # A worker's complaints, newest first
+    m.add_index('complaints', 'idx_complaints_worker_created', 'worker_id, created_at')
+    # Applications of a job, filtered by status
+    m.add_index('job_applications', 'idx_applications_job_status', 'job_id, status')
+    # Employer verification queue and filtered employer lists
+    m.add_index('employers', 'idx_employers_verified_created', 'is_verified, created_at')
+    # Open jobs by skill, newest first
+    m.add_index('jobs', 'idx_jobs_status_skill_created', 'status, skill_required, created_at')
@@ -0,0 +1,10 @@
+# Covering indexes for the model projections (see COLUMNS in backend/models.py)
+
+
+def up(m):
+    # Worker.authenticate 'login' columns
+    m.add_index('workers', 'idx_workers_login', 'migrant_id, phone, name, skill')
+    # Complaint.get_by_worker 'summary' columns (replaces the 0007 prefix index)
+    m.add_index('complaints', 'idx_complaints_worker_summary',
+                'worker_id, created_at, status, category, complaint_id')
+    m.drop_index('complaints', 'idx_complaints_worker_created')
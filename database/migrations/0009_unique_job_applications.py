@@ -0,0 +1,39 @@
+# One application per worker per job: UNIQUE(job_id, worker_id)
+#
+# Duplicates that slipped in through the old check-then-insert block the
+# unique key. They are listed and the migration stops, unless it is run
+# with --allow-deletes, which keeps the first application of each pair.
+
+
+def up(m):
+    m.cursor.execute("""
+        SELECT job_id, worker_id, COUNT(*) as count,
+               GROUP_CONCAT(application_id ORDER BY id) as application_ids
+        FROM job_applications
+        GROUP BY job_id, worker_id
+        HAVING COUNT(*) > 1
+    """)
+    duplicates = m.cursor.fetchall()
+    if duplicates:
+        for row in duplicates[:20]:
+            m.log(f"  job {row['job_id']}, worker {row['worker_id']}: {row['application_ids']}")
+        if len(duplicates) > 20:
+            m.log(f"  ... and {len(duplicates) - 20} more")
+        if not m.allow_deletes:
+            message = (f"{len(duplicates)} worker/job pair(s) have more than one application. "
+                       "Resolve them, or rerun with --allow-deletes to keep the first of each.")
+            if not m.dry_run:
+                raise RuntimeError(message)
+            m.log(f"-- would stop here: {message}")
+            return
+        removed = m.execute("""
+            DELETE a FROM job_applications a
+            JOIN job_applications b
+              ON a.job_id = b.job_id AND a.worker_id = b.worker_id AND a.id > b.id
+        """)
+        if removed:
+            m.log(f"[OK] Removed {removed} duplicate application(s)")
+
+    m.add_index('job_applications', 'uq_applications_job_worker', 'job_id, worker_id', unique=True)
+    # The unique key leads with job_id, so the single-column index is redundant
+    m.drop_index('job_applications', 'idx_applications_job')
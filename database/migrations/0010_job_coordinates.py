@@ -0,0 +1,30 @@
+# Job coordinates and geohash for the radius search (see backend/geo.py)
+
+from backend.geo import geocode, geohash
+
+
+def up(m):
+    m.add_column('jobs', 'latitude', 'DECIMAL(9,6) NULL')
+    m.add_column('jobs', 'longitude', 'DECIMAL(9,6) NULL')
+    m.add_column('jobs', 'geohash', 'CHAR(6) NULL')
+    m.add_index('jobs', 'idx_jobs_status_geohash', 'status, geohash')
+
+    if m.dry_run:
+        m.log("-- geocode existing jobs from jobs.location (or the employer's location)")
+        return
+    m.cursor.execute("""
+        SELECT j.id, j.location, e.location as employer_location
+        FROM jobs j
+        JOIN employers e ON j.employer_id = e.id
+        WHERE j.geohash IS NULL
+    """)
+    located = 0
+    for job in m.cursor.fetchall():
+        place = geocode(job['location']) or geocode(job['employer_location'])
+        if not place:
+            continue
+        m.execute("""
+            UPDATE jobs SET latitude = %s, longitude = %s, geohash = %s WHERE id = %s
+        """, (place['latitude'], place['longitude'], geohash(place['latitude'], place['longitude']), job['id']))
+        located += 1
+    m.log(f"[OK] Geocoded {located} job(s)")
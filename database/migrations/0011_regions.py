@@ -0,0 +1,34 @@
+# Normalized regions dimension and region_id on workers, jobs and employers
+#
+# regions is seeded from backend/regions.py (states) and the gazetteer
+# (cities). Existing rows get their region_id from
+# `python maintenance.py backfill-regions`. region_id has no foreign key:
+# regions rows are never deleted, and the big tables need no extra
+# constraint checks on every write.
+
+from backend.regions import region_rows
+
+
+def up(m):
+    m.create_table('regions', """
+        CREATE TABLE regions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            state VARCHAR(60) NOT NULL,
+            district VARCHAR(100) NOT NULL DEFAULT '',
+            latitude DECIMAL(9,6) NULL,
+            longitude DECIMAL(9,6) NULL,
+            UNIQUE KEY uq_regions_state_district (state, district)
+        )
+    """)
+    for state, district, latitude, longitude in region_rows():
+        m.execute("""
+            INSERT IGNORE INTO regions (state, district, latitude, longitude)
+            VALUES (%s, %s, %s, %s)
+        """, (state, district, latitude, longitude))
+    m.log("[OK] Seeded regions")
+
+    for table in ('workers', 'jobs', 'employers'):
+        m.add_column(table, 'region_id', 'INT NULL')
+    m.add_index('workers', 'idx_workers_region', 'region_id')
+    m.add_index('jobs', 'idx_jobs_region_status', 'region_id, status')
+    m.add_index('employers', 'idx_employers_region', 'region_id')
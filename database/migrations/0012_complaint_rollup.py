@@ -0,0 +1,30 @@
+# Complaint analytics fact table and its refresh watermark (see backend/rollup.py)
+
+
+def up(m):
+    m.create_table('complaint_rollup', """
+        CREATE TABLE complaint_rollup (
+            month DATE NOT NULL,
+            region_id INT NOT NULL DEFAULT 0,
+            employer_id INT NOT NULL DEFAULT 0,
+            category VARCHAR(50) NOT NULL,
+            total INT NOT NULL DEFAULT 0,
+            pending INT NOT NULL DEFAULT 0,
+            in_progress INT NOT NULL DEFAULT 0,
+            resolved INT NOT NULL DEFAULT 0,
+            rejected INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, region_id, employer_id, category),
+            KEY idx_rollup_category (category, month),
+            KEY idx_rollup_employer (employer_id, month),
+            KEY idx_rollup_region (region_id, month)
+        )
+    """)
+    m.create_table('rollup_watermarks', """
+        CREATE TABLE rollup_watermarks (
+            name VARCHAR(50) PRIMARY KEY,
+            watermark DATETIME NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    # Finds the complaints changed since the watermark
+    m.add_index('complaints', 'idx_complaints_updated', 'updated_at, created_at')
@@ -0,0 +1,35 @@
+# Complaint SLA tables: resolution-time histograms and the open-complaint aging index
+# (see backend/sla.py)
+
+from backend.sla import rebuild
+
+
+def up(m):
+    m.create_table('sla_resolution_histogram', """
+        CREATE TABLE sla_resolution_histogram (
+            dimension ENUM('category', 'employer') NOT NULL,
+            dim_key VARCHAR(64) NOT NULL,
+            bucket TINYINT NOT NULL,
+            resolved INT NOT NULL DEFAULT 0,
+            breached INT NOT NULL DEFAULT 0,
+            hours_total DOUBLE NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, dim_key, bucket)
+        )
+    """)
+    m.create_table('complaint_sla', """
+        CREATE TABLE complaint_sla (
+            id INT PRIMARY KEY,
+            category VARCHAR(50) NOT NULL,
+            employer_id INT NULL,
+            created_at TIMESTAMP NOT NULL,
+            due_at DATETIME NOT NULL,
+            KEY idx_complaint_sla_due (due_at),
+            KEY idx_complaint_sla_category (category, created_at)
+        )
+    """)
+
+    if m.dry_run:
+        m.log("-- fill both tables from the existing complaints")
+        return
+    histogram_cells, open_complaints = rebuild(m.cursor)
+    m.log(f"[OK] Built {histogram_cells} histogram cell(s), {open_complaints} open complaint(s)")
@@ -0,0 +1,17 @@
+# Complaint priority score and claim columns for the admin triage queue
+# (see backend/triage.py)
+
+from backend.triage import rescore_all
+
+
+def up(m):
+    m.add_column('complaints', 'priority_score', 'DOUBLE NULL')
+    m.add_column('complaints', 'assigned_admin_id', 'INT NULL')
+    m.add_column('complaints', 'claimed_at', 'TIMESTAMP NULL')
+    # The queue: highest score among pending complaints
+    m.add_index('complaints', 'idx_complaints_status_priority', 'status, priority_score')
+
+    if m.dry_run:
+        m.log("-- score the open complaints")
+        return
+    m.log(f"[OK] Scored {rescore_all(m.cursor.connection)} open complaint(s)")
@@ -0,0 +1,17 @@
+# MinHash fingerprints and duplicate clusters of complaints (see backend/dedup.py)
+
+
+def up(m):
+    m.create_table('complaint_fingerprints', """
+        CREATE TABLE complaint_fingerprints (
+            complaint_id INT PRIMARY KEY,
+            seq BIGINT NOT NULL AUTO_INCREMENT UNIQUE,
+            employer_id INT NOT NULL,
+            cluster_id INT NOT NULL,
+            signature VARBINARY(256) NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            KEY idx_fingerprints_employer (employer_id, seq),
+            KEY idx_fingerprints_cluster (cluster_id)
+        )
+    """)
+    m.log("-- run 'python maintenance.py dedup-complaints' to fingerprint existing complaints")
@@ -0,0 +1,38 @@
+# Per-employer complaint counts and risk scores (see backend/risk.py)
+
+from backend.risk import recompute
+
+
+def up(m):
+    m.create_table('employer_risk', """
+        CREATE TABLE employer_risk (
+            employer_id INT PRIMARY KEY,
+            complaints_total INT NOT NULL DEFAULT 0,
+            complaints_open INT NOT NULL DEFAULT 0,
+            risk_key DOUBLE NOT NULL DEFAULT 0,
+            formula CHAR(8) NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            KEY idx_employer_risk_key (risk_key)
+        )
+    """)
+    m.create_table('employer_complaint_categories', """
+        CREATE TABLE employer_complaint_categories (
+            employer_id INT NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            total INT NOT NULL DEFAULT 0,
+            open_count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (employer_id, category)
+        )
+    """)
+
+    if m.dry_run:
+        m.log("-- compute every employer's counts and score from the complaint history")
+        return
+    after_id = 0
+    scored = 0
+    while True:
+        after_id, recomputed = recompute(after_id, stale_only=False)
+        if after_id is None:
+            break
+        scored += recomputed
+    m.log(f"[OK] Scored {scored} employer(s)")
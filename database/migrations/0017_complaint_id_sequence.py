@@ -0,0 +1,25 @@
+# Complaint IDs from an AUTO_INCREMENT sequence (see Complaint.generate_complaint_id)
+#
+# A partitioned complaints table is only unique on (complaint_id, created_at),
+# so MAX()+1 could hand two concurrent filings the same ID. Rows are kept:
+# before MySQL 8.0 an empty table restarts its counter at 1 after a restart.
+
+
+def up(m):
+    m.create_table('complaint_id_sequence', """
+        CREATE TABLE complaint_id_sequence (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Start past every ID already issued, archived ones included
+    m.execute("""
+        INSERT IGNORE INTO complaint_id_sequence (id)
+        SELECT max_id FROM (
+            SELECT GREATEST(
+                (SELECT COALESCE(MAX(CAST(SUBSTRING(complaint_id, 4) AS UNSIGNED)), 0) FROM complaints),
+                (SELECT COALESCE(MAX(CAST(SUBSTRING(complaint_id, 4) AS UNSIGNED)), 0) FROM complaints_archive)
+            ) AS max_id
+        ) issued
+        WHERE max_id > 0
+    """)
@@ -0,0 +1,25 @@
+# Application IDs from an AUTO_INCREMENT sequence (see JobApplication.generate_application_id)
+#
+# With IDs that never collide, a duplicate-key error on INSERT can only
+# mean the worker already applied (UNIQUE(job_id, worker_id), migration
+# 0009). Rows are kept, as for complaint_id_sequence (0017).
+
+
+def up(m):
+    m.create_table('application_id_sequence', """
+        CREATE TABLE application_id_sequence (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Start past every ID already issued, archived ones included
+    m.execute("""
+        INSERT IGNORE INTO application_id_sequence (id)
+        SELECT max_id FROM (
+            SELECT GREATEST(
+                (SELECT COALESCE(MAX(CAST(SUBSTRING(application_id, 4) AS UNSIGNED)), 0) FROM job_applications),
+                (SELECT COALESCE(MAX(CAST(SUBSTRING(application_id, 4) AS UNSIGNED)), 0) FROM job_applications_archive)
+            ) AS max_id
+        ) issued
+        WHERE max_id > 0
+    """)
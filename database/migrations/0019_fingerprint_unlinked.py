@@ -0,0 +1,5 @@
+# Remember complaints an admin took out of a duplicate cluster (see dedup.unlink)
+
+
+def up(m):
+    m.add_column('complaint_fingerprints', 'unlinked', 'TINYINT(1) NOT NULL DEFAULT 0')
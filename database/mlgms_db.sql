@@ -56,6 +56,8 @@ CREATE TABLE IF NOT EXISTS employers (
     verified_at TIMESTAMP NULL,
     verified_by INT,
     rating DECIMAL(3,2) DEFAULT 0.00,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_count INT NOT NULL DEFAULT 0,
     workers_count INT DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
@@ -124,6 +126,7 @@ CREATE INDEX idx_complaints_status ON complaints(status);
 CREATE INDEX idx_complaints_created_at ON complaints(created_at);
 CREATE INDEX idx_employers_status ON employers(status);
 CREATE INDEX idx_sessions_session_id ON sessions(session_id);
+CREATE INDEX idx_sessions_expires_at ON sessions(expires_at);
 
 -- =====================================================
 -- Sample Data: Employers
@@ -327,6 +330,100 @@ INSERT INTO jobs (job_id, employer_id, title, description, skill_required, locat
 ('JOB00006', 1, 'Plumber for Maintenance Work', 'Experienced plumber for maintenance work in commercial complex', 'plumber', 'Mumbai, Maharashtra', 700.00, 15, 3, 'open'),
 ('JOB00007', 3, 'Textile Worker', 'Workers needed for textile manufacturing', 'other', 'Surat, Gujarat', 450.00, 30, 15, 'closed');
 
+-- =====================================================
+-- Table: resource_versions
+-- Version counters bumped on writes; used for ETags and
+-- cache invalidation of public read endpoints
+-- =====================================================
+CREATE TABLE IF NOT EXISTS resource_versions (
+    resource VARCHAR(50) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT INTO resource_versions (resource, version) VALUES
+('jobs', 1),
+('employers', 1);
+
+-- =====================================================
+-- Table: task_queue
+-- Durable background tasks (post-commit side effects)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS task_queue (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    task_name VARCHAR(100) NOT NULL,
+    payload TEXT NOT NULL,
+    idempotency_key VARCHAR(191) NULL,
+    status ENUM('pending', 'running', 'done', 'failed') DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 5,
+    run_after DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100) NULL,
+    locked_at DATETIME NULL,
+    last_error TEXT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_task_queue_idempotency (idempotency_key),
+    INDEX idx_task_queue_claim (status, run_after)
+);
+
+-- =====================================================
+-- Table: employer_ratings
+-- One rating per worker per employer; employers.rating is
+-- kept as rating_sum / rating_count
+-- =====================================================
+CREATE TABLE IF NOT EXISTS employer_ratings (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    employer_id INT NOT NULL,
+    worker_id INT NOT NULL,
+    rating TINYINT NOT NULL,
+    review TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_employer_ratings_worker (employer_id, worker_id),
+    FOREIGN KEY (employer_id) REFERENCES employers(id) ON DELETE CASCADE,
+    FOREIGN KEY (worker_id) REFERENCES workers(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_workers_current_employer ON workers(current_employer_id);
+
+-- =====================================================
+-- Archive tables
+-- Finished complaints and jobs (with their applications) are
+-- moved here by `python maintenance.py archive`
+-- =====================================================
+CREATE TABLE IF NOT EXISTS complaints_archive LIKE complaints;
+ALTER TABLE complaints_archive ADD COLUMN archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+CREATE TABLE IF NOT EXISTS jobs_archive LIKE jobs;
+ALTER TABLE jobs_archive ADD COLUMN archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+CREATE TABLE IF NOT EXISTS job_applications_archive LIKE job_applications;
+ALTER TABLE job_applications_archive ADD COLUMN archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+CREATE INDEX idx_applications_archive_worker ON job_applications_archive(worker_id);
+CREATE INDEX idx_applications_archive_job ON job_applications_archive(job_id);
+CREATE INDEX idx_complaints_archive_worker ON complaints_archive(worker_id);
+
+-- =====================================================
+-- Schema migrations
+-- This file already contains migrations 0001-0006; later ones
+-- are applied with `python migrate_db.py`
+-- =====================================================
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(20) PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duration_ms INT NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO schema_migrations (version, name) VALUES
+('0001', 'employer verification'),
+('0002', 'jobs and applications'),
+('0003', 'task queue'),
+('0004', 'employer ratings'),
+('0005', 'session expiry index'),
+('0006', 'archive tables');
+
 -- =====================================================
 -- Grant privileges (adjust username as needed)
 -- =====================================================
@@ -0,0 +1,303 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Index Advisor
+# =====================================================
+#
+# Proposes composite/covering indexes from a captured query workload:
+#   1. Capture: run the app (or a load test) with QUERY_CAPTURE_FILE set;
+#      every statement is logged with its values (backend/query_capture.py).
+#   2. Advise: EXPLAIN each captured statement against a local database
+#      loaded with production-sized data, build a candidate index for every
+#      table that is scanned or filesorted (equality columns, then ORDER BY
+#      or range columns), create it, EXPLAIN again and drop it. The estimated
+#      benefit is (rows examined before - after) x executions.
+#   3. Apply: --write-migration writes database/migrations/NNNN_*.py.
+#
+# Usage: python index_advisor.py queries.jsonl [--top 30] [--write-migration]
+# Point --config at the scaled local database, never at production: what-if
+# mode creates and drops indexes.
+
+import argparse
+import json
+import os
+import re
+from collections import OrderedDict
+from backend import query_capture
+from backend.app import create_app
+from backend.db import get_connection
+from backend.migrate import MIGRATIONS_DIR, discover
+
+SQL_KEYWORDS = {'WHERE', 'ON', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'ORDER', 'GROUP',
+                'LIMIT', 'UNION', 'FOR', 'SET', 'USING', 'HAVING', 'AS'}
+COVERING_MAX_COLUMNS = 5
+
+
+def load_workload(path):
+    """Group captured statements by fingerprint: {fingerprint: {count, ms, sql}}"""
+    workload = {}
+    with open(path, encoding='utf-8') as capture:
+        for line in capture:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            stats = workload.setdefault(entry['fingerprint'], {'count': 0, 'ms': 0.0, 'sql': entry['sql']})
+            stats['count'] += 1
+            stats['ms'] += entry['ms']
+    return workload
+
+
+def table_aliases(sql):
+    """Map alias (or table name) -> table for the FROM/JOIN/UPDATE clauses of a statement"""
+    aliases = {}
+    for match in re.finditer(r'\b(?:FROM|JOIN|UPDATE)\s+`?(\w+)`?(?:\s+(?:AS\s+)?(\w+))?', sql, re.I):
+        table, alias = match.group(1), match.group(2)
+        aliases[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def _owner(qualifier, aliases):
+    """Table a column reference belongs to (None if ambiguous)"""
+    if qualifier:
+        return aliases.get(qualifier)
+    tables = set(aliases.values())
+    return tables.pop() if len(tables) == 1 else None
+
+
+def predicate_columns(sql, table, aliases):
+    """Get (equality, range, order_by, selected) column lists of a statement for one table"""
+    equality, joins, ranges, order_by, selected = [], [], [], [], []
+    column = r'(?:(\w+)\.)?`?(\w+)`?'
+
+    def add(target, qualifier, name):
+        if _owner(qualifier, aliases) == table and name not in target and name.upper() not in SQL_KEYWORDS:
+            target.append(name)
+
+    # col = value / col IN (...), and a.col = b.col join conditions (both sides)
+    for match in re.finditer(column + r'\s*(=|<=>|\bIN\b)\s*(?:' + column + r')?', sql, re.I):
+        if match.group(5) and not match.group(5).isdigit():
+            add(joins, match.group(1), match.group(2))
+            add(joins, match.group(4), match.group(5))
+        else:
+            add(equality, match.group(1), match.group(2))
+    if not equality:
+        # Only reached through a join - the join column is what gets looked up
+        equality = joins
+    for match in re.finditer(column + r'\s*(?:>=|<=|>|<|\bBETWEEN\b|\bLIKE\b)', sql, re.I):
+        add(ranges, match.group(1), match.group(2))
+
+    order = re.search(r'\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|\bFOR\b|\)|$)', sql, re.I)
+    if order:
+        for item in order.group(1).split(','):
+            match = re.match(r'\s*' + column, item)
+            if not match:
+                continue
+            if _owner(match.group(1), aliases) != table:
+                # Sorting on another table's columns cannot use this index
+                order_by = []
+                break
+            add(order_by, match.group(1), match.group(2))
+
+    select = re.match(r'\s*SELECT\s+(.+?)\s+FROM\b', sql, re.I | re.S)
+    if select and '*' not in select.group(1):
+        for item in select.group(1).split(','):
+            match = re.match(r'\s*' + column + r'\s*(?:as\s+\w+)?\s*$', item, re.I)
+            if match:
+                add(selected, match.group(1), match.group(2))
+            elif item.strip():
+                # Expressions (COUNT, CASE, ...) - not worth covering
+                selected = None
+                break
+
+    ranges = [name for name in ranges if name not in equality]
+    order_by = [name for name in order_by if name not in equality]
+    return equality, ranges, order_by, selected
+
+
+def candidate_index(equality, ranges, order_by):
+    """Equality columns first, then the sort columns if any, otherwise one range column"""
+    if order_by:
+        return equality + order_by
+    return equality + ranges[:1]
+
+
+def existing_indexes(cursor, table):
+    """{index name: [columns]} for a table"""
+    cursor.execute("""
+        SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+    indexes = {}
+    for row in cursor.fetchall():
+        indexes.setdefault(row['INDEX_NAME'], []).append(row['COLUMN_NAME'])
+    return indexes
+
+
+def table_rows(cursor, table):
+    cursor.execute("""
+        SELECT TABLE_ROWS FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    row = cursor.fetchone()
+    return (row['TABLE_ROWS'] or 0) if row else 0
+
+
+def explain(cursor, sql):
+    """EXPLAIN rows keyed by the table (alias) they read"""
+    cursor.execute("EXPLAIN " + sql)
+    return cursor.fetchall()
+
+
+def examined_rows(plan_row):
+    return (plan_row.get('rows') or 0) * float(plan_row.get('filtered') or 100) / 100
+
+
+def needs_index(plan_row):
+    extra = plan_row.get('Extra') or ''
+    return plan_row.get('type') in ('ALL', 'index') or 'filesort' in extra or 'temporary' in extra
+
+
+def index_name(table, columns):
+    return f"idx_{table}_{'_'.join(columns)}"[:64]
+
+
+def advise(workload, top, what_if=True):
+    """Get OrderedDict {(table, columns): proposal} sorted by estimated benefit"""
+    proposals = {}
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        ranked = sorted(workload.items(), key=lambda item: item[1]['ms'], reverse=True)[:top]
+        for fingerprint, stats in ranked:
+            try:
+                plan = explain(cursor, stats['sql'])
+            except Exception as e:
+                print(f"[SKIP] Cannot EXPLAIN {fingerprint[:80]}: {e}")
+                continue
+
+            aliases = table_aliases(fingerprint)
+            for plan_row in plan:
+                table = aliases.get(plan_row.get('table'))
+                if not table or not needs_index(plan_row):
+                    continue
+
+                equality, ranges, order_by, selected = predicate_columns(fingerprint, table, aliases)
+                columns = candidate_index(equality, ranges, order_by)
+                if not columns:
+                    continue
+
+                indexes = existing_indexes(cursor, table)
+                if any(existing[:len(columns)] == columns for existing in indexes.values()):
+                    continue
+
+                covering = False
+                if selected:
+                    # Secondary indexes already carry the primary key (id)
+                    extra_columns = [name for name in selected if name not in columns and name != 'id']
+                    if len(columns) + len(extra_columns) <= COVERING_MAX_COLUMNS:
+                        columns = columns + extra_columns
+                        covering = bool(extra_columns)
+
+                key = (table, tuple(columns))
+                proposal = proposals.setdefault(key, {
+                    'table': table, 'columns': columns, 'covering': covering,
+                    'queries': [], 'before': 0.0, 'after': None, 'executions': 0,
+                    'table_rows': table_rows(cursor, table),
+                    'redundant': [name for name, existing in indexes.items()
+                                  if name != 'PRIMARY' and columns[:len(existing)] == existing]
+                })
+                proposal['queries'].append(fingerprint)
+                proposal['executions'] += stats['count']
+                proposal['before'] += examined_rows(plan_row) * stats['count']
+
+        if what_if:
+            for proposal in proposals.values():
+                measure(cursor, proposal, workload)
+    finally:
+        conn.close()
+
+    def benefit(proposal):
+        if proposal['after'] is None:
+            return proposal['before']
+        return proposal['before'] - proposal['after']
+
+    return OrderedDict(sorted(proposals.items(), key=lambda item: benefit(item[1]), reverse=True))
+
+
+def measure(cursor, proposal, workload):
+    """Create the index, re-EXPLAIN its queries and drop it again"""
+    name = index_name(proposal['table'], proposal['columns'])
+    cursor.execute(f"CREATE INDEX {name} ON {proposal['table']} ({', '.join(proposal['columns'])})")
+    try:
+        after = 0.0
+        for fingerprint in proposal['queries']:
+            stats = workload[fingerprint]
+            aliases = table_aliases(fingerprint)
+            for plan_row in explain(cursor, stats['sql']):
+                if aliases.get(plan_row.get('table')) == proposal['table']:
+                    after += examined_rows(plan_row) * stats['count']
+        proposal['after'] = after
+    finally:
+        cursor.execute(f"DROP INDEX {name} ON {proposal['table']}")
+
+
+def print_report(proposals):
+    if not proposals:
+        print("[OK] No index suggestions - every captured query uses an index")
+        return
+    print(f"{'table':<20} {'index':<45} {'runs':>7} {'rows before':>13} {'rows after':>12}")
+    for proposal in proposals.values():
+        after = '?' if proposal['after'] is None else f"{proposal['after']:.0f}"
+        label = ', '.join(proposal['columns']) + (' (covering)' if proposal['covering'] else '')
+        print(f"{proposal['table']:<20} {label:<45} {proposal['executions']:>7} "
+              f"{proposal['before']:>13.0f} {after:>12}")
+        for name in proposal['redundant']:
+            print(f"{'':<20}   makes {name} redundant")
+
+
+def write_migration(proposals, online_rows):
+    """Write a migration adding the proposed indexes; returns its path"""
+    existing = discover()
+    version = f"{int(existing[-1].version) + 1 if existing else 1:04d}"
+    path = os.path.join(MIGRATIONS_DIR, f"{version}_advisor_indexes.py")
+
+    lines = ["# Composite indexes proposed by index_advisor.py", "", "", "def up(m):"]
+    for proposal in proposals.values():
+        online = ', online=True' if proposal['table_rows'] >= online_rows else ''
+        lines.append(f"    m.add_index('{proposal['table']}', '{index_name(proposal['table'], proposal['columns'])}', "
+                     f"'{', '.join(proposal['columns'])}'{online})")
+    with open(path, 'w', encoding='utf-8') as migration:
+        migration.write('\n'.join(lines) + '\n')
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Propose indexes for a captured query workload')
+    parser.add_argument('capture', help='JSON lines file written with QUERY_CAPTURE_FILE')
+    parser.add_argument('--top', type=int, default=30, help='Statements to analyse, by total time')
+    parser.add_argument('--no-what-if', action='store_true', help='Do not create indexes to measure them')
+    parser.add_argument('--write-migration', action='store_true', help='Write database/migrations/NNNN_advisor_indexes.py')
+    parser.add_argument('--online-rows', type=int, default=1000000, help='Tables this big get online=True in the migration')
+    parser.add_argument('--config', default='default', help='Configuration name (development/production)')
+    args = parser.parse_args()
+
+    workload = load_workload(args.capture)
+    print(f"Loaded {sum(stats['count'] for stats in workload.values())} statements "
+          f"({len(workload)} distinct) from {args.capture}\n")
+
+    app = create_app(args.config)
+    # Do not capture the advisor's own statements
+    query_capture.configure({})
+    with app.app_context():
+        proposals = advise(workload, args.top, what_if=not args.no_what_if)
+    print_report(proposals)
+
+    if args.write_migration and proposals:
+        print(f"\n[OK] Wrote {write_migration(proposals, args.online_rows)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,22 @@
 // API Base URL
 var API_BASE_URL = 'http://localhost:5000/api';
 
+// Idempotency-Key for a POST: send the same key when retrying one submission
+// so the server replays its first response instead of creating a duplicate
+function newIdempotencyKey() {
+    if (window.crypto && window.crypto.randomUUID) {
+        return window.crypto.randomUUID();
+    }
+    return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2, 12);
+}
+
+// A status as the worker and admin lists show it ('in_progress' -> 'In Progress')
+function statusTitle(status) {
+    return status.split('_').map(function(word) {
+        return word.charAt(0).toUpperCase() + word.slice(1);
+    }).join(' ');
+}
+
 // =====================================================
 // Auth Service - Shared across controllers
 // =====================================================
@@ -74,6 +90,93 @@ app.config(['$httpProvider', function($httpProvider) {
     $httpProvider.interceptors.push('AuthInterceptor');
 }]);
 
+// =====================================================
+// Event Service - Live status changes (Server-Sent Events)
+// =====================================================
+app.factory('EventService', ['$rootScope', '$window', function($rootScope, $window) {
+    var service = {};
+    var source = null;
+    var sourceUrl = null;
+    var handlers = [];
+    
+    // EventSource cannot send headers, so the credentials go in the query
+    function streamUrl() {
+        var params = [];
+        var session = $window.localStorage.getItem('mlgms_session');
+        var employer = $window.localStorage.getItem('mlgms_employer');
+        var admin = $window.localStorage.getItem('mlgms_admin');
+        if (session) {
+            params.push('token=' + encodeURIComponent(JSON.parse(session).session_id));
+        }
+        if (employer) {
+            params.push('employer_session=' + encodeURIComponent(JSON.parse(employer).employer_id));
+        }
+        if (admin) {
+            params.push('admin_id=' + encodeURIComponent(JSON.parse(admin).id));
+        }
+        return params.length ? API_BASE_URL + '/events/stream?' + params.join('&') : null;
+    }
+    
+    function dispatch(type, event) {
+        var data = JSON.parse(event.data);
+        $rootScope.$applyAsync(function() {
+            handlers.forEach(function(handler) {
+                handler(type, data);
+            });
+        });
+    }
+    
+    // (Re)connect when the login changed; the browser reconnects by itself
+    // after a dropped stream and replays what it missed (Last-Event-ID)
+    function connect() {
+        var url = streamUrl();
+        if (!$window.EventSource || url === sourceUrl) {
+            return;
+        }
+        if (source) {
+            source.close();
+        }
+        sourceUrl = url;
+        source = url ? new $window.EventSource(url) : null;
+        if (source) {
+            ['complaint', 'application', 'resync'].forEach(function(type) {
+                source.addEventListener(type, function(event) {
+                    dispatch(type, event);
+                });
+            });
+        }
+    }
+    
+    // Call handler(type, data) for each event while the scope lives. type is
+    // 'complaint' or 'application' (data: id, status, previous_status, ...),
+    // or 'resync' when events were lost and the page should reload its list
+    service.subscribe = function(scope, handler) {
+        connect();
+        handlers.push(handler);
+        scope.$on('$destroy', function() {
+            handlers.splice(handlers.indexOf(handler), 1);
+            if (!handlers.length && source) {
+                source.close();
+                source = null;
+                sourceUrl = null;
+            }
+        });
+    };
+    
+    // Keep a status count object in step with one change (a new item also counts towards totalKey)
+    service.applyToCounts = function(counts, data, keyFor, totalKey) {
+        var previous = keyFor(data.previous_status || '');
+        if (!data.previous_status) {
+            counts[totalKey] = Number(counts[totalKey] || 0) + 1;
+        } else if (Number(counts[previous]) > 0) {
+            counts[previous] = Number(counts[previous]) - 1;
+        }
+        counts[keyFor(data.status)] = Number(counts[keyFor(data.status)] || 0) + 1;
+    };
+    
+    return service;
+}]);
+
 // =====================================================
 // Home Controller
 // =====================================================
@@ -461,7 +564,16 @@ app.controller('ComplaintController', ['$scope', '$http', '$location', 'AuthServ
         
         console.log('Submitting complaint:', requestData);
         
-        $http.post(API_BASE_URL + '/complaint/add', requestData)
+        // Retries of the same complaint reuse its key; an edited complaint gets a new one
+        var requestJson = angular.toJson(requestData);
+        if (requestJson !== $scope.lastRequestJson) {
+            $scope.idempotencyKey = newIdempotencyKey();
+            $scope.lastRequestJson = requestJson;
+        }
+        
+        $http.post(API_BASE_URL + '/complaint/add', requestData, {
+            headers: { 'Idempotency-Key': $scope.idempotencyKey }
+        })
             .then(function(response) {
                 if (response.data.success) {
                     $scope.submissionSuccess = true;
@@ -487,6 +599,7 @@ app.controller('ComplaintController', ['$scope', '$http', '$location', 'AuthServ
         $scope.submissionSuccess = false;
         $scope.complaintId = '';
         $scope.errorMessage = '';
+        $scope.lastRequestJson = null;
         if ($scope.complaintForm) {
             $scope.complaintForm.$setPristine();
             $scope.complaintForm.$setUntouched();
@@ -497,7 +610,7 @@ app.controller('ComplaintController', ['$scope', '$http', '$location', 'AuthServ
 // =====================================================
 // Complaints List Controller
 // =====================================================
-app.controller('ComplaintsController', ['$scope', '$http', '$location', 'AuthService', function($scope, $http, $location, AuthService) {
+app.controller('ComplaintsController', ['$scope', '$http', '$location', 'AuthService', 'EventService', function($scope, $http, $location, AuthService, EventService) {
     // Check if logged in
     if (!AuthService.isLoggedIn()) {
         $location.path('/login');
@@ -509,19 +622,39 @@ app.controller('ComplaintsController', ['$scope', '$http', '$location', 'AuthSer
     $scope.errorMessage = '';
     
     // Load complaints
-    $http.get(API_BASE_URL + '/complaint/list')
-        .then(function(response) {
-            if (response.data.success) {
-                $scope.complaints = response.data.complaints;
-            }
-        })
-        .catch(function(error) {
-            $scope.errorMessage = 'Error loading complaints.';
-            console.error('Error loading complaints:', error);
-        })
-        .finally(function() {
-            $scope.loading = false;
-        });
+    $scope.loadComplaints = function() {
+        $http.get(API_BASE_URL + '/complaint/list')
+            .then(function(response) {
+                if (response.data.success) {
+                    $scope.complaints = response.data.complaints;
+                }
+            })
+            .catch(function(error) {
+                $scope.errorMessage = 'Error loading complaints.';
+                console.error('Error loading complaints:', error);
+            })
+            .finally(function() {
+                $scope.loading = false;
+            });
+    };
+    
+    // Status changes made by the admins show up without a reload
+    EventService.subscribe($scope, function(type, data) {
+        if (type === 'resync') {
+            $scope.loadComplaints();
+        } else if (type === 'complaint') {
+            $scope.complaints.forEach(function(complaint) {
+                if (complaint.db_id === data.id) {
+                    complaint.status = statusTitle(data.status);
+                    if (data.admin_remarks !== undefined) {
+                        complaint.admin_remarks = data.admin_remarks;
+                    }
+                }
+            });
+        }
+    });
+    
+    $scope.loadComplaints();
     
     // Get status class
     $scope.getStatusClass = function(status) {
@@ -628,10 +761,20 @@ app.controller('JobsController', ['$scope', '$http', '$location', 'AuthService',
         rejected: 0
     };
     
+    // "Near me" search - set once the browser reports a position
+    $scope.nearby = null;
+    $scope.radiusKm = '25';
+    $scope.radiusOptions = ['10', '25', '50', '100', '200'];
+    
     // Load jobs
     $scope.loadJobs = function() {
         $scope.loading = true;
+        $scope.errorMessage = '';
         var url = API_BASE_URL + '/jobs/list?status=open';
+        if ($scope.nearby) {
+            url = API_BASE_URL + '/jobs/nearby?lat=' + $scope.nearby.lat + '&lon=' + $scope.nearby.lon +
+                  '&radius=' + $scope.radiusKm;
+        }
         if ($scope.filterSkill) {
             url += '&skill=' + $scope.filterSkill;
         }
@@ -669,11 +812,60 @@ app.controller('JobsController', ['$scope', '$http', '$location', 'AuthService',
         $scope.loadJobs();
     };
     
+    // Show jobs near the worker's current position, nearest first
+    $scope.findNearby = function() {
+        if (!navigator.geolocation) {
+            $scope.errorMessage = 'Location is not available in this browser.';
+            return;
+        }
+        $scope.locating = true;
+        navigator.geolocation.getCurrentPosition(function(position) {
+            $scope.$apply(function() {
+                $scope.locating = false;
+                $scope.nearby = {
+                    lat: position.coords.latitude.toFixed(4),
+                    lon: position.coords.longitude.toFixed(4)
+                };
+                $scope.loadJobs();
+            });
+        }, function() {
+            $scope.$apply(function() {
+                $scope.locating = false;
+                $scope.errorMessage = 'Could not get your location. Please allow location access.';
+            });
+        }, { timeout: 10000, maximumAge: 600000 });
+    };
+    
+    $scope.clearNearby = function() {
+        $scope.nearby = null;
+        $scope.loadJobs();
+    };
+    
+    // The list leaves out descriptions; fetch one when its card asks
+    $scope.loadDescription = function(job) {
+        job.loadingDescription = true;
+        $http.get(API_BASE_URL + '/jobs/' + job.job_id)
+            .then(function(response) {
+                if (response.data.success) {
+                    job.description = response.data.job.description || '';
+                }
+            })
+            .catch(function(error) {
+                console.error('Error loading job description:', error);
+            })
+            .finally(function() {
+                job.loadingDescription = false;
+            });
+    };
+    
     // Apply for job
     $scope.applyForJob = function(job) {
         job.applying = true;
+        job.idempotencyKey = job.idempotencyKey || newIdempotencyKey();
         
-        $http.post(API_BASE_URL + '/jobs/apply/' + job.id)
+        $http.post(API_BASE_URL + '/jobs/apply/' + job.id, null, {
+            headers: { 'Idempotency-Key': job.idempotencyKey }
+        })
             .then(function(response) {
                 if (response.data.success) {
                     alert('Application submitted successfully! Application ID: ' + response.data.application_id);
@@ -690,15 +882,29 @@ app.controller('JobsController', ['$scope', '$http', '$location', 'AuthService',
             });
     };
     
-    // Initial load
-    $scope.loadJobs();
-    $scope.loadAppStats();
+    // Initial load - jobs and application stats in one request
+    $http.get(API_BASE_URL + '/bootstrap/jobs', { params: { status: 'open' } })
+        .then(function(response) {
+            if (response.data.jobs && response.data.jobs.success) {
+                $scope.jobs = response.data.jobs.jobs;
+            }
+            if (response.data.application_stats && response.data.application_stats.success) {
+                $scope.appStats = response.data.application_stats.stats;
+            }
+        })
+        .catch(function(error) {
+            $scope.errorMessage = 'Error loading jobs.';
+            console.error('Error loading jobs:', error);
+        })
+        .finally(function() {
+            $scope.loading = false;
+        });
 }]);
 
 // =====================================================
 // Applications Controller - My Applications
 // =====================================================
-app.controller('ApplicationsController', ['$scope', '$http', '$location', 'AuthService', function($scope, $http, $location, AuthService) {
+app.controller('ApplicationsController', ['$scope', '$http', '$location', 'AuthService', 'EventService', function($scope, $http, $location, AuthService, EventService) {
     // Check if logged in
     if (!AuthService.isLoggedIn()) {
         $location.path('/login');
@@ -717,31 +923,46 @@ app.controller('ApplicationsController', ['$scope', '$http', '$location', 'AuthS
         rejected: 0
     };
     
-    // Load applications
-    $http.get(API_BASE_URL + '/jobs/applications')
-        .then(function(response) {
-            if (response.data.success) {
-                $scope.applications = response.data.applications;
-            }
-        })
-        .catch(function(error) {
-            $scope.errorMessage = 'Error loading applications.';
-            console.error('Error loading applications:', error);
-        })
-        .finally(function() {
-            $scope.loading = false;
-        });
+    // Load applications and stats
+    $scope.loadApplications = function() {
+        $http.get(API_BASE_URL + '/bootstrap/applications')
+            .then(function(response) {
+                if (response.data.applications && response.data.applications.success) {
+                    $scope.applications = response.data.applications.applications;
+                }
+                if (response.data.application_stats && response.data.application_stats.success) {
+                    $scope.stats = response.data.application_stats.stats;
+                }
+            })
+            .catch(function(error) {
+                $scope.errorMessage = 'Error loading applications.';
+                console.error('Error loading applications:', error);
+            })
+            .finally(function() {
+                $scope.loading = false;
+            });
+    };
     
-    // Load stats
-    $http.get(API_BASE_URL + '/jobs/applications/stats')
-        .then(function(response) {
-            if (response.data.success) {
-                $scope.stats = response.data.stats;
+    // Employer and admin decisions show up without a reload
+    EventService.subscribe($scope, function(type, data) {
+        if (type === 'resync') {
+            $scope.loadApplications();
+        } else if (type === 'application') {
+            var known = $scope.applications.filter(function(app) {
+                return app.id === data.id;
+            });
+            known.forEach(function(app) {
+                app.status = statusTitle(data.status);
+            });
+            if (known.length) {
+                EventService.applyToCounts($scope.stats, data, function(status) {
+                    return status;
+                }, 'total');
             }
-        })
-        .catch(function(error) {
-            console.error('Error loading application stats:', error);
-        });
+        }
+    });
+    
+    $scope.loadApplications();
 }]);
 
 // =====================================================
@@ -807,26 +1028,18 @@ app.controller('AdminDashboardController', ['$scope', '$http', '$location', '$wi
     $scope.recentApplications = [];
     $scope.loading = true;
     
-    // Load stats
-    $http.get(API_BASE_URL + '/admin/stats')
+    // Load stats and recent applications
+    $http.get(API_BASE_URL + '/bootstrap/admin-dashboard')
         .then(function(response) {
-            if (response.data.success) {
-                $scope.stats = response.data.stats;
+            if (response.data.stats && response.data.stats.success) {
+                $scope.stats = response.data.stats.stats;
             }
-        })
-        .catch(function(error) {
-            console.error('Error loading stats:', error);
-        });
-    
-    // Load recent applications
-    $http.get(API_BASE_URL + '/admin/applications')
-        .then(function(response) {
-            if (response.data.success) {
-                $scope.recentApplications = response.data.applications.slice(0, 5);
+            if (response.data.applications && response.data.applications.success) {
+                $scope.recentApplications = response.data.applications.applications.slice(0, 5);
             }
         })
         .catch(function(error) {
-            console.error('Error loading applications:', error);
+            console.error('Error loading dashboard:', error);
         })
         .finally(function() {
             $scope.loading = false;
@@ -879,7 +1092,7 @@ app.controller('AdminDashboardController', ['$scope', '$http', '$location', '$wi
 // =====================================================
 // Admin Applications Controller
 // =====================================================
-app.controller('AdminApplicationsController', ['$scope', '$http', '$location', '$window', function($scope, $http, $location, $window) {
+app.controller('AdminApplicationsController', ['$scope', '$http', '$location', '$window', 'EventService', function($scope, $http, $location, $window, EventService) {
     // Check if admin is logged in
     var admin = $window.localStorage.getItem('mlgms_admin');
     if (!admin) {
@@ -945,6 +1158,19 @@ app.controller('AdminApplicationsController', ['$scope', '$http', '$location', '
             });
     };
     
+    // Decisions made by employers or other admins show up without a reload
+    EventService.subscribe($scope, function(type, data) {
+        if (type === 'resync') {
+            $scope.loadApplications();
+        } else if (type === 'application') {
+            $scope.applications.forEach(function(app) {
+                if (app.id === data.id) {
+                    app.status = statusTitle(data.status);
+                }
+            });
+        }
+    });
+    
     // Initial load
     $scope.loadApplications();
 }]);
@@ -952,7 +1178,7 @@ app.controller('AdminApplicationsController', ['$scope', '$http', '$location', '
 // =====================================================
 // Admin Complaints Controller
 // =====================================================
-app.controller('AdminComplaintsController', ['$scope', '$http', '$location', '$window', function($scope, $http, $location, $window) {
+app.controller('AdminComplaintsController', ['$scope', '$http', '$location', '$window', 'EventService', function($scope, $http, $location, $window, EventService) {
     // Check if admin is logged in
     var admin = $window.localStorage.getItem('mlgms_admin');
     if (!admin) {
@@ -962,14 +1188,62 @@ app.controller('AdminComplaintsController', ['$scope', '$http', '$location', '$w
     
     $scope.complaints = [];
     $scope.filterStatus = 'pending';
+    $scope.sortBy = 'priority';
+    $scope.claimMessage = '';
+    $scope.duplicateCounts = {};
+    $scope.newComplaints = 0;
     $scope.loading = true;
+    var adminId = JSON.parse(admin).id;
+    
+    // Open complaints per duplicate cluster, for the "similar" badges
+    $scope.loadDuplicates = function() {
+        $http.get(API_BASE_URL + '/admin/complaints/duplicates')
+            .then(function(response) {
+                var counts = {};
+                (response.data.clusters || []).forEach(function(cluster) {
+                    counts[cluster.cluster_id] = cluster.open_count;
+                });
+                $scope.duplicateCounts = counts;
+            })
+            .catch(function(error) {
+                console.error('Error loading duplicate complaints:', error);
+            });
+    };
+    
+    // Resolve every open complaint in a duplicate cluster at once
+    $scope.resolveDuplicates = function(complaint) {
+        var clusterId = complaint.duplicate_cluster_id;
+        if (!$window.confirm('Resolve all ' + $scope.duplicateCounts[clusterId] + ' similar open complaints?')) {
+            return;
+        }
+        complaint.processing = true;
+        $http.post(API_BASE_URL + '/admin/complaints/clusters/' + clusterId + '/resolve', {})
+            .then(function(response) {
+                if (response.data.success) {
+                    $scope.complaints.forEach(function(other) {
+                        if (other.duplicate_cluster_id === clusterId &&
+                            (other.status === 'pending' || other.status === 'in_progress')) {
+                            other.status = 'resolved';
+                        }
+                    });
+                    delete $scope.duplicateCounts[clusterId];
+                }
+            })
+            .catch(function(error) {
+                alert('Error resolving similar complaints');
+            })
+            .finally(function() {
+                complaint.processing = false;
+            });
+    };
     
     // Load complaints
     $scope.loadComplaints = function() {
         $scope.loading = true;
-        var url = API_BASE_URL + '/admin/complaints';
+        $scope.newComplaints = 0;
+        var url = API_BASE_URL + '/admin/complaints?sort=' + $scope.sortBy;
         if ($scope.filterStatus) {
-            url += '?status=' + $scope.filterStatus;
+            url += '&status=' + $scope.filterStatus;
         }
         
         $http.get(url)
@@ -986,6 +1260,47 @@ app.controller('AdminComplaintsController', ['$scope', '$http', '$location', '$w
             });
     };
     
+    // Take the highest-priority pending complaint (never one another admin already took)
+    $scope.claimNext = function() {
+        $scope.claiming = true;
+        $http.post(API_BASE_URL + '/admin/complaints/next', null, {headers: {'X-Admin-ID': adminId}})
+            .then(function(response) {
+                var claimed = response.data.complaint;
+                $scope.claimMessage = response.data.message;
+                if (claimed) {
+                    $scope.complaints = $scope.complaints.filter(function(complaint) {
+                        return complaint.id !== claimed.id;
+                    });
+                    $scope.complaints.unshift(claimed);
+                }
+            })
+            .catch(function(error) {
+                alert('Error taking the next complaint');
+            })
+            .finally(function() {
+                $scope.claiming = false;
+            });
+    };
+    
+    // Put a claimed complaint back in the queue
+    $scope.releaseComplaint = function(complaint) {
+        complaint.processing = true;
+        $http.post(API_BASE_URL + '/admin/complaints/' + complaint.id + '/release', null,
+                   {headers: {'X-Admin-ID': adminId}})
+            .then(function(response) {
+                if (response.data.success) {
+                    complaint.status = 'pending';
+                    complaint.assigned_admin_id = null;
+                }
+            })
+            .catch(function(error) {
+                alert(error.data?.message || 'Error releasing complaint');
+            })
+            .finally(function() {
+                complaint.processing = false;
+            });
+    };
+    
     // Resolve complaint
     $scope.resolveComplaint = function(complaint) {
         complaint.processing = true;
@@ -1002,8 +1317,35 @@ app.controller('AdminComplaintsController', ['$scope', '$http', '$location', '$w
             });
     };
     
+    // Changes made by other admins (and new complaints) show up without a reload
+    EventService.subscribe($scope, function(type, data) {
+        if (type === 'resync') {
+            $scope.loadComplaints();
+            $scope.loadDuplicates();
+        } else if (type === 'complaint') {
+            var known = false;
+            $scope.complaints.forEach(function(complaint) {
+                if (complaint.id === data.id) {
+                    known = true;
+                    complaint.status = data.status;
+                    if (data.assigned_admin_id !== undefined) {
+                        complaint.assigned_admin_id = data.assigned_admin_id;
+                    }
+                    if (data.admin_remarks !== undefined) {
+                        complaint.admin_remarks = data.admin_remarks;
+                    }
+                }
+            });
+            // New rows need the full list query (priority, worker details)
+            if (!known && !data.previous_status) {
+                $scope.newComplaints++;
+            }
+        }
+    });
+    
     // Initial load
     $scope.loadComplaints();
+    $scope.loadDuplicates();
 }]);
 
 
@@ -1141,7 +1483,7 @@ app.controller('EmployerLoginController', ['$scope', '$http', '$location', '$win
 // =====================================================
 // Employer Dashboard Controller
 // =====================================================
-app.controller('EmployerDashboardController', ['$scope', '$http', '$location', '$window', function($scope, $http, $location, $window) {
+app.controller('EmployerDashboardController', ['$scope', '$http', '$location', '$window', 'EventService', function($scope, $http, $location, $window, EventService) {
     // Check if employer is logged in
     var employerSession = $window.localStorage.getItem('mlgms_employer');
     if (!employerSession) {
@@ -1153,6 +1495,7 @@ app.controller('EmployerDashboardController', ['$scope', '$http', '$location', '
     $scope.job_stats = {};
     $scope.application_stats = {};
     $scope.recentApplications = [];
+    $scope.newApplications = 0;
     $scope.loading = true;
     $scope.showPostJob = false;
     $scope.jobData = {};
@@ -1161,25 +1504,54 @@ app.controller('EmployerDashboardController', ['$scope', '$http', '$location', '
     $scope.jobSuccess = '';
     
     // Load dashboard data
-    $http.get(API_BASE_URL + '/employers/dashboard')
-        .then(function(response) {
-            if (response.data.success) {
-                $scope.employer = response.data.employer;
-                $scope.job_stats = response.data.job_stats;
-                $scope.application_stats = response.data.application_stats;
-                $scope.recentApplications = response.data.recent_applications;
+    $scope.loadDashboard = function() {
+        $http.get(API_BASE_URL + '/bootstrap/employer-dashboard')
+            .then(function(response) {
+                if (response.data.success) {
+                    $scope.employer = response.data.employer;
+                    $scope.job_stats = response.data.job_stats;
+                    $scope.application_stats = response.data.application_stats;
+                    $scope.recentApplications = response.data.recent_applications;
+                    $scope.newApplications = 0;
+                }
+            })
+            .catch(function(error) {
+                console.error('Error loading dashboard:', error);
+                if (error.status === 401 || error.status === 403) {
+                    $window.localStorage.removeItem('mlgms_employer');
+                    $location.path('/employer-login');
+                }
+            })
+            .finally(function() {
+                $scope.loading = false;
+            });
+    };
+    
+    // New applications and decisions (also from the admins) show up without a reload
+    EventService.subscribe($scope, function(type, data) {
+        if (type === 'resync') {
+            $scope.loadDashboard();
+        } else if (type === 'application') {
+            // Our own accept/reject already set the row and reloaded the counts
+            var news = true;
+            $scope.recentApplications.forEach(function(app) {
+                if (app.id === data.id) {
+                    news = app.status !== data.status;
+                    app.status = data.status;
+                }
+            });
+            if (!data.previous_status) {
+                $scope.newApplications++;
             }
-        })
-        .catch(function(error) {
-            console.error('Error loading dashboard:', error);
-            if (error.status === 401 || error.status === 403) {
-                $window.localStorage.removeItem('mlgms_employer');
-                $location.path('/employer-login');
+            if (news) {
+                EventService.applyToCounts($scope.application_stats, data, function(status) {
+                    return status + '_applications';
+                }, 'total_applications');
             }
-        })
-        .finally(function() {
-            $scope.loading = false;
-        });
+        }
+    });
+    
+    $scope.loadDashboard();
     
     // Navigate to page
     $scope.navigateTo = function(path) {
@@ -1216,7 +1588,7 @@ app.controller('EmployerDashboardController', ['$scope', '$http', '$location', '
                     $scope.jobSuccess = 'Job posted successfully! Job ID: ' + response.data.job_id;
                     $scope.jobData = {};
                     // Reload stats
-                    $http.get(API_BASE_URL + '/employers/dashboard')
+                    $http.get(API_BASE_URL + '/bootstrap/employer-dashboard')
                         .then(function(res) {
                             if (res.data.success) {
                                 $scope.job_stats = res.data.job_stats;
@@ -1246,7 +1618,7 @@ app.controller('EmployerDashboardController', ['$scope', '$http', '$location', '
                 if (response.data.success) {
                     app.status = 'accepted';
                     // Reload stats
-                    $http.get(API_BASE_URL + '/employers/dashboard')
+                    $http.get(API_BASE_URL + '/bootstrap/employer-dashboard')
                         .then(function(res) {
                             if (res.data.success) {
                                 $scope.application_stats = res.data.application_stats;
@@ -1356,6 +1728,17 @@ app.controller('AdminEmployersController', ['$scope', '$http', '$location', '$wi
         $scope.selectedEmployer = employer;
         $scope.showDetails = true;
         $scope.verificationNotes = '';
+        
+        // Complaint counts per category
+        $http.get(API_BASE_URL + '/admin/employers/' + employer.id)
+            .then(function(response) {
+                if (response.data.success) {
+                    employer.complaint_categories = response.data.employer.complaint_categories;
+                }
+            })
+            .catch(function(error) {
+                console.error('Error loading employer complaints:', error);
+            });
     };
     
     // Verify employer
@@ -0,0 +1,228 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Maintenance Batch Jobs
+# =====================================================
+#
+# Periodic jobs meant for cron or a scheduler. Each one works through
+# its table in small chunks with short transactions, so it can run
+# while the site is live.
+#
+# Usage: python maintenance.py <command> [--chunk 200] [--pause 0.1]
+#   archive               Move finished complaints and jobs to the archive tables
+#   partition             Convert complaints to monthly partitions
+#                         (blocking table rebuild - run in a maintenance window;
+#                         add --dry-run to print the statements only)
+#   roll-partitions       Add upcoming monthly partitions
+#   reconcile-employers   Recompute employers.workers_count and rating
+#   rescore-employers     Recompute employer risk scores computed with older weights
+#                         (--rebuild recomputes every employer)
+#   geocode-jobs          Fill in coordinates for jobs the gazetteer could not place before
+#   backfill-regions      Set region_id on employers, workers and jobs that have none
+#   rollup-complaints     Refresh the complaint analytics rollup (--rebuild recomputes all months)
+#   rebuild-sla           Recompute the complaint SLA histograms and open-complaint table
+#   rescore-complaints    Recompute the triage priority of every open complaint
+#   dedup-complaints      Fingerprint complaints filed before duplicate detection existed
+#   sweep-sessions        Delete expired sessions
+
+import argparse
+import time
+from flask import current_app
+from backend.app import create_app
+from backend import dedup, risk, sla, triage
+from backend.archive import ARCHIVE_RULES, archive_table
+from backend.db import get_connection
+from backend.models import Employer, Job, Region
+from backend.partitioning import apply, plan, roll_forward
+from backend.rollup import rebuild, refresh
+from backend.sweeper import sweep_sessions
+
+
+def reconcile_employers(args):
+    """Recompute employers.workers_count and rating from the source tables"""
+    after_id = 0
+    visited = 0
+    corrected = 0
+    while True:
+        last_id, fixed = Employer.reconcile_stats(after_id, args.chunk)
+        if last_id is None:
+            break
+        visited += 1
+        corrected += fixed
+        after_id = last_id
+        time.sleep(args.pause)
+
+    print(f"[OK] Reconciled employers in {visited} chunk(s), corrected {corrected} row(s)")
+
+
+def geocode_jobs(args):
+    """Geocode jobs without coordinates (after adding places to the gazetteer)"""
+    after_id = 0
+    located = 0
+    while True:
+        last_id, found = Job.geocode_missing(after_id, args.chunk)
+        if last_id is None:
+            break
+        located += found
+        after_id = last_id
+        time.sleep(args.pause)
+
+    print(f"[OK] Geocoded {located} job(s)")
+
+
+def backfill_regions(args):
+    """Match existing rows to the regions table"""
+    for table in Region.BACKFILL:
+        after_id = 0
+        matched = 0
+        while True:
+            last_id, found = Region.backfill(table, after_id, args.chunk)
+            if last_id is None:
+                break
+            matched += found
+            after_id = last_id
+            time.sleep(args.pause)
+        print(f"[OK] Matched {matched} {table} row(s) to a region")
+
+
+def rescore_employers(args):
+    """Recompute employer complaint counts and risk scores from the full history"""
+    after_id = 0
+    visited = 0
+    recomputed = 0
+    while True:
+        last_id, count = risk.recompute(after_id, args.chunk, stale_only=not args.rebuild)
+        if last_id is None:
+            break
+        visited += 1
+        recomputed += count
+        after_id = last_id
+        time.sleep(args.pause)
+
+    print(f"[OK] Visited employers in {visited} chunk(s), recomputed {recomputed}")
+
+
+def rollup_complaints(args):
+    """Bring the complaint rollup up to date"""
+    months = rebuild() if args.rebuild else refresh()
+    if months:
+        print(f"[OK] Rebuilt {len(months)} month(s): {months[0]:%Y-%m} to {months[-1]:%Y-%m}")
+    else:
+        print("[SKIP] No complaints changed since the last refresh")
+
+
+def rebuild_sla(args):
+    """Recompute the SLA tables (after changing SLA targets)"""
+    conn = get_connection()
+    try:
+        cells, open_complaints = sla.rebuild(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"[OK] Rebuilt {cells} histogram cell(s), {open_complaints} open complaint(s)")
+
+
+def rescore_complaints(args):
+    """Recompute complaint priorities (after changing the triage weights)"""
+    conn = get_connection()
+    try:
+        rescored = triage.rescore_all(conn)
+    finally:
+        conn.close()
+    print(f"[OK] Rescored {rescored} open complaint(s)")
+
+
+def sweep_expired_sessions(args):
+    """Delete all expired sessions (beyond the retention period)"""
+    deleted = sweep_sessions(args.chunk, current_app.config.get('SESSION_RETENTION_SECONDS', 0),
+                             pause=args.pause)
+    print(f"[OK] Deleted {deleted} expired session(s)")
+
+
+def archive(args):
+    """Move finished complaints and jobs older than ARCHIVE_AFTER_DAYS to the archive tables"""
+    def progress(table, done, total):
+        print(f"  {table}: {done}/{total} archived")
+
+    for table in ARCHIVE_RULES:
+        moved = archive_table(table, args.age_days, args.chunk, progress, args.pause)
+        print(f"[OK] Archived {moved} row(s) from {table}")
+
+
+def dedup_complaints(args):
+    """Fingerprint complaints that have none (oldest first, so clusters form as they would have)"""
+    after_id = 0
+    clustered = 0
+    fingerprinted = 0
+    while True:
+        last_id, complaint_ids = dedup.unfingerprinted(after_id, args.chunk)
+        if last_id is None:
+            break
+        for complaint_id in complaint_ids:
+            if dedup.fingerprint(complaint_id) not in (None, complaint_id):
+                clustered += 1
+        fingerprinted += len(complaint_ids)
+        after_id = last_id
+        time.sleep(args.pause)
+
+    print(f"[OK] Fingerprinted {fingerprinted} complaint(s), {clustered} linked to an earlier one")
+
+
+def partition(args):
+    """Partition complaints by month (or roll forward if already done)"""
+    steps = plan(args.months_ahead)
+    if not steps:
+        print("[SKIP] Tables already partitioned up to date")
+        return
+    for table, statement in steps:
+        print(f"-- {table}\n{statement};\n")
+    if args.dry_run:
+        print("[SKIP] Dry run - nothing executed")
+        return
+    apply(steps)
+    print(f"[OK] Ran {len(steps)} statement(s)")
+
+
+def roll_partitions(args):
+    """Add upcoming monthly partitions to the partitioned tables"""
+    changed = roll_forward(args.months_ahead)
+    if changed:
+        print(f"[OK] Added partitions to {', '.join(changed)}")
+    else:
+        print("[SKIP] Partitions already up to date")
+
+
+COMMANDS = {
+    'archive': archive,
+    'backfill-regions': backfill_regions,
+    'dedup-complaints': dedup_complaints,
+    'geocode-jobs': geocode_jobs,
+    'partition': partition,
+    'reconcile-employers': reconcile_employers,
+    'rebuild-sla': rebuild_sla,
+    'rescore-complaints': rescore_complaints,
+    'rescore-employers': rescore_employers,
+    'roll-partitions': roll_partitions,
+    'rollup-complaints': rollup_complaints,
+    'sweep-sessions': sweep_expired_sessions
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run MLGMS maintenance jobs')
+    parser.add_argument('command', choices=sorted(COMMANDS))
+    parser.add_argument('--chunk', type=int, default=200, help='Rows per transaction')
+    parser.add_argument('--pause', type=float, default=0.1, help='Seconds to sleep between chunks')
+    parser.add_argument('--age-days', type=int, help='archive: minimum age in days (default ARCHIVE_AFTER_DAYS)')
+    parser.add_argument('--months-ahead', type=int, help='partition: future partitions to keep (default PARTITION_MONTHS_AHEAD)')
+    parser.add_argument('--dry-run', action='store_true', help='partition: print the statements without running them')
+    parser.add_argument('--rebuild', action='store_true', help='rollup-complaints: recompute every month; rescore-employers: every employer')
+    parser.add_argument('--config', default='default', help='Configuration name (development/production)')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        COMMANDS[args.command](args)
+
+
+if __name__ == '__main__':
+    main()
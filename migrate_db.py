@@ -1,76 +1,38 @@
-# Database Migration Script for MLGMS
-# Run this script to add jobs and job_applications tables
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Database Migration Runner
+# =====================================================
+#
+# Applies the versioned migrations in database/migrations (see
+# backend/migrate.py) and records them in schema_migrations.
+#
+# Usage: python migrate_db.py [command] [--dry-run] [--target 0006] [--allow-deletes]
+#   up        Apply pending migrations (default)
+#   status    List migrations and whether each is applied
+#   baseline  Mark migrations as applied without running them, for a
+#             database created from database/mlgms_db.sql
+#
+# New schema changes go in a new database/migrations/NNNN_name.py file
+# with an up(m) function; use m.online_alter() or online=True for tables
+# that are too big to lock.
 
-import pymysql
+import argparse
+from backend.app import create_app
+from backend.db import get_connection
+from backend.migrate import baseline, migrate, status
 
-def migrate():
-    conn = pymysql.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='mlgms_db',
-        autocommit=True
-    )
-    
-    cursor = conn.cursor()
-    
-    print("Running database migration...")
-    
-    # Create jobs table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            job_id VARCHAR(20) UNIQUE NOT NULL,
-            employer_id INT NOT NULL,
-            title VARCHAR(150) NOT NULL,
-            description TEXT,
-            skill_required VARCHAR(50),
-            location VARCHAR(200),
-            wage_per_day DECIMAL(10,2),
-            duration_days INT,
-            workers_needed INT,
-            status ENUM('open', 'closed', 'filled') DEFAULT 'open',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (employer_id) REFERENCES employers(id) ON DELETE CASCADE
-        )
-    """)
-    print("[OK] Created jobs table")
-    
-    # Create job_applications table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS job_applications (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            application_id VARCHAR(20) UNIQUE NOT NULL,
-            job_id INT NOT NULL,
-            worker_id INT NOT NULL,
-            status ENUM('pending', 'accepted', 'rejected') DEFAULT 'pending',
-            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            responded_at TIMESTAMP NULL,
-            FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE,
-            FOREIGN KEY (worker_id) REFERENCES workers(id) ON DELETE CASCADE
-        )
-    """)
-    print("[OK] Created job_applications table")
-    
-    # Create indexes
+
+def seed_sample_jobs():
+    """Insert the sample jobs into an empty jobs table"""
+    conn = get_connection()
     try:
-        cursor.execute("CREATE INDEX idx_jobs_employer ON jobs(employer_id)")
-        cursor.execute("CREATE INDEX idx_jobs_status ON jobs(status)")
-        cursor.execute("CREATE INDEX idx_jobs_skill ON jobs(skill_required)")
-        cursor.execute("CREATE INDEX idx_applications_worker ON job_applications(worker_id)")
-        cursor.execute("CREATE INDEX idx_applications_job ON job_applications(job_id)")
-        cursor.execute("CREATE INDEX idx_applications_status ON job_applications(status)")
-        print("[OK] Created indexes")
-    except Exception as e:
-        print(f"  Indexes may already exist: {e}")
-    
-    # Check if sample jobs exist
-    cursor.execute("SELECT COUNT(*) FROM jobs")
-    count = cursor.fetchone()[0]
-    
-    if count == 0:
-        # Insert sample jobs
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) as count FROM jobs")
+        count = cursor.fetchone()['count']
+        if count:
+            print(f"  Jobs table already has {count} records")
+            return
+
         sample_jobs = [
             ('JOB00001', 1, 'Electrician for Building Construction', 'Need experienced electrician for wiring work in new residential building', 'electrician', 'Mumbai, Maharashtra', 800.00, 30, 5, 'open'),
             ('JOB00002', 2, 'Factory Worker - Manufacturing', 'General factory work including machine operation and quality checking', 'other', 'Pune, Maharashtra', 500.00, 60, 20, 'open'),
@@ -80,17 +42,47 @@ def migrate():
             ('JOB00006', 1, 'Plumber for Maintenance Work', 'Experienced plumber for maintenance work in commercial complex', 'plumber', 'Mumbai, Maharashtra', 700.00, 15, 3, 'open'),
             ('JOB00007', 3, 'Textile Worker', 'Workers needed for textile manufacturing', 'other', 'Surat, Gujarat', 450.00, 30, 15, 'closed'),
         ]
-        
+
         cursor.executemany("""
             INSERT INTO jobs (job_id, employer_id, title, description, skill_required, location, wage_per_day, duration_days, workers_needed, status)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, sample_jobs)
+        conn.commit()
         print("[OK] Inserted sample jobs")
-    else:
-        print(f"  Jobs table already has {count} records")
-    
-    conn.close()
-    print("\n[SUCCESS] Migration completed successfully!")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run MLGMS schema migrations')
+    parser.add_argument('command', nargs='?', default='up', choices=['up', 'status', 'baseline'])
+    parser.add_argument('--dry-run', action='store_true', help='up: print the statements without running them')
+    parser.add_argument('--target', help='Stop after this version')
+    parser.add_argument('--allow-deletes', action='store_true',
+                        help='up: let migrations delete rows they would otherwise stop on (e.g. duplicates)')
+    parser.add_argument('--config', default='default', help='Configuration name (development/production)')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        if args.command == 'status':
+            for migration, applied in status():
+                print(f"  [{'x' if applied else ' '}] {migration.version} {migration.name}")
+            return
+
+        if args.command == 'baseline':
+            marked = baseline(args.target)
+            print(f"[OK] Marked {len(marked)} migration(s) as applied")
+            return
+
+        print("Running database migration...")
+        applied = migrate(args.target, args.dry_run, allow_deletes=args.allow_deletes)
+        if args.dry_run:
+            print("\n[SKIP] Dry run - nothing executed")
+            return
+        seed_sample_jobs()
+        print(f"\n[SUCCESS] Applied {len(applied)} migration(s)")
+
 
 if __name__ == '__main__':
-    migrate()
\ No newline at end of file
+    main()
@@ -0,0 +1,90 @@
+# =====================================================
+# Migrant Labor & Grievance Management System (MLGMS)
+# Background Task Worker
+# =====================================================
+#
+# Claims and runs tasks from the task_queue table (see backend/tasks.py).
+# Start as many worker processes as needed; SKIP LOCKED keeps them from
+# claiming the same task.
+#
+# Usage: python task_worker.py [--once] [--batch 10] [--poll 2]
+
+import argparse
+import time
+from backend.app import create_app
+from backend.partitioning import roll_forward
+from backend.rollup import refresh as refresh_rollup
+from backend.db import get_connection
+from backend.triage import rescore_all
+from backend.tasks import claim, purge_done, release_stale, run_task, worker_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run MLGMS background tasks')
+    parser.add_argument('--once', action='store_true', help='Drain due tasks once and exit')
+    parser.add_argument('--batch', type=int, default=10, help='Tasks claimed per round')
+    parser.add_argument('--poll', type=float, default=2.0, help='Seconds to sleep when the queue is empty')
+    parser.add_argument('--config', default='default', help='Configuration name (development/production)')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    worker = worker_name()
+    print(f"[OK] Task worker {worker} started")
+
+    with app.app_context():
+        last_maintenance = 0
+        last_roll = 0
+        last_rollup = 0
+        last_rescore = 0
+        while True:
+            if time.time() - last_maintenance > 60:
+                released = release_stale()
+                purged = purge_done()
+                if released or purged:
+                    print(f"  Released {released} stale task(s), purged {purged} finished task(s)")
+                last_maintenance = time.time()
+
+            if time.time() - last_roll > 86400:
+                try:
+                    rolled = roll_forward()
+                    if rolled:
+                        print(f"  Added monthly partitions to {', '.join(rolled)}")
+                except Exception as e:
+                    print(f"  Partition roll-forward failed: {e}")
+                last_roll = time.time()
+
+            if time.time() - last_rollup > app.config.get('ROLLUP_INTERVAL', 300):
+                try:
+                    months = refresh_rollup()
+                    if months:
+                        print(f"  Refreshed complaint rollup for {len(months)} month(s)")
+                except Exception as e:
+                    print(f"  Complaint rollup refresh failed: {e}")
+                last_rollup = time.time()
+
+            # Repeat-complaint points fall as complaints leave TRIAGE_REPEAT_WINDOW_DAYS
+            if time.time() - last_rescore > 86400:
+                try:
+                    conn = get_connection()
+                    try:
+                        rescored = rescore_all(conn)
+                    finally:
+                        conn.close()
+                    print(f"  Rescored {rescored} open complaint(s)")
+                except Exception as e:
+                    print(f"  Complaint rescore failed: {e}")
+                last_rescore = time.time()
+
+            rows = claim(worker, args.batch)
+            for row in rows:
+                status = run_task(row)
+                print(f"  {row['task_name']} #{row['id']} (attempt {row['attempts']}): {status}")
+
+            if args.once and not rows:
+                break
+            if not rows:
+                time.sleep(args.poll)
+
+
+if __name__ == '__main__':
+    main()